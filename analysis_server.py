@@ -0,0 +1,291 @@
+import argparse
+import importlib
+import json
+import math
+import os
+import socketserver
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from run_analysis import analysis_scripts, run_script
+from utils.data_loader import clear_data_cache, enable_binary_cache, load_data
+from utils.registry import load_analyses
+from utils.waves import source_digest
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_ENTRIES = 128
+
+# Paramètres acceptés dans la requête, avec leur conversion depuis le texte.
+PARAMETERS = {
+    "plot": lambda value: value.lower() in ("1", "true", "oui", "yes"),
+    "chunksize": int,
+    "facet": str,
+    "window": str,
+    "sample": int,
+}
+
+
+def analysis_names():
+    """Nom court (par ex. "1a") et nom complet de chaque analyse déclarée."""
+    names = {}
+    for analysis in load_analyses(analysis_scripts):
+        if analysis is not None:
+            names[analysis.name] = analysis.script
+            names[analysis.script.split(".")[-1]] = analysis.script
+    return names
+
+
+def jsonable(value):
+    """Convertit un résultat d'analyse en valeurs JSON (NaN devient null)."""
+    if isinstance(value, dict):
+        return {
+            key if isinstance(key, str) else str(key): jsonable(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class AnalysisService:
+    """Analyses servies depuis un processus qui garde les données en mémoire.
+
+    Le fichier de réponses est chargé une fois et reste décodé dans le cache
+    de load_data. Les résultats sont gardés dans un cache LRU indexé par
+    analyse, paramètres et version des données (empreinte SHA-256 du
+    fichier) ; dès que le fichier change, les données sont rechargées et les
+    anciens résultats oubliés. file_path peut aussi désigner plusieurs
+    exports (motif glob ou manifeste, voir utils.waves).
+    """
+
+    def __init__(
+        self,
+        file_path="responses.csv",
+        max_entries=DEFAULT_CACHE_ENTRIES,
+        binary_cache=False,
+    ):
+        self.file_path = file_path
+        self.max_entries = max_entries
+        self.binary_cache = binary_cache
+        self.names = analysis_names()
+        self.results = OrderedDict()
+        self.data_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def warm_up(self):
+        """Importe les scripts (pandas, scipy...) et charge les données."""
+        for script in sorted(set(self.names.values())):
+            importlib.import_module(script)
+        self.refresh()
+
+    def refresh(self):
+        """Recharge les données si le fichier a changé ; renvoie la version."""
+        version = source_digest(self.file_path)[:16]
+        if version != self.data_version:
+            clear_data_cache()
+            self.results.clear()
+            enable_binary_cache(self.binary_cache)
+            load_data(self.file_path)
+            self.data_version = version
+        return version
+
+    def run(self, name, params):
+        """Renvoie (résultat, depuis_le_cache) de l'analyse name.
+
+        Lève KeyError pour une analyse inconnue, ValueError pour un
+        paramètre invalide et RuntimeError pour une analyse en échec.
+        """
+        script = self.names[name]
+        options = self._options(params)
+        version = self.refresh()
+
+        key = (script, tuple(sorted(options.items())), version)
+        result = self.results.get(key)
+        if result is not None:
+            self.results.move_to_end(key)
+            self.hits += 1
+            return result, True
+
+        status, payload = run_script(
+            script, binary_cache=self.binary_cache, source=self.file_path, **options
+        )
+        if status != "ok":
+            raise RuntimeError(payload or f"Aucune fonction d'analyse dans {script}")
+
+        result = jsonable(payload)
+        self.misses += 1
+        self.results[key] = result
+        while len(self.results) > self.max_entries:
+            self.results.popitem(last=False)
+
+        return result, False
+
+    def _options(self, params):
+        options = {"plot": False}
+        for name, value in params.items():
+            if name not in PARAMETERS:
+                raise ValueError(f"Paramètre inconnu : {name}")
+            try:
+                options[name] = PARAMETERS[name](value)
+            except ValueError:
+                raise ValueError(f"Valeur invalide pour {name} : {value}") from None
+        return options
+
+    def status(self):
+        return {
+            "status": "ok",
+            "data_version": self.refresh(),
+            "cache": {
+                "entries": len(self.results),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            },
+        }
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Points d'accès JSON :
+
+    GET /health                  état du service et du cache
+    GET /analyses                liste des analyses et des paramètres
+    GET /analyses/<nom>?facet=…  résultat d'une analyse ("1a" ou nom complet)
+    """
+
+    server_version = "ScreenTimeAnalysis/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        service = self.server.service
+
+        if parts == ["health"]:
+            self._send(200, service.status())
+        elif parts == ["analyses"]:
+            self._send(
+                200,
+                {
+                    "analyses": sorted(set(service.names.values())),
+                    "parameters": sorted(PARAMETERS),
+                },
+            )
+        elif len(parts) == 2 and parts[0] == "analyses":
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            try:
+                result, cached = service.run(parts[1], params)
+            except KeyError:
+                self._send(404, {"error": f"Analyse inconnue : {parts[1]}"})
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+            except RuntimeError as e:
+                self._send(500, {"error": str(e)})
+            else:
+                self._send(
+                    200,
+                    {
+                        "analysis": service.names[parts[1]],
+                        "data_version": service.data_version,
+                        "cached": cached,
+                        "result": result,
+                    },
+                )
+        else:
+            self._send(404, {"error": f"Chemin inconnu : {url.path}"})
+
+    def _send(self, code, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Sur une socket Unix, client_address est une chaîne vide.
+        return self.client_address[0] if self.client_address else "unix"
+
+
+class UnixHTTPServer(socketserver.UnixStreamServer):
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+        self.server_name = "localhost"
+        self.server_port = 0
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+    """Serveur HTTP (ou sur la socket Unix socket_path) exposant service."""
+    if socket_path is not None:
+        server = UnixHTTPServer(socket_path, AnalysisRequestHandler)
+    else:
+        server = HTTPServer((host, port), AnalysisRequestHandler)
+    server.service = service
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sert les analyses en JSON depuis un processus qui garde les données en mémoire."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="adresse d'écoute")
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="port d'écoute (0 : au hasard)"
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        metavar="CHEMIN",
+        help="écoute sur une socket Unix plutôt qu'en TCP",
+    )
+    parser.add_argument(
+        "--cache-entries",
+        type=int,
+        default=DEFAULT_CACHE_ENTRIES,
+        metavar="N",
+        help="nombre de résultats gardés en mémoire",
+    )
+    parser.add_argument(
+        "--binary-cache",
+        action="store_true",
+        help="décode le fichier de réponses dans un cache binaire",
+    )
+    parser.add_argument(
+        "--data",
+        default="responses.csv",
+        metavar="SOURCE",
+        help="fichier de réponses, motif glob ou manifeste .txt des exports à combiner",
+    )
+    args = parser.parse_args()
+
+    service = AnalysisService(
+        file_path=args.data,
+        max_entries=args.cache_entries,
+        binary_cache=args.binary_cache,
+    )
+    service.warm_up()
+
+    server = make_server(service, args.host, args.port, args.socket)
+    where = args.socket or "http://{}:{}".format(*server.server_address[:2])
+    print(f"Analyses disponibles sur {where} (Ctrl+C pour arrêter).")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,200 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lancé par son chemin (python benchmarks/run_benchmarks.py), le script ne
+# voit que le dossier benchmarks : le dépôt est ajouté pour les imports.
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import SIZES, generate_responses, parse_size
+
+BENCHMARK_DIR = os.path.join(ROOT, "benchmarks")
+DATA_DIR = os.path.join(BENCHMARK_DIR, "data")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+DEFAULT_SIZES = ["1k", "100k", "1M"]
+DEFAULT_THRESHOLD = 0.25
+
+RUN_ALL = "run_all_analyses"
+
+
+def _targets():
+    import run_analysis
+
+    return [script.split(".")[-1] for script in run_analysis.analysis_scripts] + [
+        RUN_ALL
+    ]
+
+
+def _peak_rss_mb():
+    # ru_maxrss est en kilo-octets sous Linux et en octets sous macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _measure(target, data_path, options):
+    """Mesure une cible dans un processus neuf : durée et pic de mémoire.
+
+    Le dossier de travail est propre à la mesure et ne contient qu'un lien
+    vers le fichier de données, sous le nom attendu par les scripts ; il est
+    supprimé avec les graphiques produits une fois la mesure faite.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import run_analysis
+    from utils.registry import find_analysis
+
+    if target == RUN_ALL:
+        function = run_analysis.run_all_analyses
+    else:
+        script = f"scripts.{target}"
+        importlib.import_module(script)
+        function = find_analysis(script).function
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        os.symlink(data_path, os.path.join(workdir, "responses.csv"))
+        os.chdir(workdir)
+        os.makedirs("graphs", exist_ok=True)
+        try:
+            rss_before = _peak_rss_mb()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                function(**options)
+            seconds = time.perf_counter() - start
+            peak = _peak_rss_mb()
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "seconds": seconds,
+        "peak_rss_mb": peak,
+        "extra_rss_mb": peak - rss_before,
+    }
+
+
+def measure(target, data_path, options, repeat=1):
+    """Meilleure durée et plus petit pic mémoire sur repeat exécutions."""
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+            runs.append(executor.submit(_measure, target, data_path, options).result())
+
+    return {key: min(run[key] for run in runs) for key in runs[0]}
+
+
+def dataset(size, seed=0):
+    """Chemin du fichier synthétique de size lignes, généré s'il manque."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"responses_{size}_seed{seed}.csv")
+    if not os.path.exists(path):
+        print(f"Génération de {size} réponses synthétiques...")
+        generate_responses(
+            path, parse_size(size), os.path.join(ROOT, "responses.csv"), seed
+        )
+    return path
+
+
+def find_regressions(results, baseline, threshold):
+    """Liste les mesures dépassant la référence de plus de threshold (0.25 = 25 %)."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            if result[metric] > reference[metric] * (1 + threshold):
+                regressions.append((key, metric, reference[metric], result[metric]))
+    return regressions
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, targets=None, plot=True, repeat=1, seed=0):
+    """Mesure chaque cible sur chaque taille ; renvoie {"taille/cible": mesures}."""
+    targets = targets or _targets()
+    options = {"plot": plot}
+    results = {}
+
+    for size in sizes:
+        data_path = dataset(size, seed)
+        for target in targets:
+            result = measure(target, data_path, options, repeat)
+            results[f"{size}/{target}"] = result
+            print(
+                f"{size:>6} {target:<40} {result['seconds']:9.3f} s "
+                f"{result['peak_rss_mb']:9.1f} Mo"
+            )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Mesure la durée et la mémoire des analyses sur des données synthétiques."
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(DEFAULT_SIZES),
+        help=f"tailles séparées par des virgules ({', '.join(SIZES)} ou un nombre de lignes)",
+    )
+    parser.add_argument(
+        "--only",
+        default=None,
+        help="cibles séparées par des virgules (nom du script ou run_all_analyses)",
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--stats-only",
+        action="store_true",
+        help="mesure les analyses sans générer de graphiques",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="écart relatif toléré par rapport à la référence (0.25 = 25 %%)",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="enregistre les mesures comme nouvelle référence",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        sizes=args.sizes.split(","),
+        targets=args.only.split(",") if args.only else None,
+        plot=not args.stats_only,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    for key, metric, reference, value in regressions:
+        print(f"✗ Régression {key} ({metric}) : {reference:.3f} → {value:.3f}")
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Référence enregistrée dans {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
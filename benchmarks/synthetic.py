@@ -0,0 +1,143 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.multi_select import MULTI_SELECT_COLUMNS, split_answer
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+
+TIMESTAMP_FORMAT = "%Y/%m/%d %I:%M:%S %p GMT+2"
+
+
+def parse_size(size):
+    """Accepte un nom de SIZES ("100k") ou un nombre de lignes ("2500")."""
+    if size in SIZES:
+        return SIZES[size]
+    return int(size)
+
+
+class SurveyModel:
+    """Modèle des réponses réelles servant à générer des réponses synthétiques.
+
+    Les colonnes à choix unique sont tirées ensemble en rééchantillonnant des
+    lignes réelles, ce qui conserve les liens entre questions (les
+    non-joueurs n'ont pas d'appareil de jeu, par exemple). Les colonnes à
+    choix multiples sont reconstruites élément par élément avec la fréquence
+    observée de chaque élément, pour obtenir bien plus de combinaisons
+    distinctes que dans le fichier d'origine.
+    """
+
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        self.timestamp_column = self.columns[0]
+        self.rows = df.drop(columns=self.timestamp_column).reset_index(drop=True)
+
+        timestamps = pd.to_datetime(
+            df[self.timestamp_column].str.removesuffix(" GMT+2"),
+            format="%Y/%m/%d %I:%M:%S %p",
+        )
+        self.first_timestamp = timestamps.min()
+        self.last_timestamp = timestamps.max()
+
+        self.multi_select = {}
+        for header in MULTI_SELECT_COLUMNS.values():
+            answered = df[header].dropna()
+            split_answers = [split_answer(answer) for answer in answered]
+
+            items = list(
+                dict.fromkeys(item for answer in split_answers for item in answer)
+            )
+            frequencies = np.array(
+                [sum(item in answer for answer in split_answers) for item in items]
+            ) / max(len(split_answers), 1)
+
+            self.multi_select[header] = (items, frequencies)
+
+    @classmethod
+    def from_csv(cls, file_path="responses.csv"):
+        return cls(pd.read_csv(file_path))
+
+    def _timestamps(self, rng, n, start, total):
+        span = (self.last_timestamp - self.first_timestamp).total_seconds()
+        offsets = (np.arange(start, start + n) + rng.random(n)) * span / total
+        timestamps = self.first_timestamp + pd.to_timedelta(
+            offsets.astype(np.int64), unit="s"
+        )
+        return timestamps.strftime(TIMESTAMP_FORMAT)
+
+    def _multi_select_answers(self, rng, header, answered):
+        """Tire une réponse à choix multiples pour chaque ligne où answered est vrai.
+
+        Les combinaisons sont codées en entiers, de sorte que seules les
+        combinaisons distinctes sont converties en texte.
+        """
+        items, frequencies = self.multi_select[header]
+        n = int(answered.sum())
+
+        bits = rng.random((n, len(items))) < frequencies
+        empty = ~bits.any(axis=1)
+        bits[empty, np.argmax(frequencies)] = True
+
+        codes = bits @ (1 << np.arange(len(items), dtype=np.int64))
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        answers = np.array(
+            [
+                ";".join(item for i, item in enumerate(items) if code >> i & 1)
+                for code in unique_codes
+            ],
+            dtype=object,
+        )
+
+        values = np.full(len(answered), np.nan, dtype=object)
+        values[answered] = answers[inverse]
+        return values
+
+    def sample(self, n, rng, start=0, total=None):
+        """Renvoie n réponses synthétiques avec les mêmes colonnes que l'original."""
+        total = total or n
+        df = self.rows.iloc[rng.integers(0, len(self.rows), n)].reset_index(drop=True)
+
+        for header in self.multi_select:
+            df[header] = self._multi_select_answers(
+                rng, header, df[header].notna().to_numpy()
+            )
+
+        df.insert(0, self.timestamp_column, self._timestamps(rng, n, start, total))
+        return df[self.columns]
+
+
+def generate_responses(
+    output_path, n_rows, source="responses.csv", seed=0, chunksize=100_000
+):
+    """Écrit n_rows réponses synthétiques dans output_path, bloc par bloc.
+
+    Le fichier a les mêmes en-têtes, vocabulaires et format de réponses que
+    source (virgules, fins de ligne CRLF, éléments séparés par ";"). À seed
+    égal, le fichier produit est identique.
+    """
+    model = SurveyModel.from_csv(source)
+    rng = np.random.default_rng(seed)
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        for start in range(0, n_rows, chunksize):
+            chunk = model.sample(min(chunksize, n_rows - start), rng, start, n_rows)
+            chunk.to_csv(f, index=False, header=start == 0, lineterminator="\r\n")
+    os.replace(tmp_path, output_path)
+
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Génère des réponses synthétiques au questionnaire."
+    )
+    parser.add_argument("size", help=f"nombre de lignes ou {', '.join(SIZES)}")
+    parser.add_argument("output", help="fichier CSV à écrire")
+    parser.add_argument("--source", default="responses.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_responses(args.output, parse_size(args.size), args.source, args.seed)
@@ -1,12 +1,53 @@
-import os
+import argparse
 import importlib
+import inspect
+import os
+import pickle
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
 
+from utils.data_loader import (
+    data_source,
+    enable_binary_cache,
+    set_column_projection,
+    set_data_source,
+)
+from utils.facets import facet_column
+from utils.permutation import set_permutation_workers
+from utils.profiling import (
+    PROFILE_KEY,
+    enable_profiling,
+    stage,
+    summarize,
+    take_stages,
+    write_trace,
+)
+from utils.registry import (
+    find_analysis,
+    load_analyses,
+    required_columns,
+    select_analyses,
+)
+from utils.rendering import (
+    DEFAULT_PROFILE,
+    PROFILES,
+    set_render_profile,
+    start_render_queue,
+    stop_render_queue,
+)
+from utils.reservoir import STRATA
+from utils.result_cache import DEFAULT_MAX_BYTES, ResultCache
+from utils.schema import column, columns
+from utils.waves import is_multi_source
+from utils.windows import parse_window
+
 analysis_scripts = [
     "scripts.1a_screen_time_by_age",
     "scripts.1b_age_screen_time_correlation",
+    "scripts.1c_correlation_matrix",
     "scripts.2a_awareness_behavior_change",
     "scripts.2b_smartphone_waking_regulation",
     "scripts.3a_gaming_screen_time",
@@ -15,41 +56,462 @@ analysis_scripts = [
 ]
 
 
-def run_all_analyses():
-    """Exécute tous les scripts d'analyse et collecte les résultats."""
+def run_script(
+    script,
+    binary_cache=False,
+    cache_size=None,
+    profile=False,
+    figure_profile=DEFAULT_PROFILE,
+    source=None,
+    permutation_workers=1,
+    **options,
+):
+    """Exécute un script d'analyse et renvoie (statut, résultat).
+
+    Les options (plot, chunksize, incremental...) ne sont transmises qu'aux
+    fonctions d'analyse qui les acceptent ; les options à None sont ignorées.
+    Avec cache_size, le résultat passe par le cache de résultats et le statut
+    vaut "cached" lorsqu'il en provient. Avec profile=True, les étapes
+    mesurées sont ajoutées au résultat sous la clé PROFILE_KEY. source
+    remplace la source de données par défaut (voir set_data_source).
+    permutation_workers est le nombre de processus des tests de permutation.
+    """
+    if source is not None:
+        set_data_source(source)
+    enable_binary_cache(binary_cache)
+    enable_profiling(profile)
+    set_render_profile(figure_profile)
+    set_permutation_workers(permutation_workers)
+
+    importlib.import_module(script)
+    analysis = find_analysis(script)
+
+    if analysis is None:
+        return "missing", None
+
+    analysis_function = analysis.function
+
+    parameters = inspect.signature(analysis_function).parameters
+    kwargs = {
+        name: value
+        for name, value in options.items()
+        if value is not None and name in parameters
+    }
+
+    try:
+        with stage(script):
+            if cache_size is None:
+                status, result = "ok", analysis_function(**kwargs)
+            else:
+                cache = ResultCache(max_bytes=cache_size)
+                result, hit = cache.call(analysis_function, script, **kwargs)
+                status = "cached" if hit else "ok"
+    except Exception as e:
+        take_stages()
+        return "error", str(e)
+
+    if profile and isinstance(result, dict):
+        result = {**result, PROFILE_KEY: take_stages()}
+
+    return status, result
+
+
+def _record_outcome(results, script, status, payload):
+    if status == "ok":
+        results[script] = payload
+        print(f"✓ Analyse {script} terminée avec succès.")
+    elif status == "cached":
+        results[script] = payload
+        print(f"✓ Analyse {script} reprise depuis le cache.")
+    elif status == "error":
+        print(f"✗ Erreur lors de l'exécution de {script}: {payload}")
+        results[script] = {"error": payload}
+    else:
+        print(f"✗ Impossible de trouver la fonction d'analyse dans {script}.py")
+
+
+def _print_profile(stages):
+    print("\nDurée par étape :")
+    summary = summarize(stages)
+    for name, entry in sorted(
+        summary.items(), key=lambda item: item[1]["duration_ms"], reverse=True
+    ):
+        peak = f"{entry['peak_mb']:9.1f} Mo" if "peak_mb" in entry else ""
+        print(
+            f"  {name:<45} {entry['duration_ms']:10.1f} ms × {entry['calls']:<4} {peak}"
+        )
+
+
+def run_all_analyses(
+    binary_cache=False,
+    jobs=1,
+    threads=1,
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    cache=False,
+    cache_size=DEFAULT_MAX_BYTES,
+    profile=False,
+    trace_path=None,
+    figure_profile=DEFAULT_PROFILE,
+    render_workers=0,
+    facet=None,
+    window=None,
+    sample=None,
+    data=None,
+    only=None,
+    permutation_workers=1,
+):
+    """Exécute tous les scripts d'analyse et collecte les résultats.
+
+    Avec jobs > 1, les analyses tournent dans un pool de processus ; les
+    résultats et les messages restent dans l'ordre de analysis_scripts.
+    Avec threads > 1 (et jobs = 1), elles tournent dans un pool de threads
+    du même processus : les données chargées et la projection des colonnes
+    sont partagées, et les graphiques sont construits sur des figures
+    indépendantes, sans passer par l'état global de pyplot.
+    Avec plot=False, seules les statistiques sont calculées : aucun
+    graphique n'est construit et ni pyplot ni seaborn ne sont importés.
+    Avec chunksize, les analyses lisent le fichier par blocs et ne gardent en
+    mémoire que des statistiques cumulées. Avec incremental=True, ces
+    statistiques sont conservées entre les exécutions et seules les réponses
+    ajoutées depuis la précédente sont lues. Avec cache=True, une analyse
+    dont les données, le code et les paramètres n'ont pas changé renvoie le
+    résultat enregistré sans rien recalculer ni réécrire les graphiques ; le
+    cache est limité à cache_size octets.
+
+    Avec profile=True (ou trace_path), la durée et le pic mémoire de chaque
+    étape (lecture, décodage, groupby, tests, graphiques, savefig...) sont
+    ajoutés à chaque résultat sous la clé PROFILE_KEY ; trace_path reçoit
+    toutes les étapes au format JSON, ou Chrome trace s'il se termine par
+    .trace.json.
+
+    figure_profile choisit la résolution et les formats des graphiques
+    (voir utils.rendering.PROFILES). Avec render_workers > 0 et jobs = 1, les
+    graphiques sont dessinés par un pool de render_workers processus pendant
+    que les analyses suivantes calculent leurs statistiques.
+
+    Avec facet (par exemple "canton", "gender" ou "situation", voir
+    utils.facets.FACET_COLUMNS), chaque analyse renvoie ses résultats pour
+    chaque valeur de la colonne, calculés en une seule lecture des données ;
+    aucun graphique n'est alors généré.
+
+    Avec window ("day", "week" ou une fenêtre glissante "Nd", par exemple
+    "7d", voir utils.windows), chaque analyse renvoie ses résultats pour
+    chaque fenêtre de temps, d'après l'horodatage des réponses ; aucun
+    graphique n'est alors généré. window ne se combine pas avec facet.
+
+    Avec sample (un nombre de réponses), chaque analyse tourne sur un
+    échantillon stratifié par tranche d'âge et canton, tiré en une seule
+    lecture des données et partagé par toutes les analyses : un aperçu
+    rapide des grandes archives. Les résultats habituels sont complétés de
+    bornes d'erreur d'échantillonnage sous la clé utils.preview.SAMPLING_KEY ;
+    aucun graphique n'est alors généré. sample ne se combine ni avec facet,
+    ni avec window, ni avec incremental.
+
+    data remplace responses.csv : un autre fichier, un motif glob
+    ("exports/responses*.csv") ou un manifeste .txt listant les exports.
+    Plusieurs exports sont lus en parallèle (un processus par cœur), alignés
+    sur les intitulés de utils.schema malgré les variations d'en-tête, puis
+    dédoublonnés par horodatage et réponses (voir utils.waves). Le mode
+    incrémental ne s'applique qu'à un fichier unique.
+
+    only limite l'exécution aux analyses nommées (par exemple ["1a", "3b"],
+    voir utils.registry) ; un nom inconnu lève ValueError. Les colonnes
+    déclarées par les analyses retenues sont lues ensemble, en une seule
+    lecture du fichier, puis chaque analyse n'en reçoit que sa projection.
+
+    Les tests de permutation (2b, 3a) répartissent leurs séries de
+    permutations entre permutation_workers processus ; chaque série a sa
+    propre graine, de sorte que les p-valeurs ne dépendent pas de ce nombre.
+    """
+    if window is not None:
+        parse_window(window)
+        if facet is not None:
+            raise ValueError("--facet et --window ne peuvent pas être combinés")
+
+    if sample is not None:
+        if sample < 1:
+            raise ValueError("--sample doit être un nombre de réponses positif")
+        if facet is not None or window is not None or incremental:
+            raise ValueError(
+                "--sample ne se combine pas avec --facet, --window ou --incremental"
+            )
+
+    if data is not None:
+        set_data_source(data)
+    source = data_source()
+    if incremental and is_multi_source(source):
+        raise ValueError("--incremental demande un seul fichier de réponses")
+
+    analyses = load_analyses(analysis_scripts)
+    scripts = analysis_scripts
+    if only is not None:
+        analyses = select_analyses(analyses, only)
+        scripts = [analysis.script for analysis in analyses]
+
     results = {}
+    statuses = []
+    plot = plot and facet is None and window is None and sample is None
+    options = {
+        "plot": plot,
+        "chunksize": chunksize,
+        "incremental": incremental,
+        "facet": facet,
+        "window": window,
+        "sample": sample,
+    }
+    cache_size = cache_size if cache else None
+    profile = profile or trace_path is not None
+
+    enable_binary_cache(binary_cache)
+    enable_profiling(profile)
+    set_render_profile(figure_profile)
+    set_permutation_workers(permutation_workers)
+    extra_columns = []
+    if facet is not None:
+        extra_columns.append(facet_column(facet))
+    if window is not None:
+        extra_columns.append(column("timestamp"))
+    if sample is not None:
+        extra_columns.extend(columns(*STRATA))
+    set_column_projection(
+        required_columns(
+            [analysis for analysis in analyses if analysis is not None],
+            extra_columns,
+        )
+    )
+
+    with stage("run_all_analyses"):
+        print("Exécution de toutes les analyses...")
 
-    print("Exécution de toutes les analyses...")
+        if plot and not os.path.exists("graphs"):
+            os.makedirs("graphs")
 
-    if not os.path.exists("graphs"):
-        os.makedirs("graphs")
+        if jobs > 1 or threads > 1:
+            if jobs > 1:
+                executor = ProcessPoolExecutor(max_workers=jobs)
+            else:
+                executor = ThreadPoolExecutor(max_workers=threads)
 
-    for script in analysis_scripts:
-        print(f"\nExécution de {script}.py...")
+            with executor:
+                futures = [
+                    executor.submit(
+                        run_script,
+                        script,
+                        binary_cache,
+                        cache_size,
+                        profile,
+                        figure_profile,
+                        source,
+                        permutation_workers,
+                        **options,
+                    )
+                    for script in scripts
+                ]
 
-        module = importlib.import_module(script)
+                for script, future in zip(scripts, futures):
+                    print(f"\nExécution de {script}.py...")
 
-        analysis_function = None
-        for item_name in dir(module):
-            if item_name.startswith("analyze_"):
-                analysis_function = getattr(module, item_name)
-                break
+                    # run_script renvoie déjà les échecs des analyses : seuls
+                    # ceux du pool (processus interrompu, résultat non
+                    # sérialisable) sont rattrapés ici.
+                    try:
+                        status, payload = future.result()
+                    except (BrokenProcessPool, pickle.PicklingError) as e:
+                        status, payload = "error", str(e)
 
-        if analysis_function:
-            try:
-                script_results = analysis_function()
-                results[script] = script_results
-                print(f"✓ Analyse {script} terminée avec succès.")
-            except Exception as e:
-                print(f"✗ Erreur lors de l'exécution de {script}: {str(e)}")
-                results[script] = {"error": str(e)}
+                    statuses.append(status)
+                    _record_outcome(results, script, status, payload)
         else:
-            print(f"✗ Impossible de trouver la fonction d'analyse dans {script}.py")
+            if plot and render_workers > 0:
+                start_render_queue(render_workers)
+
+            for script in scripts:
+                print(f"\nExécution de {script}.py...")
+
+                status, payload = run_script(
+                    script,
+                    binary_cache,
+                    cache_size,
+                    profile,
+                    figure_profile,
+                    source,
+                    permutation_workers,
+                    **options,
+                )
+                statuses.append(status)
+                _record_outcome(results, script, status, payload)
+
+            _, render_errors = stop_render_queue()
+            for name, error in render_errors:
+                print(f"✗ Erreur lors du rendu de {name}: {error}")
+
+    set_column_projection(None)
+
+    if cache:
+        hits = statuses.count("cached")
+        misses = statuses.count("ok")
+        print(f"\nCache : {hits} analyse(s) reprise(s), {misses} recalculée(s).")
+
+    if profile:
+        results[PROFILE_KEY] = take_stages()
+        enable_profiling(False)
+
+        stages = results[PROFILE_KEY] + [
+            record
+            for result in results.values()
+            if isinstance(result, dict)
+            for record in result.get(PROFILE_KEY, [])
+        ]
+        _print_profile(stages)
+
+        if trace_path is not None:
+            write_trace(trace_path, stages)
 
     return results
 
 
 if __name__ == "__main__":
-    results = run_all_analyses()
+    parser = argparse.ArgumentParser(description="Exécute toutes les analyses.")
+    parser.add_argument(
+        "--binary-cache",
+        action="store_true",
+        help="décode responses.csv dans un cache binaire réutilisé par les exécutions suivantes",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="nombre de processus utilisés pour exécuter les analyses en parallèle",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        metavar="N",
+        help="exécute les analyses en parallèle dans N threads d'un même processus",
+    )
+    parser.add_argument(
+        "--stats-only",
+        action="store_true",
+        help="calcule uniquement les statistiques, sans générer de graphiques",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        metavar="N",
+        help="lit responses.csv par blocs de N lignes",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="ne lit que les réponses ajoutées depuis la dernière exécution",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="réutilise les résultats et graphiques des analyses inchangées",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        metavar="MO",
+        help="taille maximale du cache de résultats, en mégaoctets",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="mesure la durée et la mémoire de chaque étape des analyses",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="FICHIER",
+        help="enregistre les étapes mesurées (JSON, ou Chrome trace si FICHIER se termine par .trace.json)",
+    )
+    parser.add_argument(
+        "--figure-profile",
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help="preview (72 dpi), print (300 dpi) ou vector (SVG et PDF)",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="dessine les graphiques en arrière-plan avec N processus",
+    )
+    parser.add_argument(
+        "--facet",
+        default=None,
+        metavar="COLONNE",
+        help="calcule les statistiques pour chaque valeur de COLONNE (canton, gender, situation, age)",
+    )
+    parser.add_argument(
+        "--window",
+        default=None,
+        metavar="FENÊTRE",
+        help="calcule les statistiques par jour (day), par semaine (week) ou sur N jours glissants (Nd, par ex. 7d)",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        metavar="N",
+        help="aperçu : analyse un échantillon stratifié (âge × canton) de N réponses, avec bornes d'erreur",
+    )
+    parser.add_argument(
+        "--data",
+        default=None,
+        metavar="SOURCE",
+        help="fichier de réponses, motif glob (par ex. 'exports/responses*.csv') ou manifeste .txt des exports à combiner",
+    )
+    parser.add_argument(
+        "--only",
+        default=None,
+        metavar="ANALYSES",
+        help="n'exécute que les analyses nommées, séparées par des virgules (par ex. 1a,3b)",
+    )
+    parser.add_argument(
+        "--permutation-workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="répartit les tests de permutation entre N processus",
+    )
+    args = parser.parse_args()
+
+    only = None
+    if args.only is not None:
+        only = [name.strip() for name in args.only.split(",") if name.strip()]
+
+    try:
+        results = run_all_analyses(
+            binary_cache=args.binary_cache,
+            jobs=args.jobs,
+            threads=args.threads,
+            plot=not args.stats_only,
+            chunksize=args.chunksize,
+            incremental=args.incremental,
+            cache=args.cache,
+            cache_size=args.cache_size * 1024 * 1024,
+            profile=args.profile,
+            trace_path=args.trace,
+            figure_profile=args.figure_profile,
+            render_workers=args.render_workers,
+            facet=args.facet,
+            window=args.window,
+            sample=args.sample,
+            data=args.data,
+            only=only,
+            permutation_workers=args.permutation_workers,
+        )
+    except ValueError as e:
+        parser.error(str(e))
 
     print("\nAnalyse terminée.")
@@ -1,43 +1,160 @@
-import sys
 import os
+import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
+
+from utils.bootstrap import bootstrap_means
+from utils.count_cube import CountCube, group_summary, one_way_anova, weighted_counts
 from utils.data_loader import (
-    load_data,
-    map_age_to_numeric,
-    map_screen_time_to_numeric,
-    save_figure,
+    decode_ordinal,
     format_hours,
+    load_count_cube,
+    save_figure,
 )
-import numpy as np
-from scipy import stats
+from utils.facets import facet_analysis
+from utils.incremental import accumulate_state
+from utils.posthoc import games_howell
+from utils.preview import sample_analysis
+from utils.profiling import stage, timed
+from utils.registry import register
+from utils.rendering import render_figure
+from utils.schema import columns
+from utils.windows import window_analysis
+
+COLUMNS = columns("age", "screen_time")
+
+
+@timed()
+def plot_screen_time_by_age(age_groups, age_order):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
+    sns.barplot(
+        x="Age",
+        y="Moyenne",
+        data=age_groups,
+        order=age_order,
+        palette="viridis",
+        errorbar=None,
+        ax=ax,
+    )
+
+    ordered_groups = age_groups.set_index("Age").loc[age_order]
+    ax.errorbar(
+        range(len(age_order)),
+        ordered_groups["Moyenne"],
+        yerr=[
+            ordered_groups["Moyenne"] - ordered_groups["IC_Bas"],
+            ordered_groups["IC_Haut"] - ordered_groups["Moyenne"],
+        ],
+        fmt="none",
+        ecolor="black",
+        capsize=5,
+    )
+
+    for i, p in enumerate(ax.patches):
+        height = p.get_height()
+        ax.text(
+            p.get_x() + p.get_width() / 2.0,
+            height + 0.1,
+            format_hours(height),
+            ha="center",
+        )
 
+    ax.set_title("Temps d'écran moyen par tranche d'âge")
+    ax.set_xlabel("Tranche d'âge")
+    ax.set_ylabel("Temps d'écran moyen (heures/jour)")
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
 
-def analyze_screen_time_by_age():
-    df = load_data("responses.csv")
+    save_figure(
+        fig,
+        "1a_screen_time_by_age",
+        "Temps d'écran moyen par tranche d'âge",
+        "Tranche d'âge",
+        "Temps d'écran moyen (heures/jour)",
+    )
 
-    data = df[
-        [
-            "Quel est votre âge ?",
-            "Combien d'heures par jour passez-vous en moyenne devant vos écrans ?",
-        ]
-    ].copy()
+
+@timed()
+def prepare_data(df):
+    data = df[COLUMNS]
 
     data.columns = ["Age", "Temps_Ecran"]
 
-    data["Age_Numeric"] = data["Age"].apply(map_age_to_numeric)
-    data["Temps_Ecran_Numeric"] = data["Temps_Ecran"].apply(map_screen_time_to_numeric)
+    data["Age_Numeric"] = decode_ordinal(data["Age"], "age")
+    data["Temps_Ecran_Numeric"] = decode_ordinal(data["Temps_Ecran"], "screen_time")
 
-    data = data.dropna()
+    return data.dropna()
+
+
+def new_state():
+    return {"answers": CountCube()}
 
-    age_groups = (
-        data.groupby("Age")
-        .agg({"Temps_Ecran_Numeric": ["mean", "std", "count"]})
-        .reset_index()
-    )
+
+@timed()
+def update_state(state, df):
+    state["answers"].update(df[COLUMNS])
+
+
+@register("1a", columns=COLUMNS)
+def analyze_screen_time_by_age(
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    facet=None,
+    window=None,
+    sample=None,
+    state=None,
+):
+    if facet is not None:
+        return facet_analysis(
+            analyze_screen_time_by_age,
+            COLUMNS,
+            new_state,
+            update_state,
+            facet,
+            chunksize=chunksize,
+        )
+
+    if window is not None:
+        return window_analysis(
+            analyze_screen_time_by_age, COLUMNS, new_state, update_state, window
+        )
+
+    if sample is not None:
+        return sample_analysis(
+            analyze_screen_time_by_age,
+            COLUMNS,
+            new_state,
+            update_state,
+            sample,
+            chunksize=chunksize,
+        )
+
+    if chunksize or incremental or state is not None:
+        if state is None:
+            state = accumulate_state(
+                COLUMNS,
+                new_state,
+                update_state,
+                chunksize=chunksize,
+                incremental=incremental,
+            )
+        cube = state["answers"]
+    else:
+        cube = load_count_cube(COLUMNS)
+
+    data, weights = cube.prepared(prepare_data)
+    value_counts = weighted_counts(weights, data["Age"], data["Temps_Ecran_Numeric"])
+
+    with stage("groupby"):
+        summary = group_summary(value_counts)
+        age_groups = summary.rename_axis("Age").reset_index()
 
     age_groups.columns = ["Age", "Moyenne", "Ecart_Type", "Nombre"]
 
@@ -45,6 +162,11 @@ def analyze_screen_time_by_age():
         age_groups["Nombre"]
     )
 
+    with stage("bootstrap"):
+        intervals = bootstrap_means(value_counts)
+    age_groups["IC_Bas"] = age_groups["Age"].map(intervals["ci_low"])
+    age_groups["IC_Haut"] = age_groups["Age"].map(intervals["ci_high"])
+
     age_order = [
         "10-14 ans",
         "15-19 ans",
@@ -58,49 +180,32 @@ def analyze_screen_time_by_age():
 
     age_order = [age for age in age_order if age in age_groups["Age"].values]
 
-    plt.figure(figsize=(12, 8))
-    ax = sns.barplot(
-        x="Age",
-        y="Moyenne",
-        data=age_groups,
-        order=age_order,
-        palette="viridis",
-        errorbar=("ci", 95),
-    )
-
-    for i, p in enumerate(ax.patches):
-        height = p.get_height()
-        ax.text(
-            p.get_x() + p.get_width() / 2.0,
-            height + 0.1,
-            format_hours(height),
-            ha="center",
+    with stage("tests"):
+        ordered_groups = age_groups.set_index("Age").loc[age_order]
+        f_val, p_val = one_way_anova(
+            ordered_groups["Nombre"],
+            ordered_groups["Moyenne"],
+            ordered_groups["Ecart_Type"],
         )
 
-    groups = [
-        data[data["Age"] == age]["Temps_Ecran_Numeric"].values for age in age_order
-    ]
-    f_val, p_val = stats.f_oneway(*groups)
-
-    plt.title("Temps d'écran moyen par tranche d'âge")
-    plt.xlabel("Tranche d'âge")
-    plt.ylabel("Temps d'écran moyen (heures/jour)")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
+    # Les écarts-types et effectifs varient beaucoup d'une tranche d'âge à
+    # l'autre : Games-Howell plutôt que Tukey pour les comparaisons par paires.
+    with stage("posthoc"):
+        age_comparisons = (
+            games_howell(summary.loc[age_order], alpha=0.05) if p_val < 0.05 else None
+        )
 
-    save_figure(
-        plt,
-        "1a_screen_time_by_age",
-        "Temps d'écran moyen par tranche d'âge",
-        "Tranche d'âge",
-        "Temps d'écran moyen (heures/jour)",
-    )
+    if plot:
+        render_figure(plot_screen_time_by_age, age_groups, age_order)
 
     result = {
         "f_statistic": f_val,
         "p_value": p_val,
         "significant_difference": p_val < 0.05,
         "age_groups": age_groups.to_dict(),
+        "age_comparisons": age_comparisons.to_dict()
+        if age_comparisons is not None
+        else None,
     }
 
     return result
@@ -1,45 +1,33 @@
-import sys
 import os
+import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+from utils.count_cube import CountCube, correlations_from_counts, weighted_counts
 from utils.data_loader import (
-    load_data,
-    map_age_to_numeric,
-    map_screen_time_to_numeric,
+    decode_ordinal,
+    load_count_cube,
     save_figure,
 )
-from scipy import stats
-
-
-def analyze_age_screen_time_correlation():
-    df = load_data("responses.csv")
+from utils.facets import facet_analysis
+from utils.incremental import accumulate_state
+from utils.preview import sample_analysis
+from utils.profiling import stage, timed
+from utils.registry import register
+from utils.rendering import render_figure
+from utils.schema import columns
+from utils.windows import window_analysis
 
-    data = df[
-        [
-            "Quel est votre âge ?",
-            "Combien d'heures par jour passez-vous en moyenne devant vos écrans ?",
-        ]
-    ].copy()
+COLUMNS = columns("age", "screen_time")
 
-    data.columns = ["Age", "Temps_Ecran"]
-
-    data["Age_Numeric"] = data["Age"].apply(map_age_to_numeric)
-    data["Temps_Ecran_Numeric"] = data["Temps_Ecran"].apply(map_screen_time_to_numeric)
 
-    data = data.dropna()
+@timed()
+def plot_age_screen_time_correlation(data):
+    import seaborn as sns
+    from matplotlib.figure import Figure
 
-    correlation, p_value = stats.pearsonr(
-        data["Age_Numeric"], data["Temps_Ecran_Numeric"]
-    )
-
-    spearman_corr, spearman_p = stats.spearmanr(
-        data["Age_Numeric"], data["Temps_Ecran_Numeric"]
-    )
-
-    plt.figure(figsize=(12, 8))
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
 
     sns.regplot(
         x="Age_Numeric",
@@ -47,16 +35,105 @@ def analyze_age_screen_time_correlation():
         data=data,
         scatter_kws={"alpha": 0.5},
         line_kws={"color": "red"},
+        ax=ax,
     )
 
     save_figure(
-        plt,
+        fig,
         "1b_age_screen_time_correlation",
         "Corrélation entre l'âge et le temps d'écran quotidien",
         "Âge (années)",
         "Temps d'écran moyen (heures/jour)",
     )
 
+
+@timed()
+def prepare_data(df):
+    data = df[COLUMNS]
+
+    data.columns = ["Age", "Temps_Ecran"]
+
+    data["Age_Numeric"] = decode_ordinal(data["Age"], "age")
+    data["Temps_Ecran_Numeric"] = decode_ordinal(data["Temps_Ecran"], "screen_time")
+
+    return data.dropna()
+
+
+def new_state():
+    return {"answers": CountCube()}
+
+
+@timed()
+def update_state(state, df):
+    state["answers"].update(df[COLUMNS])
+
+
+@register("1b", columns=COLUMNS)
+def analyze_age_screen_time_correlation(
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    facet=None,
+    window=None,
+    sample=None,
+    state=None,
+):
+    if facet is not None:
+        return facet_analysis(
+            analyze_age_screen_time_correlation,
+            COLUMNS,
+            new_state,
+            update_state,
+            facet,
+            chunksize=chunksize,
+        )
+
+    if window is not None:
+        return window_analysis(
+            analyze_age_screen_time_correlation,
+            COLUMNS,
+            new_state,
+            update_state,
+            window,
+        )
+
+    if sample is not None:
+        return sample_analysis(
+            analyze_age_screen_time_correlation,
+            COLUMNS,
+            new_state,
+            update_state,
+            sample,
+            chunksize=chunksize,
+        )
+
+    if chunksize or incremental or state is not None:
+        if state is None:
+            state = accumulate_state(
+                COLUMNS,
+                new_state,
+                update_state,
+                chunksize=chunksize,
+                incremental=incremental,
+            )
+        cube = state["answers"]
+    else:
+        cube = load_count_cube(COLUMNS)
+
+    data, weights = cube.prepared(prepare_data)
+    pairs = weighted_counts(weights, data["Age_Numeric"], data["Temps_Ecran_Numeric"])
+
+    with stage("tests"):
+        pearson, spearman = correlations_from_counts(pairs)
+        correlation, p_value = pearson
+        spearman_corr, spearman_p = spearman
+
+    if plot:
+        render_figure(
+            plot_age_screen_time_correlation,
+            pairs.index.repeat(pairs.to_numpy()).to_frame(index=False),
+        )
+
     result = {
         "pearson_correlation": correlation,
         "pearson_p_value": p_value,
@@ -0,0 +1,168 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.correlation import PairwiseTables, correlation_matrix, cramers_v
+from utils.data_loader import load_data, save_figure
+from utils.facets import facet_analysis
+from utils.incremental import accumulate_state
+from utils.preview import sample_analysis
+from utils.profiling import stage, timed
+from utils.registry import register
+from utils.rendering import render_figure
+from utils.schema import NOMINAL_KEYS, ORDINAL_SCALES, column, columns, question_key
+from utils.windows import window_analysis
+
+ORDINAL_COLUMNS = columns(*ORDINAL_SCALES)
+NOMINAL_COLUMNS = columns(*NOMINAL_KEYS)
+COLUMNS = ORDINAL_COLUMNS + NOMINAL_COLUMNS
+
+SCALES = {column(key): list(scale) for key, scale in ORDINAL_SCALES.items()}
+SCORES = {column(key): list(scale.values()) for key, scale in ORDINAL_SCALES.items()}
+
+LABELS = {
+    "age": "Âge",
+    "screen_time": "Temps d'écran",
+    "social_media_time": "Réseaux sociaux",
+    "work_time": "Écrans (études/travail)",
+    "gaming_time": "Jeux vidéo",
+    "streaming_time": "Streaming",
+    "check_frequency": "Vérification des appareils",
+    "balance": "Équilibre numérique",
+}
+
+
+@timed()
+def plot_correlation_matrix(spearman):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    labels = [LABELS.get(key, key) for key in spearman.index]
+
+    fig = Figure(figsize=(12, 10))
+    ax = fig.subplots()
+
+    sns.heatmap(
+        spearman,
+        annot=True,
+        fmt=".2f",
+        cmap="vlag",
+        vmin=-1,
+        vmax=1,
+        xticklabels=labels,
+        yticklabels=labels,
+        cbar_kws={"label": "ρ de Spearman"},
+        ax=ax,
+    )
+
+    save_figure(
+        fig,
+        "1c_correlation_matrix",
+        "Corrélations de Spearman entre les questions ordinales",
+        "",
+        "",
+    )
+
+
+def _by_key(matrix):
+    """Matrice indexée par les clés courtes des questions (voir utils.schema)."""
+    keys = [question_key(header) for header in matrix.index]
+    return matrix.set_axis(keys, axis=0).set_axis(keys, axis=1)
+
+
+def new_state():
+    return {"tables": PairwiseTables(SCALES)}
+
+
+@timed()
+def update_state(state, df):
+    state["tables"].update(df[COLUMNS])
+
+
+@register("1c", columns=COLUMNS)
+def analyze_correlation_matrix(
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    facet=None,
+    window=None,
+    sample=None,
+    state=None,
+):
+    if facet is not None:
+        return facet_analysis(
+            analyze_correlation_matrix,
+            COLUMNS,
+            new_state,
+            update_state,
+            facet,
+            chunksize=chunksize,
+        )
+
+    if window is not None:
+        return window_analysis(
+            analyze_correlation_matrix, COLUMNS, new_state, update_state, window
+        )
+
+    if sample is not None:
+        return sample_analysis(
+            analyze_correlation_matrix,
+            COLUMNS,
+            new_state,
+            update_state,
+            sample,
+            chunksize=chunksize,
+        )
+
+    if chunksize or incremental or state is not None:
+        if state is None:
+            state = accumulate_state(
+                COLUMNS,
+                new_state,
+                update_state,
+                chunksize=chunksize,
+                incremental=incremental,
+            )
+        tables = state["tables"]
+    else:
+        tables = PairwiseTables.from_frame(load_data(columns=COLUMNS), SCALES)
+
+    with stage("tests"):
+        correlations = {
+            method: correlation_matrix(tables, ORDINAL_COLUMNS, method, SCORES)
+            for method in ("pearson", "spearman", "kendall")
+        }
+        association, association_p = cramers_v(tables, NOMINAL_COLUMNS)
+
+    spearman, spearman_p = (_by_key(matrix) for matrix in correlations["spearman"])
+
+    if plot:
+        render_figure(plot_correlation_matrix, spearman)
+
+    # stack() garde les NaN (pandas 3) : les paires hors du masque sont
+    # retirées explicitement.
+    upper = np.triu(np.ones(spearman.shape, dtype=bool), 1)
+    pairs = spearman.where(upper & (spearman_p < 0.05)).stack().dropna()
+    strongest = pairs.abs().sort_values(ascending=False).head(5).index
+
+    result = {
+        "strongest_spearman_pairs": [
+            {"pair": list(pair), "spearman_correlation": spearman.loc[pair]}
+            for pair in strongest
+        ],
+        "cramers_v": _by_key(association).to_dict(),
+        "cramers_v_p_values": _by_key(association_p).to_dict(),
+    }
+    for method, (matrix, p_values) in correlations.items():
+        result[f"{method}_correlations"] = _by_key(matrix).to_dict()
+        result[f"{method}_p_values"] = _by_key(p_values).to_dict()
+
+    return result
+
+
+if __name__ == "__main__":
+    results = analyze_correlation_matrix()
+    print("Analyse 1.c terminée avec succès.")
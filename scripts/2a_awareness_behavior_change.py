@@ -1,65 +1,36 @@
-import sys
 import os
+import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import matplotlib.pyplot as plt
-from utils.data_loader import load_data, save_figure
-
-
-def analyze_awareness_behavior_change():
-    df = load_data("responses.csv")
-
-    columns = [
-        "Pensez-vous que votre temps d'écran a un impact sur votre :",
-        "Avez-vous déjà essayé de réduire votre temps d'écran ?",
-        "Pensez-vous que votre temps d'écran est trop élevé ?",
-        "Quelles stratégies utilisez-vous actuellement pour réguler votre temps d'écran ?",
-    ]
-
-    data = df[columns].copy()
-
-    data.columns = [
-        "Impact_Percu",
-        "Tentative_Reduction",
-        "Conscience_Temps_Eleve",
-        "Strategies_Regulation",
-    ]
-
-    has_impact = data["Impact_Percu"].notna() & (data["Impact_Percu"] != "")
-    concerned_about_time = data["Conscience_Temps_Eleve"] == "Oui"
-
-    aware_of_issues = has_impact | concerned_about_time
-
-    attempted_reduction = data["Tentative_Reduction"].str.contains("Oui", na=False)
-    unsuccessful_reduction = data["Tentative_Reduction"] == "Oui, sans succès"
-    no_strategy = data["Strategies_Regulation"].isin(["Aucune stratégie", ""])
-
-    aware_count = aware_of_issues.sum()
-    total_count = len(data)
-    aware_percentage = (aware_count / total_count) * 100
-
-    aware_and_tried = aware_of_issues & attempted_reduction
-    aware_and_unsuccessful = aware_of_issues & unsuccessful_reduction
-    aware_and_no_strategy = aware_of_issues & no_strategy
-
-    aware_tried_percentage = (
-        (aware_and_tried.sum() / aware_count) * 100 if aware_count > 0 else 0
-    )
-    aware_unsuccessful_percentage = (
-        (aware_and_unsuccessful.sum() / aware_count) * 100 if aware_count > 0 else 0
-    )
-    aware_no_strategy_percentage = (
-        (aware_and_no_strategy.sum() / aware_count) * 100 if aware_count > 0 else 0
-    )
-
-    failed_among_tried = (
-        unsuccessful_reduction.sum() / attempted_reduction.sum()
-        if attempted_reduction.sum() > 0
-        else 0
-    )
+import pandas as pd
 
-    fig = plt.figure(figsize=(16, 10))
+from utils.data_loader import load_data, save_figure
+from utils.facets import facet_analysis
+from utils.incremental import accumulate_state
+from utils.preview import sample_analysis
+from utils.profiling import timed
+from utils.registry import register
+from utils.rendering import render_figure
+from utils.schema import columns
+from utils.streaming import RunningCounts
+from utils.windows import window_analysis
+
+COLUMNS = columns(
+    "perceived_impact", "reduction_attempt", "too_high", "regulation_strategies"
+)
+
+
+@timed()
+def plot_awareness_behavior_change(
+    aware_percentage,
+    aware_tried_percentage,
+    failed_among_tried,
+    aware_no_strategy_percentage,
+):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(16, 10))
 
     gs = fig.add_gridspec(2, 2, hspace=0.4, wspace=0.3)
 
@@ -113,20 +84,138 @@ def analyze_awareness_behavior_change():
     )
     ax4.set_title("Utilisation de stratégies\n(parmi les conscients)")
 
-    plt.suptitle(
+    fig.suptitle(
         "Conscience des problèmes liés aux écrans et difficulté à modifier les comportements",
         fontsize=16,
         y=0.98,
     )
 
     save_figure(
-        plt,
+        fig,
         "2a_awareness_behavior_change",
         "Conscience des problèmes liés aux écrans et difficulté à modifier les comportements",
         "",
         "",
     )
 
+
+@timed()
+def count_answers(df):
+    data = df[COLUMNS]
+
+    data.columns = [
+        "Impact_Percu",
+        "Tentative_Reduction",
+        "Conscience_Temps_Eleve",
+        "Strategies_Regulation",
+    ]
+
+    has_impact = data["Impact_Percu"].notna() & (data["Impact_Percu"] != "")
+    concerned_about_time = data["Conscience_Temps_Eleve"] == "Oui"
+
+    aware_of_issues = has_impact | concerned_about_time
+
+    attempted_reduction = data["Tentative_Reduction"].str.contains("Oui", na=False)
+    unsuccessful_reduction = data["Tentative_Reduction"] == "Oui, sans succès"
+    no_strategy = data["Strategies_Regulation"].isin(["Aucune stratégie", ""])
+
+    return pd.Series(
+        {
+            "total": len(data),
+            "aware": aware_of_issues.sum(),
+            "attempted": attempted_reduction.sum(),
+            "unsuccessful": unsuccessful_reduction.sum(),
+            "aware_and_tried": (aware_of_issues & attempted_reduction).sum(),
+            "aware_and_unsuccessful": (aware_of_issues & unsuccessful_reduction).sum(),
+            "aware_and_no_strategy": (aware_of_issues & no_strategy).sum(),
+        }
+    )
+
+
+def new_state():
+    return {"answers": RunningCounts()}
+
+
+@timed()
+def update_state(state, df):
+    state["answers"].add_counts(count_answers(df))
+
+
+@register("2a", columns=COLUMNS)
+def analyze_awareness_behavior_change(
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    facet=None,
+    window=None,
+    sample=None,
+    state=None,
+):
+    if facet is not None:
+        return facet_analysis(
+            analyze_awareness_behavior_change,
+            COLUMNS,
+            new_state,
+            update_state,
+            facet,
+            chunksize=chunksize,
+        )
+
+    if window is not None:
+        return window_analysis(
+            analyze_awareness_behavior_change, COLUMNS, new_state, update_state, window
+        )
+
+    if sample is not None:
+        return sample_analysis(
+            analyze_awareness_behavior_change,
+            COLUMNS,
+            new_state,
+            update_state,
+            sample,
+            chunksize=chunksize,
+        )
+
+    if chunksize or incremental or state is not None:
+        if state is None:
+            state = accumulate_state(
+                COLUMNS,
+                new_state,
+                update_state,
+                chunksize=chunksize,
+                incremental=incremental,
+            )
+        counts = state["answers"].counts
+    else:
+        counts = count_answers(load_data(columns=COLUMNS))
+
+    aware_count = counts["aware"]
+    total_count = counts["total"]
+    aware_percentage = (aware_count / total_count) * 100
+
+    aware_tried_percentage = (
+        (counts["aware_and_tried"] / aware_count) * 100 if aware_count > 0 else 0
+    )
+    aware_unsuccessful_percentage = (
+        (counts["aware_and_unsuccessful"] / aware_count) * 100 if aware_count > 0 else 0
+    )
+    aware_no_strategy_percentage = (
+        (counts["aware_and_no_strategy"] / aware_count) * 100 if aware_count > 0 else 0
+    )
+
+    failed_among_tried = (
+        counts["unsuccessful"] / counts["attempted"] if counts["attempted"] > 0 else 0
+    )
+
+    if plot:
+        render_figure(
+            plot_awareness_behavior_change,
+            aware_percentage,
+            aware_tried_percentage,
+            failed_among_tried,
+            aware_no_strategy_percentage,
+        )
+
     result = {
         "aware_of_issues_percentage": aware_percentage,
         "attempted_reduction_percentage": aware_tried_percentage,
@@ -1,44 +1,55 @@
-import sys
 import os
+import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
+
+from utils.bootstrap import bootstrap_mean_difference, bootstrap_means
+from utils.count_cube import CountCube, group_summary, weighted_counts
 from utils.data_loader import (
-    load_data,
-    map_screen_time_to_numeric,
-    save_figure,
+    decode_ordinal,
     format_hours,
+    load_count_cube,
+    save_figure,
 )
+from utils.facets import facet_analysis
+from utils.incremental import accumulate_state
+from utils.permutation import permutation_test
+from utils.preview import sample_analysis
+from utils.profiling import stage, timed
+from utils.registry import register
+from utils.rendering import render_figure
+from utils.schema import columns
+from utils.windows import window_analysis
 
+COLUMNS = columns("phone_on_waking", "screen_time")
 
-def analyze_smartphone_waking_regulation():
-    df = load_data("responses.csv")
 
-    columns = [
-        "Allez-vous directement sur votre smartphone dès le réveil ?",
-        "Combien d'heures par jour passez-vous en moyenne devant vos écrans ?",
-    ]
-
-    data = df[columns].copy()
-
-    data.columns = ["Smartphone_Reveil", "Temps_Ecran"]
+@timed()
+def plot_smartphone_waking_regulation(
+    reveil_screen_time, non_reveil_screen_time, reveil_ci, non_reveil_ci
+):
+    import seaborn as sns
+    from matplotlib.figure import Figure
 
-    data["Temps_Ecran_Numeric"] = data["Temps_Ecran"].apply(map_screen_time_to_numeric)
-
-    reveil_smartphone = data[data["Smartphone_Reveil"] == "Oui"]
-    non_reveil_smartphone = data[data["Smartphone_Reveil"] == "Non"]
-
-    reveil_screen_time = reveil_smartphone["Temps_Ecran_Numeric"].mean()
-    non_reveil_screen_time = non_reveil_smartphone["Temps_Ecran_Numeric"].mean()
-
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
 
     categories = ["Smartphone dès le réveil", "Pas de smartphone au réveil"]
     values = [reveil_screen_time, non_reveil_screen_time]
+    errors = [
+        [reveil_screen_time - reveil_ci[0], non_reveil_screen_time - non_reveil_ci[0]],
+        [reveil_ci[1] - reveil_screen_time, non_reveil_ci[1] - non_reveil_screen_time],
+    ]
 
-    bars = ax.bar(categories, values, color=sns.color_palette("viridis", 2))
+    bars = ax.bar(
+        categories,
+        values,
+        yerr=errors,
+        capsize=10,
+        color=sns.color_palette("viridis", 2),
+    )
 
     for bar in bars:
         height = bar.get_height()
@@ -54,16 +65,121 @@ def analyze_smartphone_waking_regulation():
     ax.set_title("Temps d'écran moyen selon l'utilisation du smartphone au réveil")
 
     save_figure(
-        plt,
+        fig,
         "2b_smartphone_waking_regulation_screentime",
         "Temps d'écran moyen selon l'utilisation du smartphone au réveil",
         "",
         "Temps d'écran moyen (heures/jour)",
     )
 
-    total_respondents = len(data.dropna(subset=["Smartphone_Reveil"]))
-    reveil_count = len(reveil_smartphone)
-    non_reveil_count = len(non_reveil_smartphone)
+
+@timed()
+def prepare_data(df):
+    data = df[COLUMNS]
+
+    data.columns = ["Smartphone_Reveil", "Temps_Ecran"]
+
+    data["Temps_Ecran_Numeric"] = decode_ordinal(data["Temps_Ecran"], "screen_time")
+
+    return data
+
+
+def new_state():
+    return {"answers": CountCube()}
+
+
+@timed()
+def update_state(state, df):
+    state["answers"].update(df[COLUMNS])
+
+
+@register("2b", columns=COLUMNS)
+def analyze_smartphone_waking_regulation(
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    facet=None,
+    window=None,
+    sample=None,
+    state=None,
+):
+    if facet is not None:
+        return facet_analysis(
+            analyze_smartphone_waking_regulation,
+            COLUMNS,
+            new_state,
+            update_state,
+            facet,
+            chunksize=chunksize,
+        )
+
+    if window is not None:
+        return window_analysis(
+            analyze_smartphone_waking_regulation,
+            COLUMNS,
+            new_state,
+            update_state,
+            window,
+        )
+
+    if sample is not None:
+        return sample_analysis(
+            analyze_smartphone_waking_regulation,
+            COLUMNS,
+            new_state,
+            update_state,
+            sample,
+            chunksize=chunksize,
+        )
+
+    if chunksize or incremental or state is not None:
+        if state is None:
+            state = accumulate_state(
+                COLUMNS,
+                new_state,
+                update_state,
+                chunksize=chunksize,
+                incremental=incremental,
+            )
+        cube = state["answers"]
+    else:
+        cube = load_count_cube(COLUMNS)
+
+    data, weights = cube.prepared(prepare_data)
+    value_counts = weighted_counts(
+        weights, data["Smartphone_Reveil"], data["Temps_Ecran_Numeric"]
+    )
+    answer_counts = weighted_counts(weights, data["Smartphone_Reveil"])
+
+    mean_screen_time = group_summary(value_counts)["mean"]
+    reveil_screen_time = mean_screen_time.get("Oui", np.nan)
+    non_reveil_screen_time = mean_screen_time.get("Non", np.nan)
+
+    total_respondents = answer_counts.sum()
+    reveil_count = answer_counts.get("Oui", 0)
+    non_reveil_count = answer_counts.get("Non", 0)
+
+    with stage("bootstrap"):
+        intervals = bootstrap_means(value_counts)
+        _, *difference_ci = bootstrap_mean_difference(value_counts, "Oui", "Non")
+
+    with stage("permutation"):
+        permutation = permutation_test(value_counts, "Oui", "Non")
+
+    # Un groupe sans réponse (facette, fenêtre) a un intervalle NaN.
+    intervals = intervals.reindex(["Oui", "Non"])
+    reveil_ci = tuple(intervals.loc["Oui", ["ci_low", "ci_high"]])
+    non_reveil_ci = tuple(intervals.loc["Non", ["ci_low", "ci_high"]])
+
+    if plot:
+        render_figure(
+            plot_smartphone_waking_regulation,
+            reveil_screen_time,
+            non_reveil_screen_time,
+            reveil_ci,
+            non_reveil_ci,
+        )
+
     reveil_percentage = (reveil_count / total_respondents) * 100
     non_reveil_percentage = (non_reveil_count / total_respondents) * 100
 
@@ -72,7 +188,11 @@ def analyze_smartphone_waking_regulation():
         "non_reveil_smartphone_percentage": non_reveil_percentage,
         "reveil_screen_time": reveil_screen_time,
         "non_reveil_screen_time": non_reveil_screen_time,
+        "reveil_ci": reveil_ci,
+        "non_reveil_ci": non_reveil_ci,
         "difference": reveil_screen_time - non_reveil_screen_time,
+        "difference_ci": tuple(difference_ci),
+        "permutation_test": permutation,
     }
 
     return result
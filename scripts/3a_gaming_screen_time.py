@@ -1,68 +1,46 @@
-import sys
 import os
+import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
+from scipy import stats
+
+from utils.bootstrap import bootstrap_mean_difference, bootstrap_means
+from utils.count_cube import CountCube, group_summary, weighted_counts
 from utils.data_loader import (
-    load_data,
-    map_screen_time_to_numeric,
-    save_figure,
+    decode_ordinal,
     format_hours,
+    load_count_cube,
+    save_figure,
 )
-from scipy import stats
-import numpy as np
-
+from utils.facets import facet_analysis
+from utils.incremental import accumulate_state
+from utils.permutation import permutation_test
+from utils.preview import sample_analysis
+from utils.profiling import stage, timed
+from utils.registry import register
+from utils.rendering import render_figure
+from utils.schema import columns
+from utils.windows import window_analysis
 
-def analyze_gaming_screen_time():
-    df = load_data("responses.csv")
-
-    columns = [
-        "Jouez-vous aux jeux vidéo ?",
-        "Combien d'heures par jour passez-vous en moyenne devant vos écrans ?",
-        "Combien d'heures en moyenne par jour passez-vous devant les jeux vidéos ?",
-    ]
-
-    data = df[columns].copy()
-
-    data.columns = ["Joue_Jeux_Video", "Temps_Ecran", "Temps_Jeux_Video"]
+COLUMNS = columns("gaming", "screen_time", "gaming_time")
 
-    data["Temps_Ecran_Numeric"] = data["Temps_Ecran"].apply(map_screen_time_to_numeric)
 
-    gamers = data[data["Joue_Jeux_Video"] == "Oui"].copy()
-    non_gamers = data[data["Joue_Jeux_Video"] == "Non"].copy()
+@timed()
+def plot_gaming_screen_time(gamer_mean, non_gamer_mean, gamer_ci, non_gamer_ci):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Rectangle
 
-    gamer_screen_time = gamers["Temps_Ecran_Numeric"].dropna()
-    non_gamer_screen_time = non_gamers["Temps_Ecran_Numeric"].dropna()
-
-    gamer_mean = gamer_screen_time.mean()
-    non_gamer_mean = non_gamer_screen_time.mean()
-
-    gamer_std = gamer_screen_time.std()
-    non_gamer_std = non_gamer_screen_time.std()
-
-    t_stat, p_value = stats.ttest_ind(
-        gamer_screen_time, non_gamer_screen_time, equal_var=False
-    )
-
-    pooled_std = np.sqrt(
-        (
-            (len(gamer_screen_time) - 1) * gamer_std**2
-            + (len(non_gamer_screen_time) - 1) * non_gamer_std**2
-        )
-        / (len(gamer_screen_time) + len(non_gamer_screen_time) - 2)
-    )
-
-    cohen_d = (gamer_mean - non_gamer_mean) / pooled_std if pooled_std > 0 else 0
-
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
 
     categories = ["Joueurs de jeux vidéo", "Non-joueurs"]
     values = [gamer_mean, non_gamer_mean]
     errors = [
-        gamer_std / np.sqrt(len(gamer_screen_time)),
-        non_gamer_std / np.sqrt(len(non_gamer_screen_time)),
+        [gamer_mean - gamer_ci[0], non_gamer_mean - non_gamer_ci[0]],
+        [gamer_ci[1] - gamer_mean, non_gamer_ci[1] - non_gamer_mean],
     ]
 
     bars = ax.bar(
@@ -75,7 +53,7 @@ def analyze_gaming_screen_time():
 
     colors = sns.color_palette("viridis", 2)
     legend_elements = [
-        plt.Rectangle(
+        Rectangle(
             (0, 0),
             1,
             1,
@@ -90,16 +68,141 @@ def analyze_gaming_screen_time():
     ax.set_title("Temps d'écran moyen selon la pratique des jeux vidéo")
 
     save_figure(
-        plt,
+        fig,
         "3a_gaming_screen_time",
         "Temps d'écran moyen selon la pratique des jeux vidéo",
         "",
         "Temps d'écran moyen (heures/jour)",
     )
 
-    total_respondents = len(data.dropna(subset=["Joue_Jeux_Video"]))
-    gamer_count = len(gamers)
-    non_gamer_count = len(non_gamers)
+
+@timed()
+def prepare_data(df):
+    data = df[COLUMNS]
+
+    data.columns = ["Joue_Jeux_Video", "Temps_Ecran", "Temps_Jeux_Video"]
+
+    data["Temps_Ecran_Numeric"] = decode_ordinal(data["Temps_Ecran"], "screen_time")
+
+    return data
+
+
+def new_state():
+    return {"answers": CountCube()}
+
+
+@timed()
+def update_state(state, df):
+    state["answers"].update(df[COLUMNS])
+
+
+@register("3a", columns=COLUMNS)
+def analyze_gaming_screen_time(
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    facet=None,
+    window=None,
+    sample=None,
+    state=None,
+):
+    if facet is not None:
+        return facet_analysis(
+            analyze_gaming_screen_time,
+            COLUMNS,
+            new_state,
+            update_state,
+            facet,
+            chunksize=chunksize,
+        )
+
+    if window is not None:
+        return window_analysis(
+            analyze_gaming_screen_time, COLUMNS, new_state, update_state, window
+        )
+
+    if sample is not None:
+        return sample_analysis(
+            analyze_gaming_screen_time,
+            COLUMNS,
+            new_state,
+            update_state,
+            sample,
+            chunksize=chunksize,
+        )
+
+    if chunksize or incremental or state is not None:
+        if state is None:
+            state = accumulate_state(
+                COLUMNS,
+                new_state,
+                update_state,
+                chunksize=chunksize,
+                incremental=incremental,
+            )
+        cube = state["answers"]
+    else:
+        cube = load_count_cube(COLUMNS)
+
+    data, weights = cube.prepared(prepare_data)
+    value_counts = weighted_counts(
+        weights, data["Joue_Jeux_Video"], data["Temps_Ecran_Numeric"]
+    )
+    answer_counts = weighted_counts(weights, data["Joue_Jeux_Video"])
+
+    summary = group_summary(value_counts).reindex(["Oui", "Non"])
+
+    gamer_mean, gamer_std, gamer_n = summary.loc["Oui", ["mean", "std", "count"]]
+    non_gamer_mean, non_gamer_std, non_gamer_n = summary.loc[
+        "Non", ["mean", "std", "count"]
+    ]
+
+    with stage("tests"):
+        t_stat, p_value = stats.ttest_ind_from_stats(
+            gamer_mean,
+            gamer_std,
+            gamer_n,
+            non_gamer_mean,
+            non_gamer_std,
+            non_gamer_n,
+            equal_var=False,
+        )
+
+    total_respondents = answer_counts.sum()
+    gamer_count = answer_counts.get("Oui", 0)
+    non_gamer_count = answer_counts.get("Non", 0)
+
+    with stage("bootstrap"):
+        intervals = bootstrap_means(value_counts)
+        _, *difference_ci = bootstrap_mean_difference(value_counts, "Oui", "Non")
+
+    with stage("permutation"):
+        permutation = permutation_test(value_counts, "Oui", "Non")
+
+    # Un groupe sans réponse (facette, fenêtre) a un intervalle NaN.
+    intervals = intervals.reindex(["Oui", "Non"])
+    gamer_ci = tuple(intervals.loc["Oui", ["ci_low", "ci_high"]])
+    non_gamer_ci = tuple(intervals.loc["Non", ["ci_low", "ci_high"]])
+
+    pooled_std = np.sqrt(
+        ((gamer_n - 1) * gamer_std**2 + (non_gamer_n - 1) * non_gamer_std**2)
+        / (gamer_n + non_gamer_n - 2)
+    )
+
+    if np.isnan(pooled_std):
+        cohen_d = np.nan
+    else:
+        cohen_d = (gamer_mean - non_gamer_mean) / pooled_std if pooled_std > 0 else 0
+
+    if plot:
+        render_figure(
+            plot_gaming_screen_time,
+            gamer_mean,
+            non_gamer_mean,
+            gamer_ci,
+            non_gamer_ci,
+        )
+
     gamer_percentage = (gamer_count / total_respondents) * 100
     non_gamer_percentage = (non_gamer_count / total_respondents) * 100
 
@@ -108,7 +211,11 @@ def analyze_gaming_screen_time():
         "non_gamer_percentage": non_gamer_percentage,
         "gamer_mean_screen_time": gamer_mean,
         "non_gamer_mean_screen_time": non_gamer_mean,
+        "gamer_ci": gamer_ci,
+        "non_gamer_ci": non_gamer_ci,
         "difference": gamer_mean - non_gamer_mean,
+        "difference_ci": tuple(difference_ci),
+        "permutation_test": permutation,
         "t_statistic": t_stat,
         "p_value": p_value,
         "cohen_d": cohen_d,
@@ -1,82 +1,34 @@
-import sys
 import os
+import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+from utils.count_cube import CountCube, weighted_mean
 from utils.data_loader import (
-    load_data,
-    map_screen_time_to_numeric,
-    save_figure,
+    decode_ordinal,
     format_hours,
+    load_count_cube,
+    save_figure,
 )
+from utils.facets import facet_analysis
+from utils.incremental import accumulate_state
+from utils.preview import sample_analysis
+from utils.profiling import timed
+from utils.registry import register
+from utils.rendering import render_figure
+from utils.schema import columns
+from utils.windows import window_analysis
 
+COLUMNS = columns("work_screens", "work_time", "screen_time")
 
-def analyze_work_screen_time():
-    df = load_data("responses.csv")
-
-    columns = [
-        "Utilisez-vous des écrans pour vos études ou votre travail ?",
-        "Combien d'heures par jour utilisez-vous des écrans pour vos études/travail ?",
-        "Combien d'heures par jour passez-vous en moyenne devant vos écrans ?",
-    ]
-
-    data = df[columns].copy()
-
-    data.columns = ["Utilisation_Travail", "Temps_Ecran_Travail", "Temps_Ecran_Total"]
-
-    data_work = data[data["Utilisation_Travail"] == "Oui"].copy()
-
-    def map_work_time_to_numeric(work_time):
-        time_mapping = {
-            "Moins de 1 heure": 0.5,
-            "1-2 heures": 1.5,
-            "2-3 heures": 2.5,
-            "3-4 heures": 3.5,
-            "4-5 heures": 4.5,
-            "5-6 heures": 5.5,
-            "6-7 heures": 6.5,
-            "7-8 heures": 7.5,
-            "Plus de 8 heures": 8.5,
-        }
-        return time_mapping.get(work_time, None)
-
-    data_work["Temps_Ecran_Travail_Numeric"] = data_work["Temps_Ecran_Travail"].apply(
-        map_work_time_to_numeric
-    )
-    data_work["Temps_Ecran_Total_Numeric"] = data_work["Temps_Ecran_Total"].apply(
-        map_screen_time_to_numeric
-    )
-
-    data_work = data_work.dropna(
-        subset=["Temps_Ecran_Travail_Numeric", "Temps_Ecran_Total_Numeric"]
-    )
-
-    data_work["Temps_Ecran_Personnel"] = (
-        data_work["Temps_Ecran_Total_Numeric"]
-        - data_work["Temps_Ecran_Travail_Numeric"]
-    )
-
-    data_work["Temps_Ecran_Personnel"] = data_work["Temps_Ecran_Personnel"].clip(
-        lower=0
-    )
-
-    mean_total = data_work["Temps_Ecran_Total_Numeric"].mean()
-    mean_work = data_work["Temps_Ecran_Travail_Numeric"].mean()
-    mean_personal = data_work["Temps_Ecran_Personnel"].mean()
 
-    sum_parts = mean_work + mean_personal
+@timed()
+def plot_work_screen_time(mean_total, mean_work, mean_personal):
+    import seaborn as sns
+    from matplotlib.figure import Figure
 
-    if sum_parts != mean_total and sum_parts > 0:
-        scaling_factor = mean_total / sum_parts
-        mean_work = mean_work * scaling_factor
-        mean_personal = mean_personal * scaling_factor
-
-    pct_work = (mean_work / mean_total) * 100
-    pct_personal = (mean_personal / mean_total) * 100
-
-    fig, ax = plt.subplots(figsize=(12, 10))
+    fig = Figure(figsize=(12, 10))
+    ax = fig.subplots()
 
     labels = ["Professionnel", "Personnel"]
     sizes = [mean_work, mean_personal]
@@ -96,17 +48,18 @@ def analyze_work_screen_time():
 
     ax.axis("equal")
 
-    plt.title("Répartition du temps d'écran entre usage professionnel et personnel")
+    ax.set_title("Répartition du temps d'écran entre usage professionnel et personnel")
 
     save_figure(
-        plt,
+        fig,
         "3b_work_screen_time_pie",
         "Répartition du temps d'écran entre usage professionnel et personnel",
         "",
         "",
     )
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
 
     categories = [
         "Temps d'écran total",
@@ -133,19 +86,135 @@ def analyze_work_screen_time():
     ax.set_title("Répartition du temps d'écran quotidien")
 
     save_figure(
-        plt,
+        fig,
         "3b_work_screen_time_bars",
         "Répartition du temps d'écran quotidien",
         "",
         "Temps moyen (heures/jour)",
     )
 
+
+@timed()
+def prepare_data(df):
+    data = df[COLUMNS]
+
+    data.columns = ["Utilisation_Travail", "Temps_Ecran_Travail", "Temps_Ecran_Total"]
+
+    data_work = data[data["Utilisation_Travail"] == "Oui"]
+
+    data_work["Temps_Ecran_Travail_Numeric"] = decode_ordinal(
+        data_work["Temps_Ecran_Travail"], "work_time"
+    )
+    data_work["Temps_Ecran_Total_Numeric"] = decode_ordinal(
+        data_work["Temps_Ecran_Total"], "screen_time"
+    )
+
+    data_work = data_work.dropna(
+        subset=["Temps_Ecran_Travail_Numeric", "Temps_Ecran_Total_Numeric"]
+    )
+
+    data_work["Temps_Ecran_Personnel"] = (
+        data_work["Temps_Ecran_Total_Numeric"]
+        - data_work["Temps_Ecran_Travail_Numeric"]
+    )
+
+    data_work["Temps_Ecran_Personnel"] = data_work["Temps_Ecran_Personnel"].clip(
+        lower=0
+    )
+
+    return data_work
+
+
+def count_work_less_than_half(data_work, weights):
     work_less_than_half = (
         data_work["Temps_Ecran_Travail_Numeric"]
         / data_work["Temps_Ecran_Total_Numeric"]
         < 0.5
-    ).sum()
-    pct_work_less_than_half = (work_less_than_half / len(data_work)) * 100
+    ).to_numpy()
+    return weights[work_less_than_half].sum()
+
+
+def new_state():
+    return {"answers": CountCube()}
+
+
+@timed()
+def update_state(state, df):
+    state["answers"].update(df[COLUMNS])
+
+
+@register("3b", columns=COLUMNS)
+def analyze_work_screen_time(
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    facet=None,
+    window=None,
+    sample=None,
+    state=None,
+):
+    if facet is not None:
+        return facet_analysis(
+            analyze_work_screen_time,
+            COLUMNS,
+            new_state,
+            update_state,
+            facet,
+            chunksize=chunksize,
+        )
+
+    if window is not None:
+        return window_analysis(
+            analyze_work_screen_time, COLUMNS, new_state, update_state, window
+        )
+
+    if sample is not None:
+        return sample_analysis(
+            analyze_work_screen_time,
+            COLUMNS,
+            new_state,
+            update_state,
+            sample,
+            chunksize=chunksize,
+        )
+
+    if chunksize or incremental or state is not None:
+        if state is None:
+            state = accumulate_state(
+                COLUMNS,
+                new_state,
+                update_state,
+                chunksize=chunksize,
+                incremental=incremental,
+            )
+        cube = state["answers"]
+    else:
+        cube = load_count_cube(COLUMNS)
+
+    data_work, weights = cube.prepared(prepare_data)
+
+    people_using_screens_for_work = weights.sum()
+    mean_total = weighted_mean(data_work["Temps_Ecran_Total_Numeric"], weights)
+    mean_work = weighted_mean(data_work["Temps_Ecran_Travail_Numeric"], weights)
+    mean_personal = weighted_mean(data_work["Temps_Ecran_Personnel"], weights)
+    work_less_than_half = count_work_less_than_half(data_work, weights)
+
+    sum_parts = mean_work + mean_personal
+
+    if sum_parts != mean_total and sum_parts > 0:
+        scaling_factor = mean_total / sum_parts
+        mean_work = mean_work * scaling_factor
+        mean_personal = mean_personal * scaling_factor
+
+    pct_work = (mean_work / mean_total) * 100
+    pct_personal = (mean_personal / mean_total) * 100
+
+    if plot:
+        render_figure(plot_work_screen_time, mean_total, mean_work, mean_personal)
+
+    pct_work_less_than_half = (
+        work_less_than_half / people_using_screens_for_work
+    ) * 100
 
     result = {
         "mean_total_screen_time": mean_total,
@@ -153,7 +222,7 @@ def analyze_work_screen_time():
         "mean_personal_screen_time": mean_personal,
         "work_percentage": pct_work,
         "personal_percentage": pct_personal,
-        "people_using_screens_for_work": len(data_work),
+        "people_using_screens_for_work": people_using_screens_for_work,
         "people_with_work_less_than_half": work_less_than_half,
         "percentage_with_work_less_than_half": pct_work_less_than_half,
         "work_is_minority": pct_work < 50,
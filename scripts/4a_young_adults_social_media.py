@@ -1,108 +1,85 @@
-import sys
 import os
+import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from utils.bootstrap import bootstrap_means
+from utils.count_cube import CountCube, group_summary, one_way_anova, weighted_counts
 from utils.data_loader import (
-    load_data,
-    map_social_media_time_to_numeric,
-    save_figure,
+    decode_ordinal,
     format_hours,
+    load_count_cube,
+    save_figure,
 )
-from scipy import stats
-import numpy as np
-
-
-def analyze_young_adults_social_media():
-    df = load_data("responses.csv")
-
-    columns = [
-        "Quel est votre âge ?",
-        "Combien de temps passez-vous quotidiennement sur les réseaux sociaux ?",
-        "Quels réseaux sociaux utilisez-vous le plus régulièrement ?",
-    ]
-
-    data = df[columns].copy()
-
-    data.columns = ["Age", "Temps_Reseaux_Sociaux", "Reseaux_Utilises"]
-
-    data["Temps_Reseaux_Numeric"] = data["Temps_Reseaux_Sociaux"].apply(
-        map_social_media_time_to_numeric
+from utils.facets import facet_analysis
+from utils.incremental import accumulate_state
+from utils.multi_select import MultiSelectMatrix
+from utils.posthoc import tukey_hsd
+from utils.preview import sample_analysis
+from utils.profiling import stage, timed
+from utils.registry import register
+from utils.rendering import render_figure
+from utils.schema import columns
+from utils.windows import window_analysis
+
+COLUMNS = columns("age", "social_media_time", "social_networks")
+
+AGE_CATEGORIES = {
+    "10-14 ans": "Adolescents (10-19 ans)",
+    "15-19 ans": "Adolescents (10-19 ans)",
+    "20-29 ans": "Jeunes adultes (20-29 ans)",
+    "30-39 ans": "Adultes (30-49 ans)",
+    "40-49 ans": "Adultes (30-49 ans)",
+    "50-59 ans": "Seniors (50+ ans)",
+    "60-70 ans": "Seniors (50+ ans)",
+    "Plus de 70 ans": "Seniors (50+ ans)",
+}
+
+
+def network_usage_by_age(network_counts, group_sizes, age_order):
+    network_df = pd.DataFrame(
+        {
+            age_cat: network_counts[age_cat] / group_sizes[age_cat] * 100
+            for age_cat in age_order
+            if age_cat in network_counts
+        }
     )
 
-    def categorize_age(age):
-        if age in ["10-14 ans", "15-19 ans"]:
-            return "Adolescents (10-19 ans)"
-        elif age == "20-29 ans":
-            return "Jeunes adultes (20-29 ans)"
-        elif age in ["30-39 ans", "40-49 ans"]:
-            return "Adultes (30-49 ans)"
-        elif age in ["50-59 ans", "60-70 ans", "Plus de 70 ans"]:
-            return "Seniors (50+ ans)"
-        else:
-            return None
-
-    data["Categorie_Age"] = data["Age"].apply(categorize_age)
-
-    data = data.dropna(subset=["Categorie_Age", "Temps_Reseaux_Numeric"])
-
-    age_stats = (
-        data.groupby("Categorie_Age")["Temps_Reseaux_Numeric"]
-        .agg(["mean", "std", "count"])
-        .reset_index()
-    )
-
-    age_stats["erreur_standard"] = age_stats["std"] / np.sqrt(age_stats["count"])
-
-    age_order = [
-        "Adolescents (10-19 ans)",
-        "Jeunes adultes (20-29 ans)",
-        "Adultes (30-49 ans)",
-        "Seniors (50+ ans)",
-    ]
+    return network_df.fillna(0)
 
-    age_order = [age for age in age_order if age in age_stats["Categorie_Age"].values]
-
-    groups = [
-        data[data["Categorie_Age"] == age]["Temps_Reseaux_Numeric"].values
-        for age in age_order
-    ]
-    f_val, p_val = stats.f_oneway(*groups)
 
-    if p_val < 0.05:
-        posthoc_data = data[data["Categorie_Age"].isin(age_order)].copy()
+@timed()
+def plot_social_media_time_by_age(age_stats, age_order):
+    import seaborn as sns
+    from matplotlib.figure import Figure
 
-        from statsmodels.stats.multicomp import pairwise_tukeyhsd
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
 
-        tukey = pairwise_tukeyhsd(
-            posthoc_data["Temps_Reseaux_Numeric"],
-            posthoc_data["Categorie_Age"],
-            alpha=0.05,
-        )
-
-        tukey_df = pd.DataFrame(
-            data=tukey._results_table.data[1:], columns=tukey._results_table.data[0]
-        )
-
-        young_adult_comparisons = tukey_df[
-            (tukey_df["group1"] == "Jeunes adultes (20-29 ans)")
-            | (tukey_df["group2"] == "Jeunes adultes (20-29 ans)")
-        ]
-    else:
-        young_adult_comparisons = None
-
-    plt.figure(figsize=(12, 8))
-
-    ax = sns.barplot(
+    sns.barplot(
         x="Categorie_Age",
         y="mean",
         data=age_stats,
         order=age_order,
         palette="viridis",
-        errorbar=("ci", 95),
+        errorbar=None,
+        ax=ax,
+    )
+
+    ordered_stats = age_stats.set_index("Categorie_Age").loc[age_order]
+    ax.errorbar(
+        range(len(age_order)),
+        ordered_stats["mean"],
+        yerr=[
+            ordered_stats["mean"] - ordered_stats["ci_low"],
+            ordered_stats["ci_high"] - ordered_stats["mean"],
+        ],
+        fmt="none",
+        ecolor="black",
+        capsize=5,
     )
 
     for i, p in enumerate(ax.patches):
@@ -114,41 +91,30 @@ def analyze_young_adults_social_media():
             ha="center",
         )
 
-    plt.title("Temps moyen passé sur les réseaux sociaux par catégorie d'âge")
-    plt.xlabel("Catégorie d'âge")
-    plt.ylabel("Temps moyen sur les réseaux sociaux (heures/jour)")
-    plt.xticks(rotation=45)
+    ax.set_title("Temps moyen passé sur les réseaux sociaux par catégorie d'âge")
+    ax.set_xlabel("Catégorie d'âge")
+    ax.set_ylabel("Temps moyen sur les réseaux sociaux (heures/jour)")
+    ax.tick_params(axis="x", labelrotation=45)
 
     save_figure(
-        plt,
+        fig,
         "4a_young_adults_social_media",
         "Temps moyen passé sur les réseaux sociaux par catégorie d'âge",
         "Catégorie d'âge",
         "Temps moyen sur les réseaux sociaux (heures/jour)",
     )
 
-    network_counts = {}
-
-    for age_cat in age_order:
-        age_data = data[data["Categorie_Age"] == age_cat]
-
-        networks = []
-        for networks_str in age_data["Reseaux_Utilises"].dropna():
-            networks.extend([network.strip() for network in networks_str.split(";")])
-
-        count = pd.Series(networks).value_counts()
-        normalized = (count / len(age_data)) * 100
-
-        network_counts[age_cat] = normalized
-
-    network_df = pd.DataFrame(network_counts)
 
-    network_df = network_df.fillna(0)
+@timed()
+def plot_social_media_usage_by_age(network_df):
+    import seaborn as sns
+    from matplotlib.figure import Figure
 
     top_networks = network_df.mean(axis=1).nlargest(6).index
     network_df_filtered = network_df.loc[top_networks]
 
-    plt.figure(figsize=(14, 10))
+    fig = Figure(figsize=(14, 10))
+    ax = fig.subplots()
 
     sns.heatmap(
         network_df_filtered,
@@ -157,20 +123,149 @@ def analyze_young_adults_social_media():
         cmap="viridis",
         linewidths=0.5,
         cbar_kws={"label": "% d'utilisation"},
+        ax=ax,
     )
 
-    plt.title("Utilisation des réseaux sociaux par catégorie d'âge")
-    plt.ylabel("Réseau social")
-    plt.xlabel("Catégorie d'âge")
+    ax.set_title("Utilisation des réseaux sociaux par catégorie d'âge")
+    ax.set_ylabel("Réseau social")
+    ax.set_xlabel("Catégorie d'âge")
 
     save_figure(
-        plt,
+        fig,
         "4a_social_media_usage_by_age",
         "Utilisation des réseaux sociaux par catégorie d'âge",
         "Catégorie d'âge",
         "Réseau social",
     )
 
+
+@timed()
+def prepare_data(df):
+    data = df[COLUMNS]
+
+    data.columns = ["Age", "Temps_Reseaux_Sociaux", "Reseaux_Utilises"]
+
+    data["Temps_Reseaux_Numeric"] = decode_ordinal(
+        data["Temps_Reseaux_Sociaux"], "social_media_time"
+    )
+
+    data["Categorie_Age"] = data["Age"].map(AGE_CATEGORIES)
+
+    return data.dropna(subset=["Categorie_Age", "Temps_Reseaux_Numeric"])
+
+
+def new_state():
+    return {"answers": CountCube()}
+
+
+@timed()
+def update_state(state, df):
+    state["answers"].update(df[COLUMNS])
+
+
+@register("4a", columns=COLUMNS)
+def analyze_young_adults_social_media(
+    plot=True,
+    chunksize=None,
+    incremental=False,
+    facet=None,
+    window=None,
+    sample=None,
+    state=None,
+):
+    if facet is not None:
+        return facet_analysis(
+            analyze_young_adults_social_media,
+            COLUMNS,
+            new_state,
+            update_state,
+            facet,
+            chunksize=chunksize,
+        )
+
+    if window is not None:
+        return window_analysis(
+            analyze_young_adults_social_media, COLUMNS, new_state, update_state, window
+        )
+
+    if sample is not None:
+        return sample_analysis(
+            analyze_young_adults_social_media,
+            COLUMNS,
+            new_state,
+            update_state,
+            sample,
+            chunksize=chunksize,
+        )
+
+    if chunksize or incremental or state is not None:
+        if state is None:
+            state = accumulate_state(
+                COLUMNS,
+                new_state,
+                update_state,
+                chunksize=chunksize,
+                incremental=incremental,
+            )
+
+        cube = state["answers"]
+    else:
+        cube = load_count_cube(COLUMNS)
+
+    data, weights = cube.prepared(prepare_data)
+    value_counts = weighted_counts(
+        weights, data["Categorie_Age"], data["Temps_Reseaux_Numeric"]
+    )
+
+    age_stats = group_summary(value_counts).rename_axis("Categorie_Age").reset_index()
+
+    age_stats["erreur_standard"] = age_stats["std"] / np.sqrt(age_stats["count"])
+
+    with stage("bootstrap"):
+        intervals = bootstrap_means(value_counts)
+    age_stats["ci_low"] = age_stats["Categorie_Age"].map(intervals["ci_low"])
+    age_stats["ci_high"] = age_stats["Categorie_Age"].map(intervals["ci_high"])
+
+    age_order = [
+        "Adolescents (10-19 ans)",
+        "Jeunes adultes (20-29 ans)",
+        "Adultes (30-49 ans)",
+        "Seniors (50+ ans)",
+    ]
+
+    age_order = [age for age in age_order if age in age_stats["Categorie_Age"].values]
+
+    ordered_stats = age_stats.set_index("Categorie_Age").loc[age_order]
+
+    with stage("tests"):
+        f_val, p_val = one_way_anova(
+            ordered_stats["count"], ordered_stats["mean"], ordered_stats["std"]
+        )
+
+    with stage("posthoc"):
+        if p_val < 0.05:
+            tukey_df = tukey_hsd(ordered_stats, alpha=0.05)
+
+            young_adult_comparisons = tukey_df[
+                (tukey_df["group1"] == "Jeunes adultes (20-29 ans)")
+                | (tukey_df["group2"] == "Jeunes adultes (20-29 ans)")
+            ]
+        else:
+            young_adult_comparisons = None
+
+    if plot:
+        network_counts = MultiSelectMatrix.from_series(
+            data["Reseaux_Utilises"]
+        ).counts_by(data["Categorie_Age"], weights)
+
+        group_sizes = age_stats.set_index("Categorie_Age")["count"]
+
+        render_figure(plot_social_media_time_by_age, age_stats, age_order)
+        render_figure(
+            plot_social_media_usage_by_age,
+            network_usage_by_age(network_counts, group_sizes, age_order),
+        )
+
     young_adults_mean = (
         age_stats[age_stats["Categorie_Age"] == "Jeunes adultes (20-29 ans)"][
             "mean"
@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from analysis_server import AnalysisService, make_server
+from utils import data_loader
+
+RESPONSES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "responses.csv"
+)
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serveur sur un port libre, servant une copie de responses.csv."""
+    path = tmp_path / "responses.csv"
+    shutil.copy(RESPONSES, path)
+    source = data_loader.data_source()
+
+    service = AnalysisService(file_path=str(path))
+    service.warm_up()
+    httpd = make_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    yield "http://{}:{}".format(*httpd.server_address[:2]), path
+
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+    data_loader.set_data_source(source)
+    data_loader.clear_data_cache()
+
+
+def get(url):
+    """(code HTTP, corps JSON) de la requête GET url."""
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        with e:
+            return e.code, json.load(e)
+
+
+def test_health_and_analyses(server):
+    url, _ = server
+
+    code, health = get(f"{url}/health")
+    assert code == 200
+    assert health["status"] == "ok"
+    assert health["cache"]["entries"] == 0
+
+    code, listing = get(f"{url}/analyses")
+    assert code == 200
+    assert "scripts.1a_screen_time_by_age" in listing["analyses"]
+    assert "facet" in listing["parameters"]
+
+
+def test_repeated_request_is_served_from_cache(server):
+    url, _ = server
+
+    code, first = get(f"{url}/analyses/1a")
+    assert code == 200
+    assert not first["cached"]
+
+    code, second = get(f"{url}/analyses/1a")
+    assert code == 200
+    assert second["cached"]
+    assert second["result"] == first["result"]
+    assert get(f"{url}/health")[1]["cache"]["hits"] == 1
+
+
+def test_errors(server):
+    url, _ = server
+
+    code, body = get(f"{url}/analyses/inconnue")
+    assert code == 404
+    assert "inconnue" in body["error"]
+
+    assert get(f"{url}/analyses/1a?chunksize=beaucoup")[0] == 400
+    assert get(f"{url}/analyses/1a?couleur=bleu")[0] == 400
+    assert get(f"{url}/inconnu")[0] == 404
+
+    code, body = get(f"{url}/analyses/1a?window=jamais")
+    assert code == 500
+    assert "jamais" in body["error"]
+
+
+def test_rewritten_file_is_reloaded(server):
+    url, path = server
+    code, before = get(f"{url}/analyses/1a")
+    assert code == 200
+
+    lines = path.read_bytes().split(b"\r\n")
+    path.write_bytes(b"\r\n".join(lines[:101]) + b"\r\n")
+
+    code, after = get(f"{url}/analyses/1a")
+    assert code == 200
+    assert not after["cached"]
+    assert after["data_version"] != before["data_version"]
+    assert after["result"] != before["result"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.binary_cache import read_sidecar, write_sidecar
+from utils.schema import column, compact_answers, compact_frame
+
+
+@pytest.fixture
+def frame(tmp_path):
+    """Petit export avec une réponse manquante, une réponse hors échelle et
+    une colonne inconnue de QUESTIONS."""
+    df = pd.DataFrame(
+        {
+            column("timestamp"): ["2024/01/01 10:00", "2024/01/02 11:00", np.nan],
+            column("screen_time"): ["1-2 heures", np.nan, "Plus de 10 heures"],
+            column("gender"): ["Masculin", "Féminin", "Masculin"],
+            "Commentaire": ["a", np.nan, "b"],
+            "Score": [1.0, 2.0, np.nan],
+        }
+    )
+    path = tmp_path / "responses.csv"
+    df.to_csv(path, index=False)
+    return str(path), pd.read_csv(path)
+
+
+def test_round_trip_matches_compacted_csv(frame):
+    path, df = frame
+    write_sidecar(path, compact_frame(df))
+
+    cached = read_sidecar(path)
+
+    pd.testing.assert_frame_equal(cached, compact_frame(df))
+
+
+def test_answers_are_read_in_their_dtype(frame):
+    path, df = frame
+    write_sidecar(path, df)
+
+    answers = read_sidecar(path)[column("screen_time")]
+
+    assert answers.isna().tolist() == [False, True, False]
+    assert answers.cat.categories[-1] == "Plus de 10 heures"
+    assert compact_answers(answers, "screen_time") is answers
+
+
+def test_text_columns_are_decoded(frame):
+    path, df = frame
+    write_sidecar(path, df)
+
+    cached = read_sidecar(path, [column("timestamp"), "Commentaire"])
+
+    assert not isinstance(cached["Commentaire"].dtype, pd.CategoricalDtype)
+    assert cached["Commentaire"].isna().tolist() == [False, True, False]
+    assert cached[column("timestamp")].iloc[0] == "2024/01/01 10:00"
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.bootstrap import bootstrap_mean_difference, bootstrap_means
+
+
+def _counts(groups):
+    """Effectifs indexés par (groupe, valeur) à partir de listes de réponses."""
+    rows = [(group, value) for group, values in groups.items() for value in values]
+    frame = pd.DataFrame(rows, columns=["group", "value"])
+    return frame.value_counts()
+
+
+def _brute_force_means(values, n_resamples, seed):
+    rng = np.random.default_rng(seed)
+    values = np.asarray(values, dtype=float)
+    indices = rng.integers(0, len(values), size=(n_resamples, len(values)))
+    return values[indices].mean(axis=1)
+
+
+def test_percentile_interval_matches_index_resampling():
+    values = [0.5] * 40 + [1.5] * 25 + [3.0] * 20 + [5.0] * 15
+    intervals = bootstrap_means(
+        _counts({"A": values}), n_resamples=20_000, method="percentile"
+    )
+
+    expected = np.quantile(_brute_force_means(values, 20_000, 1), [0.025, 0.975])
+    low, high = intervals.loc["A", ["ci_low", "ci_high"]]
+    assert intervals.loc["A", "mean"] == pytest.approx(np.mean(values))
+    assert low == pytest.approx(expected[0], abs=0.03)
+    assert high == pytest.approx(expected[1], abs=0.03)
+
+
+def test_bca_interval_covers_mean_and_is_shifted_by_skew():
+    values = [0.5] * 70 + [1.5] * 15 + [8.0] * 15
+    counts = _counts({"A": values})
+
+    bca = bootstrap_means(counts, n_resamples=20_000)
+    percentile = bootstrap_means(counts, n_resamples=20_000, method="percentile")
+
+    low, high = bca.loc["A", ["ci_low", "ci_high"]]
+    assert low < np.mean(values) < high
+    # Distribution asymétrique à droite : BCa décale l'intervalle vers le haut.
+    assert low > percentile.loc["A", "ci_low"]
+    assert high > percentile.loc["A", "ci_high"]
+
+
+def test_results_are_deterministic():
+    counts = _counts({"A": [1, 2, 2, 3], "B": [2, 3, 3, 4, 4]})
+    first = bootstrap_mean_difference(counts, "A", "B", n_resamples=2_000, seed=3)
+    second = bootstrap_mean_difference(counts, "A", "B", n_resamples=2_000, seed=3)
+    assert first == second
+
+
+def test_difference_interval_contains_estimate():
+    counts = _counts({"A": [1, 2, 2, 3, 5] * 10, "B": [2, 3, 3, 4, 4] * 10})
+    estimate, low, high = bootstrap_mean_difference(counts, "A", "B", n_resamples=5_000)
+    assert estimate == pytest.approx(2.6 - 3.2)
+    assert low < estimate < high
+
+
+def test_single_response_group_has_nan_interval():
+    counts = _counts({"A": [1, 2, 3], "B": [4]})
+    intervals = bootstrap_means(counts, n_resamples=1_000)
+    assert np.isnan(intervals.loc["B", ["ci_low", "ci_high"]]).all()
+    assert intervals.loc["B", "mean"] == 4
+
+    estimate, low, high = bootstrap_mean_difference(counts, "A", "B", n_resamples=1_000)
+    assert estimate == pytest.approx(-2)
+    assert np.isnan(low) and np.isnan(high)
+
+
+def test_missing_group_gives_nan_difference():
+    counts = _counts({"Oui": [1, 2, 3]})
+    result = bootstrap_mean_difference(counts, "Oui", "Non", n_resamples=1_000)
+    assert all(np.isnan(result))
+
+
+def test_unknown_method_raises():
+    with pytest.raises(ValueError):
+        bootstrap_means(_counts({"A": [1, 2, 3]}), n_resamples=100, method="normal")
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from scipy.stats.contingency import association, chi2_contingency
+
+from utils.correlation import PairwiseTables, correlation_matrix, cramers_v
+
+SCALE = ["jamais", "parfois", "souvent", "toujours"]
+
+
+def _frame():
+    rng = np.random.default_rng(1)
+    a = rng.integers(0, 4, 300)
+    b = np.clip(a + rng.integers(-1, 2, 300), 0, 3)
+    c = rng.integers(0, 4, 300)
+    frame = pd.DataFrame(
+        {name: np.array(SCALE)[v] for name, v in zip("abc", (a, b, c))}
+    )
+    frame = frame.astype(object)
+    frame.loc[rng.random(300) < 0.1, "b"] = np.nan
+    return frame
+
+
+def _tables(frame):
+    return PairwiseTables.from_frame(frame, scales={name: SCALE for name in frame})
+
+
+def _ranks(frame, x, y):
+    both = frame[[x, y]].dropna()
+    return both[x].map(SCALE.index), both[y].map(SCALE.index)
+
+
+@pytest.mark.parametrize(
+    "method, reference",
+    [
+        ("pearson", stats.pearsonr),
+        ("spearman", stats.spearmanr),
+        ("kendall", lambda x, y: stats.kendalltau(x, y, method="asymptotic")),
+    ],
+)
+def test_correlations_match_scipy(method, reference):
+    frame = _frame()
+    r, p = correlation_matrix(_tables(frame), method=method)
+
+    for x, y in [("a", "b"), ("a", "c"), ("b", "c")]:
+        expected = reference(*_ranks(frame, x, y))
+        assert r.loc[x, y] == pytest.approx(expected[0], abs=1e-10)
+        assert p.loc[x, y] == pytest.approx(expected[1], rel=1e-6, abs=1e-12)
+        assert r.loc[y, x] == r.loc[x, y]
+
+
+def test_cramers_v_matches_scipy():
+    frame = _frame()
+    v, p = cramers_v(_tables(frame))
+
+    for x, y in [("a", "b"), ("a", "c")]:
+        table = pd.crosstab(frame[x], frame[y]).to_numpy()
+        assert v.loc[x, y] == pytest.approx(association(table, method="cramer"))
+        assert p.loc[x, y] == pytest.approx(
+            chi2_contingency(table, correction=False).pvalue
+        )
+
+
+def test_blocks_cover_selected_columns():
+    tables = _tables(_frame())
+    counts, blocks, owner = tables.blocks(["a", "c"])
+    assert counts.shape == (8, 8) and blocks.shape == (8, 2)
+    assert list(owner) == [0] * 4 + [1] * 4
+    np.testing.assert_array_equal(counts[:4, 4:], tables.table("a", "c").to_numpy())
@@ -0,0 +1,46 @@
+import importlib
+import os
+
+import pandas as pd
+import pytest
+
+RESPONSES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "responses.csv"
+)
+
+script = importlib.import_module("scripts.1c_correlation_matrix")
+
+
+def _analyze(rows):
+    state = script.new_state()
+    script.update_state(state, pd.read_csv(RESPONSES).iloc[:rows])
+    return script.analyze_correlation_matrix(plot=False, state=state)
+
+
+@pytest.mark.parametrize("rows", [15, None])
+def test_strongest_pairs_are_significant_distinct_pairs(rows):
+    result = _analyze(rows)
+    pairs = result["strongest_spearman_pairs"]
+    keys = list(result["spearman_correlations"])
+
+    assert len(pairs) <= 5
+    for entry in pairs:
+        a, b = entry["pair"]
+        assert keys.index(a) < keys.index(b)
+        assert result["spearman_p_values"][b][a] < 0.05
+        assert entry["spearman_correlation"] == result["spearman_correlations"][b][a]
+
+    magnitudes = [abs(entry["spearman_correlation"]) for entry in pairs]
+    assert magnitudes == sorted(magnitudes, reverse=True)
+
+
+def test_few_significant_pairs_are_not_padded():
+    result = _analyze(15)
+    p_values = pd.DataFrame(result["spearman_p_values"])
+    keys = list(p_values.columns)
+    significant = sum(
+        p_values.loc[a, b] < 0.05 for i, a in enumerate(keys) for b in keys[i + 1 :]
+    )
+
+    assert significant < 5
+    assert len(result["strongest_spearman_pairs"]) == significant
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from utils.incremental import accumulate_state
+from utils.schema import column
+
+RESPONSES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "responses.csv"
+)
+COLUMNS = [column("timestamp"), column("age")]
+
+# Lignes reçues par update_state lors de l'appel en cours.
+read_rows = []
+
+
+def new_state():
+    return {"timestamps": []}
+
+
+def update_state(state, df):
+    read_rows.extend(df[column("timestamp")])
+    state["timestamps"].extend(df[column("timestamp")])
+
+
+def _accumulate(path, columns=COLUMNS):
+    read_rows.clear()
+    return accumulate_state(
+        columns, new_state, update_state, str(path), chunksize=25, incremental=True
+    )
+
+
+@pytest.fixture
+def export(tmp_path, monkeypatch):
+    """Début de l'export (120 réponses) et export complet, dans un dossier
+    de travail temporaire (l'état est enregistré dans STATE_DIR)."""
+    monkeypatch.chdir(tmp_path)
+    with open(RESPONSES, "rb") as f:
+        content = f.read()
+    lines = content.split(b"\r\n")
+    head = b"\r\n".join(lines[:121]) + b"\r\n"
+    path = tmp_path / "responses.csv"
+    path.write_bytes(head)
+    return path, head, content
+
+
+def _full(path):
+    read_rows.clear()
+    return accumulate_state(COLUMNS, new_state, update_state, str(path), chunksize=25)
+
+
+def test_appended_rows_are_read_alone(export):
+    path, _, content = export
+    first = _accumulate(path)
+    assert len(first["timestamps"]) == len(read_rows) == 120
+
+    path.write_bytes(content)
+    state = _accumulate(path)
+    appended = list(read_rows)
+    full = _full(path)
+    assert appended == full["timestamps"][120:]
+    assert state == full
+
+
+def test_unchanged_file_reads_nothing(export):
+    path, _, _ = export
+    first = _accumulate(path)
+    again = _accumulate(path)
+    assert read_rows == []
+    assert again == first
+
+
+def test_rewritten_file_is_read_again(export):
+    path, _, content = export
+    _accumulate(path)
+
+    # Même taille et mêmes lignes ajoutées, mais une réponse déjà lue a changé.
+    lines = content.split(b"\r\n")
+    lines[120] = lines[120].replace(b"2025/", b"2024/", 1)
+    path.write_bytes(b"\r\n".join(lines))
+    state = _accumulate(path)
+    assert len(read_rows) == len(state["timestamps"])
+    assert state == _full(path)
+
+
+def test_truncated_file_is_read_again(export):
+    path, head, _ = export
+    _accumulate(path)
+
+    lines = head.split(b"\r\n")
+    path.write_bytes(b"\r\n".join(lines[:61]) + b"\r\n")
+    state = _accumulate(path)
+    assert len(read_rows) == len(state["timestamps"]) == 60
+
+
+def test_other_columns_are_read_again(export):
+    path, _, _ = export
+    _accumulate(path)
+    _accumulate(path, columns=[column("timestamp"), column("canton")])
+    assert len(read_rows) == 120
+
+
+def test_incremental_requires_a_single_file(export):
+    path, _, _ = export
+    with pytest.raises(ValueError):
+        _accumulate(path.parent / "*.csv")
@@ -0,0 +1,77 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.permutation import permutation_test, set_permutation_workers
+
+
+def _counts(groups):
+    rows = [(group, value) for group, values in groups.items() for value in values]
+    return pd.DataFrame(rows, columns=["group", "value"]).value_counts()
+
+
+def _exact_p_value(a, b):
+    """p-valeur bilatérale exacte, par énumération de tous les étiquetages."""
+    pooled = np.array(a + b, dtype=float)
+    observed = abs(np.mean(a) - np.mean(b))
+    extreme = total = 0
+    for chosen in combinations(range(len(pooled)), len(a)):
+        mask = np.zeros(len(pooled), dtype=bool)
+        mask[list(chosen)] = True
+        difference = pooled[mask].mean() - pooled[~mask].mean()
+        extreme += abs(difference) >= observed * (1 - 1e-12)
+        total += 1
+    return extreme / total
+
+
+def test_p_value_matches_exact_enumeration():
+    a, b = [1, 2, 2, 3, 5, 5], [2, 3, 4, 4, 5, 6, 6]
+    result = permutation_test(
+        _counts({"A": a, "B": b}), "A", "B", n_permutations=200_000
+    )
+
+    assert result["statistic"] == pytest.approx(np.mean(a) - np.mean(b))
+    assert result["p_value"] == pytest.approx(
+        _exact_p_value(a, b), abs=4 * result["mc_error"]
+    )
+
+
+def test_result_does_not_depend_on_workers():
+    counts = _counts({"A": [1, 2, 2, 3] * 5, "B": [2, 3, 3, 4] * 5})
+    single = permutation_test(counts, "A", "B", n_permutations=4_000, batch_size=1_000)
+    pooled = permutation_test(
+        counts, "A", "B", n_permutations=4_000, batch_size=1_000, workers=2
+    )
+    assert single == pooled
+
+
+def test_default_workers_come_from_setting():
+    counts = _counts({"A": [1, 2, 3], "B": [3, 4, 5]})
+    expected = permutation_test(counts, "A", "B", n_permutations=2_000, batch_size=500)
+    set_permutation_workers(2)
+    try:
+        result = permutation_test(
+            counts, "A", "B", n_permutations=2_000, batch_size=500
+        )
+    finally:
+        set_permutation_workers(1)
+    assert result == expected
+
+    with pytest.raises(ValueError):
+        set_permutation_workers(0)
+
+
+def test_missing_group_gives_nan():
+    result = permutation_test(_counts({"Oui": [1, 2, 3]}), "Oui", "Non")
+    assert np.isnan(result["statistic"]) and np.isnan(result["p_value"])
+
+
+def test_single_response_groups():
+    result = permutation_test(
+        _counts({"A": [1], "B": [4]}), "A", "B", n_permutations=1_000
+    )
+    assert result["statistic"] == -3
+    # Deux étiquetages seulement, tous deux aussi extrêmes que l'observé.
+    assert result["p_value"] == 1
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from statsmodels.stats.multicomp import pairwise_tukeyhsd
+from statsmodels.stats.multitest import multipletests
+
+from utils.posthoc import (
+    games_howell,
+    studentized_range_isf,
+    studentized_range_sf,
+    tukey_hsd,
+    welch_holm,
+)
+
+
+def _samples():
+    rng = np.random.default_rng(0)
+    return {
+        "A": rng.normal(2.0, 1.0, 40),
+        "B": rng.normal(2.6, 2.0, 25),
+        "C": rng.normal(2.2, 0.5, 60),
+        "D": rng.normal(3.1, 1.5, 15),
+    }
+
+
+def _summary(samples):
+    return pd.DataFrame(
+        {
+            "mean": {g: np.mean(v) for g, v in samples.items()},
+            "std": {
+                g: np.std(v, ddof=1) if len(v) > 1 else np.nan
+                for g, v in samples.items()
+            },
+            "count": {g: len(v) for g, v in samples.items()},
+        }
+    )
+
+
+@pytest.mark.parametrize("k, df", [(2, 5), (3, 10), (5, 40), (8, 300)])
+def test_studentized_range_matches_scipy(k, df):
+    q = np.array([0.5, 2.0, 3.5, 6.0])
+    expected = stats.studentized_range.sf(q, k, df)
+    np.testing.assert_allclose(studentized_range_sf(q, k, df), expected, atol=1e-7)
+
+    critical = studentized_range_isf(0.05, k, df)
+    assert stats.studentized_range.sf(critical, k, df) == pytest.approx(0.05, abs=1e-7)
+
+
+def test_non_finite_inputs_give_nan():
+    sf = studentized_range_sf(
+        np.array([np.nan, np.inf, 2.0]), 3, np.array([10.0, 10.0, np.nan])
+    )
+    assert np.isnan(sf).all()
+    assert np.isnan(studentized_range_isf(0.05, 3, np.nan))
+
+
+def test_tukey_matches_statsmodels():
+    samples = _samples()
+    values = np.concatenate(list(samples.values()))
+    labels = np.repeat(list(samples), [len(v) for v in samples.values()])
+    reference = pairwise_tukeyhsd(values, labels, alpha=0.05)
+
+    table = tukey_hsd(_summary(samples))
+    np.testing.assert_allclose(table["meandiff"], reference.meandiffs, atol=1e-4)
+    np.testing.assert_allclose(table["p-adj"], reference.pvalues, atol=2e-4)
+    np.testing.assert_allclose(table["lower"], reference.confint[:, 0], atol=1e-4)
+    np.testing.assert_allclose(table["upper"], reference.confint[:, 1], atol=1e-4)
+    assert list(table["reject"]) == list(reference.reject)
+
+
+def test_games_howell_matches_direct_computation():
+    samples = _samples()
+    table = games_howell(_summary(samples))
+    k = len(samples)
+
+    for group1, group2, p_adj in zip(table["group1"], table["group2"], table["p-adj"]):
+        a, b = samples[group1], samples[group2]
+        se2_a, se2_b = np.var(a, ddof=1) / len(a), np.var(b, ddof=1) / len(b)
+        df = (se2_a + se2_b) ** 2 / (se2_a**2 / (len(a) - 1) + se2_b**2 / (len(b) - 1))
+        q = abs(np.mean(b) - np.mean(a)) / np.sqrt((se2_a + se2_b) / 2)
+        assert p_adj == pytest.approx(stats.studentized_range.sf(q, k, df), abs=1e-4)
+
+
+def test_welch_holm_matches_statsmodels():
+    samples = _samples()
+    table = welch_holm(_summary(samples))
+    p_values = [
+        stats.ttest_ind(samples[a], samples[b], equal_var=False).pvalue
+        for a, b in zip(table["group1"], table["group2"])
+    ]
+    expected = multipletests(p_values, method="holm")[1]
+    np.testing.assert_allclose(table["p-adj"], expected, atol=1e-4)
+
+
+def test_single_response_group_gives_nan_rows():
+    samples = {**_samples(), "E": np.array([4.0])}
+    summary = _summary(samples)
+
+    for method in (games_howell, welch_holm):
+        table = method(summary)
+        single = (table["group1"] == "E") | (table["group2"] == "E")
+        assert table.loc[single, ["p-adj", "lower", "upper"]].isna().all().all()
+        assert table.loc[~single, ["p-adj", "lower", "upper"]].notna().all().all()
+        assert not table.loc[single, "reject"].any()
+
+    # Tukey : le groupe ne compte pas dans la variance commune mais reste comparé.
+    table = tukey_hsd(summary)
+    assert table[["p-adj", "lower", "upper"]].notna().all().all()
+
+
+def test_welch_holm_ignores_untestable_pairs():
+    samples = _samples()
+    complete = welch_holm(_summary(samples))
+    with_single = welch_holm(_summary({**samples, "E": np.array([4.0])}))
+    tested = with_single[
+        (with_single["group1"] != "E") & (with_single["group2"] != "E")
+    ]
+    np.testing.assert_allclose(tested["p-adj"], complete["p-adj"])
+
+
+def test_tukey_without_pooled_variance_gives_nan():
+    summary = _summary(
+        {"A": np.array([1.0]), "B": np.array([2.0]), "C": np.array([3.0])}
+    )
+    table = tukey_hsd(summary)
+    assert table[["p-adj", "lower", "upper"]].isna().all().all()
+    assert not table["reject"].any()
@@ -0,0 +1,165 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.preview import SAMPLING_KEY, sample_analysis, sampling_bounds
+from utils.reservoir import StratifiedReservoir, proportional_allocation
+from utils.schema import column
+
+RESPONSES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "responses.csv"
+)
+
+
+def _frame(rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            column("age"): rng.choice(
+                ["10-19", "20-29", "30-49"], rows, p=[0.2, 0.5, 0.3]
+            ),
+            column("canton"): rng.choice(
+                ["GE", "VD", "JU", None], rows, p=[0.4, 0.4, 0.15, 0.05]
+            ),
+            "row": np.arange(rows),
+        }
+    )
+
+
+def test_proportional_allocation():
+    # Restes égaux (1.5 et 0.5) : la première strate l'emporte.
+    assert proportional_allocation([50, 30, 15, 5], 10).tolist() == [5, 3, 2, 0]
+
+    assert proportional_allocation([3, 1, 1], 100).tolist() == [3, 1, 1]
+    assert proportional_allocation([0, 0], 5).tolist() == [0, 0]
+    # Plus forts restes : 10 × (0.45, 0.35, 0.2) = 4.5, 3.5, 2.
+    assert proportional_allocation([45, 35, 20], 10).tolist() == [5, 3, 2]
+
+
+def test_sample_is_stratified_and_proportional():
+    frame = _frame()
+    reservoir = StratifiedReservoir(60)
+    reservoir.update(frame)
+    sample = reservoir.sample()
+
+    assert sample.rows == 60 and sample.population_rows == len(frame)
+    assert sample.fraction == pytest.approx(0.1)
+    assert sample.population.sum() == len(frame)
+
+    strata = frame[[column("age"), column("canton")]].astype(object).fillna("∅")
+    population = strata.value_counts()
+    chosen = strata.loc[sample.frame["row"]].value_counts()
+    expected = dict(
+        zip(
+            sorted(population.index),
+            proportional_allocation(population.sort_index(), 60),
+        )
+    )
+    assert {k: v for k, v in expected.items() if v} == chosen.to_dict()
+
+
+def test_chunked_updates_give_the_same_sample():
+    frame = _frame()
+    single = StratifiedReservoir(50, seed=3)
+    single.update(frame)
+
+    chunked = StratifiedReservoir(50, seed=3)
+    for start in range(0, len(frame), 37):
+        chunked.update(frame.iloc[start : start + 37])
+
+    pd.testing.assert_frame_equal(single.sample().frame, chunked.sample().frame)
+
+
+def test_inclusion_is_uniform_within_strata():
+    frame = _frame(rows=200)
+    stratum = (frame[column("age")] == "20-29") & (frame[column("canton")] == "GE")
+    draws = 2_000
+    inclusion = np.zeros(len(frame))
+    for seed in range(draws):
+        reservoir = StratifiedReservoir(40, seed=seed)
+        reservoir.update(frame)
+        inclusion[reservoir.sample().frame["row"]] += 1
+
+    rates = inclusion[stratum.to_numpy()] / draws
+    expected = rates.mean()
+    assert np.abs(rates - expected).max() < 5 * np.sqrt(
+        expected * (1 - expected) / draws
+    )
+
+
+def test_resample_keeps_stratum_sizes():
+    reservoir = StratifiedReservoir(80)
+    reservoir.update(_frame())
+    sample = reservoir.sample()
+
+    resampled = sample.resample(np.random.default_rng(0))
+    columns = [column("age"), column("canton")]
+    assert resampled[columns].astype(object).fillna("∅").value_counts().to_dict() == (
+        sample.frame[columns].astype(object).fillna("∅").value_counts().to_dict()
+    )
+
+
+def test_size_must_be_positive():
+    with pytest.raises(ValueError):
+        StratifiedReservoir(0)
+
+
+def test_sampling_bounds():
+    estimate = {"mean": 2.0, "group": {"share": 0.5}, "label": "x", "flag": True}
+    replicates = [
+        {"mean": 1.0, "group": {"share": 0.4}},
+        {"mean": 3.0, "group": {"share": 0.6}},
+    ]
+    bounds = sampling_bounds(estimate, replicates, fpc=0.5)
+
+    assert bounds["mean"]["standard_error"] == pytest.approx(
+        0.5 * np.std([1, 3], ddof=1)
+    )
+    assert bounds["mean"]["ci_low"] < 2.0 < bounds["mean"]["ci_high"]
+    assert set(bounds) == {"mean", "group"}
+    assert np.isnan(sampling_bounds(estimate, replicates[:1])["mean"]["standard_error"])
+
+
+def _counting_analysis(fail_every, error):
+    calls = []
+
+    def analysis(plot=True, state=None):
+        calls.append(state)
+        if len(calls) > 1 and len(calls) % fail_every == 0:
+            raise error("trop peu de réponses")
+        return {"rows": state["rows"]}
+
+    return analysis
+
+
+def _update(state, df):
+    state["rows"] = len(df)
+
+
+def test_sample_analysis_counts_skipped_replicates():
+    analysis = _counting_analysis(3, ValueError)
+    result = sample_analysis(
+        analysis, [column("age")], dict, _update, 50, replicates=9, file_path=RESPONSES
+    )
+
+    sampling = result[SAMPLING_KEY]
+    assert sampling["rows"] == 50 == result["rows"]
+    assert sampling["skipped_replicates"] == 3
+    assert sampling["replicates"] == 6
+    assert sampling["bounds"]["rows"]["standard_error"] == 0
+
+
+def test_sample_analysis_propagates_unexpected_errors():
+    analysis = _counting_analysis(2, KeyError)
+    with pytest.raises(KeyError):
+        sample_analysis(
+            analysis,
+            [column("age")],
+            dict,
+            _update,
+            50,
+            replicates=3,
+            file_path=RESPONSES,
+        )
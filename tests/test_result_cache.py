@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+from utils.result_cache import ResultCache
+
+KEY = "ab" * 32
+FIGURE = os.path.join("graphs", "1a_screen_time_by_age.png")
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Cache contenant une entrée avec une figure, dans un dossier de
+    travail temporaire."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("graphs")
+    with open(FIGURE, "wb") as f:
+        f.write(b"png")
+
+    cache = ResultCache(directory="cache")
+    cache.put(KEY, "1a", {"mean": 1.5}, [FIGURE])
+    return cache
+
+
+def test_missing_figure_is_restored(cache):
+    os.remove(FIGURE)
+
+    assert cache.get(KEY) == {"mean": 1.5}
+    assert cache.hits == 1
+    with open(FIGURE, "rb") as f:
+        assert f.read() == b"png"
+
+
+def test_unrestorable_figure_evicts_the_entry(cache):
+    os.remove(FIGURE)
+    os.remove(os.path.join(cache._entry_dir(KEY), os.path.basename(FIGURE)))
+
+    assert cache.get(KEY) is None
+    assert cache.misses == 1
+    assert not os.path.exists(cache._entry_dir(KEY))
+    with open(os.path.join("cache", "manifest.json"), encoding="utf-8") as f:
+        assert json.load(f)["entries"] == []
+
+
+def test_entry_being_written_is_kept(cache):
+    os.remove(os.path.join(cache._entry_dir(KEY), "meta.json"))
+
+    assert cache.get(KEY) is None
+    assert cache.misses == 1
+    assert os.path.exists(os.path.join(cache._entry_dir(KEY), "result.pkl"))
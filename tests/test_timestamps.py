@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.timestamps import DAY, MISSING, parse_form_timestamps
+from utils.windows import parse_window, window_bounds
+
+
+def _epoch(text):
+    return int(pd.Timestamp(text).value // 10**9)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2025/03/30 02:22:38 PM GMT+2", "2025-03-30 12:22:38"),
+        ("2025/03/30 12:05:00 AM GMT+2", "2025-03-29 22:05:00"),
+        ("2025/03/30 12:05:00 PM GMT", "2025-03-30 12:05:00"),
+        ("2024/02/29 11:59:59 PM GMT-10", "2024-03-01 09:59:59"),
+        ("2025/01/01 01:00:00 AM GMT+5:30", "2024-12-31 19:30:00"),
+    ],
+)
+def test_parses_to_universal_time(value, expected):
+    assert parse_form_timestamps([value])[0] == _epoch(expected)
+
+
+def test_local_time_keeps_displayed_clock():
+    parsed = parse_form_timestamps(["2025/03/30 02:22:38 PM GMT+2"], local=True)
+    assert parsed[0] == _epoch("2025-03-30 14:22:38")
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        "",
+        "2025/02/29 10:00:00 AM GMT+2",
+        "2025/13/01 10:00:00 AM GMT+2",
+        "2025/03/30 13:00:00 PM GMT+2",
+        "2025/03/30 00:00:00 AM GMT+2",
+        "2025/03/30 10:60:00 AM GMT+2",
+        "2025/03/30 10:00:00 XM GMT+2",
+        "2025-03-30 10:00:00 AM GMT+2",
+        "2025/03/30 10:00:00 AM GMT+15",
+        "2025/03/30 10:00:00 AM GMT+2:3",
+        "2025/03/30 10:00:00 AM GMT+2 ",
+        "2025/03/30 10:00:00 AM UTC",
+    ],
+)
+def test_malformed_values_are_missing(value):
+    assert parse_form_timestamps([value])[0] == MISSING
+
+
+def test_matches_pandas_on_survey_export():
+    values = pd.Series(
+        [
+            "2025/03/28 09:15:02 AM GMT+2",
+            "2025/03/31 11:47:55 PM GMT+2",
+            "2025/04/02 12:00:00 PM GMT+2",
+        ]
+    )
+    expected = pd.to_datetime(
+        values.str.removesuffix(" GMT+2"), format="%Y/%m/%d %I:%M:%S %p"
+    )
+    parsed = parse_form_timestamps(values, local=True)
+    np.testing.assert_array_equal(
+        parsed, expected.astype("datetime64[s]").astype("int64")
+    )
+
+
+def test_categorical_values_are_parsed_once_per_category():
+    values = pd.Series(
+        ["2025/03/30 02:22:38 PM GMT+2", None, "2025/03/30 02:22:38 PM GMT+2"],
+        dtype="category",
+    )
+    parsed = parse_form_timestamps(values)
+    assert parsed[0] == parsed[2] == _epoch("2025-03-30 12:22:38")
+    assert parsed[1] == MISSING
+
+
+def test_parse_window():
+    assert parse_window("day") == (1, False)
+    assert parse_window("week") == (7, False)
+    assert parse_window("7d") == (7, True)
+    for window in ("0d", "month", "d7"):
+        with pytest.raises(ValueError):
+            parse_window(window)
+
+
+def test_window_bounds_slice_sorted_epochs():
+    # Du mercredi 2025-03-26 au mardi 2025-04-01, sans réponse le 28.
+    days = np.array([0, 0, 1, 3, 4, 5, 6])
+    epochs = _epoch("2025-03-26") + days * DAY + 3600
+
+    assert window_bounds(epochs, "day") == [
+        ("2025-03-26", 0, 2),
+        ("2025-03-27", 2, 3),
+        ("2025-03-29", 3, 4),
+        ("2025-03-30", 4, 5),
+        ("2025-03-31", 5, 6),
+        ("2025-04-01", 6, 7),
+    ]
+    assert window_bounds(epochs, "week") == [("2025-03-24", 0, 5), ("2025-03-31", 5, 7)]
+    assert window_bounds(epochs, "3d")[0] == ("2025-03-26/2025-03-28", 0, 3)
+    assert window_bounds(epochs[:0], "day") == []
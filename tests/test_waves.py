@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.schema import column
+from utils.waves import (
+    _first_seen,
+    align_columns,
+    iter_wave_chunks,
+    read_waves,
+    source_files,
+)
+
+RESPONSES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "responses.csv"
+)
+
+
+def _rows(df):
+    """Lignes d'un DataFrame comparables indépendamment de l'ordre et du type."""
+    values = df.astype(object).where(df.notna(), None).values.tolist()
+    return sorted(map(tuple, values), key=repr)
+
+
+@pytest.fixture
+def waves(tmp_path):
+    """Deux exports qui se recouvrent, le second avec des intitulés modifiés."""
+    responses = pd.read_csv(RESPONSES)
+    first = responses.iloc[:120]
+    second = responses.iloc[80:].rename(
+        columns={
+            column("age"): column("age").upper(),
+            column("canton"): column("canton").replace(" ?", "?") + " ",
+        }
+    )
+    first.to_csv(tmp_path / "responses_1.csv", index=False)
+    second.to_csv(tmp_path / "responses_2.csv", index=False)
+    (tmp_path / "waves.txt").write_text(
+        "# exports\nresponses_2.csv\n\nresponses_1.csv\n"
+    )
+    return tmp_path, responses
+
+
+def test_source_files_from_glob_and_manifest(waves):
+    directory, _ = waves
+    assert [
+        os.path.basename(p) for p in source_files(str(directory / "responses_*.csv"))
+    ] == [
+        "responses_1.csv",
+        "responses_2.csv",
+    ]
+    assert [
+        os.path.basename(p) for p in source_files(str(directory / "waves.txt"))
+    ] == [
+        "responses_2.csv",
+        "responses_1.csv",
+    ]
+    with pytest.raises(FileNotFoundError):
+        source_files(str(directory / "missing_*.csv"))
+
+
+def test_align_columns_restores_canonical_headers():
+    df = pd.DataFrame(
+        columns=["QUEL EST VOTRE ÂGE ?", "Quel est votre canton de résidence? ", "x"]
+    )
+    assert list(align_columns(df).columns) == [column("age"), column("canton"), "x"]
+
+
+@pytest.mark.parametrize("source", ["responses_*.csv", "waves.txt"])
+def test_read_waves_removes_overlap(waves, source):
+    directory, responses = waves
+    combined = read_waves(str(directory / source))
+    assert len(combined) == len(responses)
+    assert _rows(combined[responses.columns]) == _rows(responses)
+
+
+@pytest.mark.parametrize("chunksize", [7, 50, 1_000])
+def test_chunks_match_combined_waves(waves, chunksize):
+    directory, responses = waves
+    headers = list(responses.columns[:6])
+    chunks = pd.concat(
+        iter_wave_chunks(str(directory / "responses_*.csv"), headers, chunksize)
+    )
+    assert len(chunks) == len(responses)
+    assert _rows(chunks) == _rows(responses[headers])
+
+
+def test_first_seen_keeps_first_occurrence_within_and_across_blocks():
+    seen = set()
+    first = _first_seen(np.array([5, 3, 5, 8], dtype=np.uint64), seen)
+    second = _first_seen(np.array([3, 9, 9], dtype=np.uint64), seen)
+    assert first.tolist() == [True, True, False, True]
+    assert second.tolist() == [False, True, False]
+    assert seen == {3, 5, 8, 9}
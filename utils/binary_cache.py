@@ -0,0 +1,113 @@
+import hashlib
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from utils.schema import TEXT_KEYS, compact_answers, question_key
+
+SIDECAR_SUFFIX = ".cache.npz"
+
+_source_hashes = {}
+
+
+def sidecar_path(file_path):
+    return f"{file_path}{SIDECAR_SUFFIX}"
+
+
+def source_hash(file_path):
+    """Empreinte SHA-256 du fichier source, mémorisée par (taille, mtime)."""
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+    digest = _source_hashes.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        _source_hashes[key] = digest
+
+    return digest
+
+
+def _smallest_code_dtype(n_categories):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def write_sidecar(file_path, df):
+    """Enregistre df en colonnes binaires à côté de file_path.
+
+    Les colonnes texte sont stockées comme codes catégoriels (-1 pour les
+    valeurs manquantes) accompagnés de leur vocabulaire ; les colonnes
+    numériques sont stockées telles quelles.
+    """
+    arrays = {
+        "source_hash": np.array(source_hash(file_path)),
+        "columns": np.array(list(df.columns), dtype=str),
+    }
+
+    for i, column in enumerate(df.columns):
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values):
+            arrays[f"c{i}_values"] = values.to_numpy()
+        else:
+            codes, categories = pd.factorize(values)
+            arrays[f"c{i}_codes"] = codes.astype(_smallest_code_dtype(len(categories)))
+            arrays[f"c{i}_categories"] = np.asarray(categories, dtype=str)
+
+    path = sidecar_path(file_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_sidecar(file_path, columns=None):
+    """Relit les colonnes demandées depuis le cache binaire de file_path.
+
+    Renvoie None si le cache est absent, illisible ou ne correspond plus au
+    contenu du fichier source. Seules les colonnes demandées sont lues. Les
+    réponses connues de QUESTIONS sont reconstruites directement dans leur
+    type catégoriel à partir des codes stockés, sans repasser par le texte.
+    """
+    path = sidecar_path(file_path)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as sidecar:
+            if str(sidecar["source_hash"]) != source_hash(file_path):
+                return None
+
+            stored_columns = list(sidecar["columns"])
+            if columns is None:
+                columns = stored_columns
+            elif not set(columns) <= set(stored_columns):
+                return None
+
+            data = {}
+            for column in columns:
+                i = stored_columns.index(column)
+                if f"c{i}_values" in sidecar.files:
+                    data[column] = sidecar[f"c{i}_values"]
+                    continue
+
+                codes = sidecar[f"c{i}_codes"]
+                categories = sidecar[f"c{i}_categories"].astype(object)
+                key = question_key(column)
+                if key is None or key in TEXT_KEYS:
+                    decoded = np.append(categories, np.nan)[codes]
+                    data[column] = pd.Series(decoded)
+                else:
+                    answers = pd.Categorical.from_codes(codes, categories=categories)
+                    data[column] = compact_answers(pd.Series(answers), key)
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+    return pd.DataFrame(data, columns=columns)
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from utils.count_cube import count_table
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_SEED = 0
+DEFAULT_CHUNK_SIZE = 2_000
+
+
+def _bootstrap_means(table, levels, n_resamples, seed, chunk_size):
+    """Moyennes rééchantillonnées, tableau (n_resamples, groupes).
+
+    Tirer n indices avec remise dans un groupe dont les valeurs ne prennent
+    que quelques niveaux revient à tirer les effectifs de chaque niveau selon
+    une loi multinomiale : tous les groupes et tous les rééchantillons d'un
+    bloc sont tirés en un seul appel, sans matrice d'indices de taille n.
+    """
+    rng = np.random.default_rng(seed)
+    counts = table.to_numpy(dtype=np.int64)
+    n = counts.sum(axis=1)
+    pvals = counts / n[:, None]
+
+    means = np.empty((n_resamples, len(n)))
+    for start in range(0, n_resamples, chunk_size):
+        stop = min(start + chunk_size, n_resamples)
+        draws = rng.multinomial(n, pvals, size=(stop - start, len(n)))
+        means[start:stop] = draws @ levels / n
+
+    return means
+
+
+def _jackknife(counts, levels):
+    """Moyennes sans une observation, pour chaque niveau, et leurs poids."""
+    n = counts.sum()
+    total = counts @ levels
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (total - levels) / (n - 1), counts
+
+
+def _acceleration(jackknives):
+    numerator = 0.0
+    denominator = 0.0
+    for values, weights in jackknives:
+        center = (weights * values).sum() / weights.sum()
+        numerator += (weights * (center - values) ** 3).sum()
+        denominator += (weights * (center - values) ** 2).sum()
+
+    if denominator == 0:
+        return 0.0
+    return numerator / (6.0 * denominator**1.5)
+
+
+def _interval(estimate, resampled, jackknives, confidence, method):
+    alpha = (1 - confidence) / 2
+
+    if method == "percentile":
+        low, high = np.quantile(resampled, [alpha, 1 - alpha])
+        return low, high
+
+    if method != "bca":
+        raise ValueError(f"Méthode de bootstrap inconnue : {method}")
+
+    proportion = ((resampled < estimate).sum() + (resampled <= estimate).sum()) / (
+        2 * len(resampled)
+    )
+    z0 = ndtri(proportion)
+    a = _acceleration(jackknives)
+
+    z = ndtri(np.array([alpha, 1 - alpha]))
+    levels = ndtr(z0 + (z0 + z) / (1 - a * (z0 + z)))
+
+    low, high = np.quantile(resampled, levels)
+    return low, high
+
+
+def bootstrap_means(
+    counts,
+    n_resamples=DEFAULT_RESAMPLES,
+    confidence=0.95,
+    method="bca",
+    seed=DEFAULT_SEED,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """Intervalles de confiance bootstrap de la moyenne de chaque groupe.
+
+    counts est indexé par (groupe, valeur), comme count_cube.weighted_counts.
+    method vaut "bca" (biais corrigé et accéléré) ou "percentile". Renvoie un
+    DataFrame indexé par groupe : mean, ci_low, ci_high, count. Les groupes
+    d'une seule réponse ont un intervalle NaN.
+    """
+    table, levels = count_table(counts)
+    resampled = _bootstrap_means(table, levels, n_resamples, seed, chunk_size)
+
+    rows = []
+    for i, group in enumerate(table.index):
+        group_counts = table.iloc[i].to_numpy(dtype=float)
+        n = group_counts.sum()
+        estimate = group_counts @ levels / n
+
+        if n < 2:
+            low, high = np.nan, np.nan
+        else:
+            present = group_counts > 0
+            jackknife = _jackknife(group_counts[present], levels[present])
+            low, high = _interval(
+                estimate, resampled[:, i], [jackknife], confidence, method
+            )
+
+        rows.append((group, estimate, low, high, int(n)))
+
+    return pd.DataFrame(
+        rows, columns=["group", "mean", "ci_low", "ci_high", "count"]
+    ).set_index("group")
+
+
+def bootstrap_mean_difference(
+    counts,
+    group_a,
+    group_b,
+    n_resamples=DEFAULT_RESAMPLES,
+    confidence=0.95,
+    method="bca",
+    seed=DEFAULT_SEED,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """Intervalle de confiance bootstrap de mean(group_a) - mean(group_b).
+
+    Les deux groupes sont rééchantillonnés indépendamment. Renvoie
+    (différence, borne basse, borne haute) ; tout est NaN si l'un des groupes
+    n'a aucune réponse.
+    """
+    table, levels = count_table(counts)
+    if group_a not in table.index or group_b not in table.index:
+        return np.nan, np.nan, np.nan
+
+    table = table.loc[[group_a, group_b]]
+    resampled = _bootstrap_means(table, levels, n_resamples, seed, chunk_size)
+
+    counts_a = table.loc[group_a].to_numpy(dtype=float)
+    counts_b = table.loc[group_b].to_numpy(dtype=float)
+    mean_a = counts_a @ levels / counts_a.sum()
+    mean_b = counts_b @ levels / counts_b.sum()
+    estimate = mean_a - mean_b
+
+    if min(counts_a.sum(), counts_b.sum()) < 2:
+        return estimate, np.nan, np.nan
+
+    present_a, present_b = counts_a > 0, counts_b > 0
+    jackknife_a, weights_a = _jackknife(counts_a[present_a], levels[present_a])
+    jackknife_b, weights_b = _jackknife(counts_b[present_b], levels[present_b])
+
+    low, high = _interval(
+        estimate,
+        resampled[:, 0] - resampled[:, 1],
+        [(jackknife_a - mean_b, weights_a), (mean_a - jackknife_b, weights_b)],
+        confidence,
+        method,
+    )
+    return estimate, low, high
@@ -0,0 +1,358 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+METHODS = ("pearson", "spearman", "kendall")
+
+# Lignes traitées par produit de matrices : les indicatrices d'un bloc
+# tiennent dans le cache et, non pondérées, restent exactes en float32.
+_BLOCK_ROWS = 8192
+
+
+def _codes(values, levels):
+    """Numéro de chaque réponse dans levels (-1 si absente ou manquante)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        recode = np.append(pd.Index(levels).get_indexer(values.cat.categories), -1)
+        return recode[values.cat.codes.to_numpy()]
+    return pd.Index(levels).get_indexer(values)
+
+
+class PairwiseTables:
+    """Tableaux de contingence de toutes les paires de colonnes à la fois.
+
+    Les réponses de chaque colonne sont numérotées une seule fois ; le
+    produit indicatrices^T × indicatrices donne alors, d'une seule
+    multiplication par bloc de lignes, les effectifs croisés de toutes les
+    paires. Une ligne
+    où l'une des deux réponses manque est exclue de la paire (suppression
+    par paire, comme nan_policy="omit"). Les tableaux s'additionnent bloc
+    par bloc : la mémoire ne dépend que du nombre de réponses distinctes.
+
+    scales fixe les réponses (et leur ordre) des colonnes ordinales ; les
+    réponses hors échelle y sont traitées comme manquantes. Les réponses des
+    autres colonnes sont celles observées.
+    """
+
+    def __init__(self, scales=None):
+        self.scales = {
+            column: list(levels) for column, levels in (scales or {}).items()
+        }
+        self.levels = {}
+        self.counts = np.zeros((0, 0))
+
+    @classmethod
+    def from_frame(cls, df, scales=None, weights=None):
+        tables = cls(scales)
+        tables.update(df, weights)
+        return tables
+
+    @property
+    def columns(self):
+        return list(self.levels)
+
+    def _offsets(self):
+        sizes = [len(levels) for levels in self.levels.values()]
+        return dict(zip(self.levels, np.cumsum([0] + sizes[:-1])))
+
+    def _extend(self, levels):
+        """Ajoute des colonnes ou des réponses sans perdre les effectifs."""
+        old_offsets = self._offsets()
+        old_positions = [
+            old_offsets[column] + np.arange(len(answers))
+            for column, answers in self.levels.items()
+        ]
+        self.levels = {
+            **self.levels,
+            **{
+                column: self.levels.get(column, []) + answers
+                for column, answers in levels.items()
+            },
+        }
+
+        # Les colonnes déjà connues gardent leur rang ; leurs nouvelles
+        # réponses et les nouvelles colonnes viennent à la suite.
+        offsets = self._offsets()
+        new_positions = np.concatenate(
+            [np.zeros(0, dtype=np.int64)]
+            + [
+                offsets[column] + np.arange(len(positions))
+                for column, positions in zip(self.levels, old_positions)
+            ]
+        )
+        size = sum(len(answers) for answers in self.levels.values())
+        counts = np.zeros((size, size))
+        counts[np.ix_(new_positions, new_positions)] = self.counts
+        self.counts = counts
+
+    def _new_levels(self, df):
+        new_levels = {}
+        for column in df.columns:
+            if column in self.scales:
+                answers = self.scales[column] if column not in self.levels else []
+            else:
+                known = set(self.levels.get(column, []))
+                answers = sorted(
+                    str(answer)
+                    for answer in df[column].dropna().unique()
+                    if str(answer) not in known
+                )
+            if answers or column not in self.levels:
+                new_levels[column] = answers
+        return new_levels
+
+    def update(self, df, weights=None):
+        """Ajoute les lignes de df (pondérées par weights) aux tableaux."""
+        new_levels = self._new_levels(df)
+        if new_levels:
+            self._extend(new_levels)
+
+        offsets = self._offsets()
+        size = len(self.counts)
+        # Une colonne de plus reçoit les réponses manquantes, puis est ignorée.
+        positions = np.empty((len(df), len(df.columns)), dtype=np.int64)
+        for i, column in enumerate(df.columns):
+            codes = _codes(df[column], self.levels[column])
+            positions[:, i] = np.where(codes >= 0, offsets[column] + codes, size)
+
+        dtype = np.float32 if weights is None else np.float64
+        if weights is not None:
+            weights = np.asarray(weights, dtype=dtype)[:, None]
+
+        counts = np.zeros((size + 1, size + 1))
+        for start in range(0, len(df), _BLOCK_ROWS):
+            block = positions[start : start + _BLOCK_ROWS]
+            indicators = np.zeros((len(block), size + 1), dtype=dtype)
+            indicators[np.arange(len(block))[:, None], block] = 1.0
+
+            weighted = indicators
+            if weights is not None:
+                weighted = indicators * weights[start : start + _BLOCK_ROWS]
+            counts += indicators.T @ weighted
+
+        self.counts = self.counts + counts[:size, :size]
+
+    def merge(self, other):
+        if other.levels:
+            self._extend(
+                {
+                    column: [
+                        answer
+                        for answer in answers
+                        if answer not in self.levels.get(column, [])
+                    ]
+                    for column, answers in other.levels.items()
+                }
+            )
+            offsets = self._offsets()
+            positions = np.concatenate(
+                [
+                    offsets[column] + pd.Index(self.levels[column]).get_indexer(answers)
+                    for column, answers in other.levels.items()
+                ]
+            )
+            self.counts[np.ix_(positions, positions)] += other.counts
+
+    def table(self, a, b):
+        """Tableau croisé des réponses de a (lignes) et de b (colonnes)."""
+        offsets = self._offsets()
+        rows = slice(offsets[a], offsets[a] + len(self.levels[a]))
+        cols = slice(offsets[b], offsets[b] + len(self.levels[b]))
+        return pd.DataFrame(
+            self.counts[rows, cols], index=self.levels[a], columns=self.levels[b]
+        )
+
+    def blocks(self, columns):
+        """Tableau de contingence restreint aux colonnes choisies.
+
+        Renvoie (counts, blocks, owner) : le sous-tableau des réponses de
+        columns, l'indicatrice réponse → colonne (une ligne par réponse, une
+        colonne par question) et l'indice de la question de chaque réponse.
+        """
+        offsets = self._offsets()
+        positions = np.concatenate(
+            [
+                offsets[column] + np.arange(len(self.levels[column]))
+                for column in columns
+            ]
+        )
+        owner = np.repeat(
+            np.arange(len(columns)), [len(self.levels[column]) for column in columns]
+        )
+        blocks = np.zeros((len(positions), len(columns)))
+        blocks[np.arange(len(positions)), owner] = 1.0
+        return self.counts[np.ix_(positions, positions)], blocks, owner
+
+
+def _tail_sums(table):
+    """Effectif total des cases strictement en dessous et à droite de chaque case."""
+    tail = table[::-1, ::-1].cumsum(axis=0).cumsum(axis=1)[::-1, ::-1]
+    return np.pad(tail, ((0, 1), (0, 1)))[1:, 1:]
+
+
+def _pairwise_pearson(counts, blocks, left):
+    """Corrélation de Pearson et effectif de chaque paire de colonnes.
+
+    left[a, b] est la valeur donnée à la réponse a dans sa paire avec la
+    colonne de la réponse b ; toutes les sommes des paires s'obtiennent par
+    des produits de matrices sur le tableau de contingence.
+    """
+    right = left.T
+
+    n = blocks.T @ counts @ blocks
+    sx = blocks.T @ (counts * left) @ blocks
+    sxx = blocks.T @ (counts * left**2) @ blocks
+    sxy = blocks.T @ (counts * left * right) @ blocks
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_x = sxx - sx**2 / n
+        r = cov / np.sqrt(var_x * var_x.T)
+
+    r = np.clip(r, -1.0, 1.0)
+    np.fill_diagonal(r, 1.0)
+    return r, n
+
+
+def _midranks(counts, blocks, owner):
+    """Rang moyen de chaque réponse dans sa paire avec chaque colonne.
+
+    Les rangs ne sont calculés qu'une fois par colonne, pour toutes ses
+    paires à la fois : ranks[a, j] est le rang de la réponse a parmi les
+    lignes où la colonne j est renseignée.
+    """
+    marginal = counts @ blocks
+    cumulative = pd.DataFrame(marginal).groupby(owner).cumsum().to_numpy()
+    return cumulative - (marginal - 1) / 2.0
+
+
+def _kendall_tau_b(table):
+    """tau-b de Kendall et p-value d'un tableau croisé de réponses ordonnées.
+
+    La p-value suit l'approximation normale avec correction des ex aequo de
+    scipy.stats.kendalltau(method="asymptotic").
+    """
+    n = table.sum()
+    concordant = (table * _tail_sums(table)).sum()
+    discordant = (table * _tail_sums(table[:, ::-1])[:, ::-1]).sum()
+
+    rows = table.sum(axis=1)
+    cols = table.sum(axis=0)
+    total = n * (n - 1) / 2
+    x_ties = (rows * (rows - 1) / 2).sum()
+    y_ties = (cols * (cols - 1) / 2).sum()
+
+    if n < 2 or x_ties == total or y_ties == total:
+        return np.nan, np.nan
+
+    difference = concordant - discordant
+    tau = difference / np.sqrt(total - x_ties) / np.sqrt(total - y_ties)
+
+    m = n * (n - 1)
+    var = (
+        (
+            m * (2 * n + 5)
+            - (rows * (rows - 1) * (2 * rows + 5)).sum()
+            - (cols * (cols - 1) * (2 * cols + 5)).sum()
+        )
+        / 18
+        + 2 * x_ties * y_ties / m
+        + (rows * (rows - 1) * (rows - 2)).sum()
+        * (cols * (cols - 1) * (cols - 2)).sum()
+        / (9 * m * (n - 2))
+    )
+    p_value = 2 * stats.norm.sf(abs(difference) / np.sqrt(var))
+
+    return min(max(tau, -1.0), 1.0), p_value
+
+
+def _frames(columns, *matrices):
+    return tuple(
+        pd.DataFrame(matrix, index=columns, columns=columns) for matrix in matrices
+    )
+
+
+def correlation_matrix(tables, columns=None, method="spearman", scores=None):
+    """Corrélations de toutes les paires de colonnes ordinales de tables.
+
+    method vaut "pearson" (sur scores, la valeur numérique de chaque réponse
+    de chaque colonne, par défaut son rang dans l'échelle), "spearman" ou
+    "kendall" (tau-b). Les lignes où l'une des deux réponses manque sont
+    exclues de la paire. Renvoie (corrélations, p-values), deux DataFrames
+    indexés par colonne ; les valeurs sont celles de scipy.stats.pearsonr,
+    spearmanr et kendalltau(method="asymptotic") sur les lignes développées.
+    """
+    if method not in METHODS:
+        raise ValueError(
+            f"Méthode de corrélation inconnue : {method} (choix : {', '.join(METHODS)})"
+        )
+
+    columns = tables.columns if columns is None else list(columns)
+    counts, blocks, owner = tables.blocks(columns)
+
+    if method == "kendall":
+        r = np.eye(len(columns))
+        p = np.zeros((len(columns), len(columns)))
+        for i, j in zip(*np.triu_indices(len(columns), 1)):
+            table = counts[np.ix_(owner == i, owner == j)]
+            r[i, j], p[i, j] = _kendall_tau_b(table)
+            r[j, i], p[j, i] = r[i, j], p[i, j]
+        return _frames(columns, r, p)
+
+    if method == "pearson":
+        scores = scores or {}
+        values = np.concatenate(
+            [
+                np.asarray(
+                    scores.get(column, np.arange(len(tables.levels[column]))),
+                    dtype=float,
+                )
+                for column in columns
+            ]
+        )
+        left = np.broadcast_to(values[:, None], counts.shape)
+    else:
+        left = _midranks(counts, blocks, owner) @ blocks.T
+
+    r, n = _pairwise_pearson(counts, blocks, left)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "pearson":
+            ab = np.maximum(n / 2 - 1, 0.0)
+            p = 2 * stats.beta(ab, ab, loc=-1, scale=2).sf(np.abs(r))
+        else:
+            dof = n - 2
+            t = r * np.sqrt(np.maximum(dof / ((r + 1.0) * (1.0 - r)), 0))
+            p = 2 * stats.t.sf(np.abs(t), dof)
+
+    np.fill_diagonal(p, 0.0)
+    return _frames(columns, r, p)
+
+
+def cramers_v(tables, columns=None):
+    """V de Cramér et p-value du khi-deux de toutes les paires de colonnes.
+
+    Les effectifs attendus de chaque paire se déduisent des marges du
+    tableau de contingence commun ; le khi-deux est calculé sans correction
+    de continuité, comme scipy.stats.contingency.association. Les réponses
+    absentes d'une paire n'y comptent pas dans le nombre de modalités.
+    Renvoie (V, p-values), deux DataFrames indexés par colonne.
+    """
+    columns = tables.columns if columns is None else list(columns)
+    counts, blocks, _ = tables.blocks(columns)
+
+    marginal = counts @ blocks
+    row_totals = marginal @ blocks.T
+    n = blocks.T @ counts @ blocks
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(counts > 0, counts**2 / (row_totals * row_totals.T), 0.0)
+        chi2 = n * (blocks.T @ ratio @ blocks - 1.0)
+
+        levels = blocks.T @ (marginal > 0)
+        dof = (levels - 1) * (levels.T - 1)
+        v = np.sqrt(chi2 / n / np.minimum(levels - 1, levels.T - 1))
+        p = stats.chi2.sf(chi2, dof)
+
+    np.fill_diagonal(v, 1.0)
+    np.fill_diagonal(p, 0.0)
+    return _frames(columns, np.clip(v, 0.0, 1.0), p)
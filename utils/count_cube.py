@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+class CountCube:
+    """Effectif de chaque combinaison distincte de réponses brutes.
+
+    Toutes les valeurs numériques des analyses sont des centres de classes :
+    quelques dizaines de combinaisons de réponses suffisent à décrire tout
+    le fichier. Une fois le comptage fait, moyennes, variances, ANOVA et
+    corrélations se calculent sur ces combinaisons pondérées par leur
+    effectif, quel que soit le nombre de lignes. Les réponses manquantes
+    forment des combinaisons comme les autres.
+    """
+
+    def __init__(self, counts=None):
+        self.counts = counts
+
+    @classmethod
+    def from_frame(cls, df):
+        cube = cls()
+        cube.update(df)
+        return cube
+
+    def update(self, df):
+        counts = df.groupby(
+            list(df.columns), dropna=False, observed=True, sort=False
+        ).size()
+        self._add(counts)
+
+    def merge(self, other):
+        if other.counts is not None:
+            self._add(other.counts)
+
+    def _add(self, counts):
+        if self.counts is not None:
+            counts = (
+                pd.concat([self.counts, counts])
+                .groupby(level=list(range(counts.index.nlevels)), dropna=False)
+                .sum()
+            )
+        self.counts = counts.astype("int64")
+
+    def total(self):
+        return 0 if self.counts is None else int(self.counts.sum())
+
+    def prepared(self, prepare):
+        """Applique prepare (le prepare_data d'un script) aux combinaisons.
+
+        prepare reçoit un DataFrame d'une ligne par combinaison, avec les
+        colonnes d'origine ; il peut filtrer des lignes mais doit garder leur
+        index. Renvoie (données préparées, effectif de chaque ligne).
+        """
+        frame = self.counts.index.to_frame(index=False)
+        data = prepare(frame)
+        return data, self.counts.to_numpy()[data.index.to_numpy()]
+
+
+def weighted_counts(weights, *keys):
+    """Somme des effectifs par combinaison de keys (valeurs manquantes exclues)."""
+    return (
+        pd.Series(weights, index=keys[0].index).groupby(list(keys), observed=True).sum()
+    )
+
+
+def count_table(counts):
+    """Tableau groupe × niveau des effectifs, et les niveaux en flottants.
+
+    counts est indexé par (groupe, valeur), comme weighted_counts. Les
+    groupes sans effectif sont retirés ; les lignes sont triées par groupe.
+    """
+    table = counts.groupby(level=[0, 1], observed=True).sum().unstack(fill_value=0)
+    table = table[table.sum(axis=1) > 0].sort_index()
+    return table, table.columns.to_numpy(dtype=float)
+
+
+def weighted_mean(values, weights):
+    values = np.asarray(values, dtype=float)
+    return np.float64((values * weights).sum() / weights.sum())
+
+
+def group_summary(counts):
+    """Moyenne, écart-type (ddof=1) et effectif par groupe.
+
+    counts est indexé par (groupe, valeur), comme weighted_counts. Renvoie
+    un DataFrame indexé par groupe : mean, std, count.
+    """
+    groups = counts.index.get_level_values(0)
+    values = counts.index.get_level_values(1).to_numpy(dtype=float)
+    weights = counts.to_numpy(dtype=float)
+
+    count = pd.Series(weights).groupby(groups).sum()
+    mean = pd.Series(weights * values).groupby(groups).sum() / count
+
+    deviations = values - mean.reindex(groups).to_numpy()
+    m2 = pd.Series(weights * deviations**2).groupby(groups).sum()
+    std = np.sqrt(m2 / (count - 1)).where(count > 1)
+
+    return pd.DataFrame(
+        {"mean": mean, "std": std, "count": count.astype("int64")}
+    ).sort_index()
+
+
+def one_way_anova(count, mean, std):
+    """ANOVA à un facteur depuis l'effectif, la moyenne et l'écart-type par groupe.
+
+    Équivaut à scipy.stats.f_oneway sur les valeurs individuelles.
+    """
+    n = np.asarray(count, dtype=float)
+    mean = np.asarray(mean, dtype=float)
+    m2 = np.nan_to_num(np.asarray(std, dtype=float) ** 2) * (n - 1)
+
+    k = len(n)
+    n_total = n.sum()
+    grand_mean = (n * mean).sum() / n_total
+
+    ss_between = (n * (mean - grand_mean) ** 2).sum()
+    ss_within = m2.sum()
+
+    df_between = k - 1
+    df_within = n_total - k
+
+    f_val = (ss_between / df_between) / (ss_within / df_within)
+    p_val = stats.f.sf(f_val, df_between, df_within)
+
+    return np.float64(f_val), np.float64(p_val)
+
+
+def _weighted_pearson(x, y, weights):
+    n = weights.sum()
+    x = x - (weights * x).sum() / n
+    y = y - (weights * y).sum() / n
+
+    r = (weights * x * y).sum() / np.sqrt(
+        (weights * x * x).sum() * (weights * y * y).sum()
+    )
+    return float(np.clip(r, -1.0, 1.0)), n
+
+
+def _midranks(values, weights):
+    """Rang moyen (ex aequo compris) de chaque valeur distincte pondérée."""
+    totals = pd.Series(weights).groupby(values).sum().sort_index()
+    ranks = totals.cumsum() - (totals - 1) / 2.0
+    return ranks.reindex(values).to_numpy()
+
+
+def correlations_from_counts(counts):
+    """Corrélations de Pearson et de Spearman depuis un tableau d'effectifs.
+
+    counts est indexé par les couples (x, y) observés. Les valeurs sont
+    identiques à scipy.stats.pearsonr et spearmanr sur les lignes développées.
+    """
+    x = counts.index.get_level_values(0).to_numpy(dtype=float)
+    y = counts.index.get_level_values(1).to_numpy(dtype=float)
+    weights = counts.to_numpy(dtype=float)
+
+    pearson_r, n = _weighted_pearson(x, y, weights)
+    ab = n / 2 - 1
+    pearson_p = 2 * stats.beta(ab, ab, loc=-1, scale=2).sf(abs(pearson_r))
+
+    spearman_r, _ = _weighted_pearson(
+        _midranks(x, weights), _midranks(y, weights), weights
+    )
+    dof = n - 2
+    t = spearman_r * np.sqrt(max(dof / ((spearman_r + 1.0) * (1.0 - spearman_r)), 0))
+    spearman_p = 2 * stats.t.sf(abs(t), dof)
+
+    return (
+        (np.float64(pearson_r), np.float64(pearson_p)),
+        (np.float64(spearman_r), np.float64(spearman_p)),
+    )
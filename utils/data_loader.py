@@ -1,53 +1,438 @@
-import pandas as pd
+import functools
 import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.binary_cache import read_sidecar, write_sidecar
+from utils.count_cube import CountCube
+from utils.multi_select import MULTI_SELECT_COLUMNS, MultiSelectMatrix
+from utils.profiling import stage, timed
+from utils.rendering import render_profile
+from utils.reservoir import DEFAULT_SEED, StratifiedReservoir
+from utils.schema import ORDINAL_SCALES, column, compact_frame
+from utils.timestamps import parse_form_timestamps
+from utils.waves import is_multi_source, iter_wave_chunks, read_waves, source_key
+
+_data_cache = OrderedDict()
+_data_cache_max_entries = 4
+_binary_cache_enabled = False
+_multi_select_cache = {}
+_count_cube_cache = {}
+_timestamp_cache = {}
+_sample_cache = {}
+_column_projection = None
+_data_source = "responses.csv"
+_lock = threading.RLock()
+_figures_local = threading.local()
+
+
+def _cache_key(file_path):
+    if is_multi_source(file_path):
+        return source_key(file_path) + (None,)
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, None)
+
+
+def _synchronized(function):
+    """Sérialise les appels : des analyses lancées dans des threads se
+    partagent les caches, et un seul thread lit une version du fichier."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with _lock:
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def enable_binary_cache(enabled=True):
+    global _binary_cache_enabled
+    _binary_cache_enabled = enabled
+
+
+def set_data_source(source):
+    """Source lue par défaut par load_data et les fonctions voisines : un
+    fichier de réponses, un motif glob (par ex. "exports/responses*.csv") ou
+    un manifeste .txt listant les exports (voir utils.waves)."""
+    global _data_source
+    _data_source = source
+
+
+def data_source():
+    return _data_source
+
+
+def _projected(columns):
+    """Colonnes à lire pour servir columns (voir set_column_projection)."""
+    if (
+        columns is not None
+        and _column_projection is not None
+        and set(columns) <= set(_column_projection)
+    ):
+        return _column_projection
+    return columns
+
+
+def set_column_projection(columns):
+    """Colonnes à lire ensemble dès qu'une analyse en demande une partie.
+
+    run_analysis.py y place l'union des colonnes déclarées par les analyses
+    à exécuter : le fichier n'est alors lu qu'une fois, limité à ces
+    colonnes, et chaque analyse reçoit sa projection depuis la mémoire.
+    None revient à la lecture des seules colonnes demandées.
+    """
+    global _column_projection
+    _column_projection = list(columns) if columns is not None else None
+
+
+@timed()
+@_synchronized
+def load_data(file_path=None, columns=None, binary_cache=None):
+    """Charge le fichier de réponses, une seule fois par version du fichier.
+
+    columns limite le chargement aux colonnes utiles à une analyse : seules
+    ces colonnes (ou celles de set_column_projection qui les contiennent)
+    sont lues, et toute demande couverte par un DataFrame déjà chargé est
+    servie depuis la mémoire. Avec le cache binaire (binary_cache, ou
+    enable_binary_cache()), le fichier est décodé une fois dans un fichier
+    compagnon .cache.npz dont les lectures suivantes ne relisent que les
+    colonnes demandées.
+
+    Les réponses sont gardées en catégories (voir utils.schema) : chaque
+    cellule n'occupe qu'un code int8 et les comparaisons à une réponse se
+    font sur ces codes. Le DataFrame renvoyé est partagé entre les appels ;
+    la sélection de colonnes n'en copie rien (copy-on-write), il ne doit
+    simplement pas être modifié sur place.
+
+    file_path vaut par défaut la source de set_data_source. Une source de
+    plusieurs exports est lue en parallèle, alignée sur les intitulés de
+    utils.schema et dédoublonnée (voir utils.waves.read_waves).
+    """
+    file_path = file_path or _data_source
+    if binary_cache is None:
+        binary_cache = _binary_cache_enabled
+
+    full_key = _cache_key(file_path)
+    key = full_key[:3] + (tuple(columns) if columns is not None else None,)
+
+    df = _cached_frame(key)
+    if df is None and columns is not None:
+        df = _covering_frame(key)
+
+    if df is None:
+        for stale_key in [
+            k for k in _data_cache if k[0] == key[0] and k[1:3] != key[1:3]
+        ]:
+            del _data_cache[stale_key]
+
+        read_columns = _projected(columns)
+        read_key = full_key[:3] + (
+            tuple(read_columns) if read_columns is not None else None,
+        )
+
+        if is_multi_source(file_path):
+            with stage("read_waves"):
+                full_df = read_waves(file_path, binary_cache=binary_cache)
+            _store_frame(full_key, full_df)
+            df = full_df if columns is None else full_df[list(columns)]
+        elif binary_cache:
+            with stage("read_sidecar"):
+                df = read_sidecar(file_path, read_columns)
+            if df is None:
+                with stage("read_csv"):
+                    full_df = pd.read_csv(file_path, sep=",")
+                with stage("write_sidecar"):
+                    write_sidecar(file_path, full_df)
+                full_df = _compact(full_df)
+                _store_frame(full_key, full_df)
+                df = full_df if columns is None else full_df[list(columns)]
+            else:
+                df = _compact(df)
+                _store_frame(read_key, df)
+                df = df if columns is None else df[list(columns)]
+        else:
+            with stage("read_csv"):
+                df = pd.read_csv(file_path, sep=",", usecols=read_columns)
+            if read_columns is not None:
+                df = df[list(read_columns)]
+            df = _compact(df)
+            _store_frame(read_key, df)
+            df = df if columns is None else df[list(columns)]
+
+    os.makedirs("graphs", exist_ok=True)
+
+    return df
+
+
+@timed()
+@_synchronized
+def load_multi_select(column, file_path=None):
+    """Matrice d'indicateurs d'une colonne à choix multiples.
+
+    column est une clé de MULTI_SELECT_COLUMNS (par ex. "social_networks") ou
+    l'intitulé de la question. La colonne n'est découpée qu'une fois par
+    version du fichier.
+    """
+    file_path = file_path or _data_source
+    column = MULTI_SELECT_COLUMNS.get(column, column)
+    key = _cache_key(file_path)[:3] + (column,)
+
+    matrix = _multi_select_cache.get(key)
+    if matrix is None:
+        df = load_data(file_path, columns=[column])
+        matrix = MultiSelectMatrix.from_series(df[column])
+
+        for stale_key in [
+            k for k in _multi_select_cache if k[0] == key[0] and k[1:3] != key[1:3]
+        ]:
+            del _multi_select_cache[stale_key]
+
+        _multi_select_cache[key] = matrix
+
+    return matrix
+
+
+@timed()
+@_synchronized
+def load_count_cube(columns, file_path=None):
+    """Tableau des effectifs de chaque combinaison de réponses de columns.
+
+    Le comptage n'est fait qu'une fois par version du fichier et par
+    ensemble de colonnes.
+    """
+    file_path = file_path or _data_source
+    key = _cache_key(file_path)[:3] + (tuple(columns),)
+
+    cube = _count_cube_cache.get(key)
+    if cube is None:
+        cube = CountCube.from_frame(load_data(file_path, columns=list(columns)))
+
+        for stale_key in [
+            k for k in _count_cube_cache if k[0] == key[0] and k[1:3] != key[1:3]
+        ]:
+            del _count_cube_cache[stale_key]
+
+        _count_cube_cache[key] = cube
+
+    return cube
+
+
+@timed()
+@_synchronized
+def load_timestamps(file_path=None, local=False):
+    """Horodatages des réponses en secondes depuis 1970 (int64), dans l'ordre
+    des lignes de load_data.
 
+    Voir utils.timestamps.parse_form_timestamps ; la colonne n'est lue et
+    convertie qu'une fois par version du fichier.
+    """
+    file_path = file_path or _data_source
+    key = _cache_key(file_path)[:3] + (local,)
 
-def load_data(file_path="responses.csv"):
-    df = pd.read_csv(file_path, sep=",")
+    epochs = _timestamp_cache.get(key)
+    if epochs is None:
+        header = column("timestamp")
+        df = load_data(file_path, columns=[header])
+        epochs = parse_form_timestamps(df[header], local=local)
 
-    if not os.path.exists("graphs"):
-        os.makedirs("graphs")
+        for stale_key in [
+            k for k in _timestamp_cache if k[0] == key[0] and k[1:3] != key[1:3]
+        ]:
+            del _timestamp_cache[stale_key]
 
+        _timestamp_cache[key] = epochs
+
+    return epochs
+
+
+@timed()
+@_synchronized
+def load_sample(size, columns, seed=DEFAULT_SEED, chunksize=None, file_path=None):
+    """Échantillon stratifié (âge × canton) de size réponses, limité à
+    columns et aux colonnes de strate.
+
+    L'échantillon est tiré en une passe par utils.reservoir.StratifiedReservoir
+    : depuis le DataFrame de load_data lorsqu'il est déjà en mémoire ou que
+    le cache binaire est activé, sinon en lisant le fichier par blocs de
+    chunksize lignes sans le garder en mémoire. Il n'est construit qu'une
+    fois par version du fichier, taille, graine et colonnes lues (celles de
+    set_column_projection lorsqu'elles couvrent columns).
+    """
+    file_path = file_path or _data_source
+    reservoir = StratifiedReservoir(size, seed=seed)
+    read_columns = list(
+        dict.fromkeys(list(_projected(list(columns))) + reservoir.strata)
+    )
+    version = _cache_key(file_path)[:3]
+    key = version + (size, seed, tuple(read_columns))
+
+    sample = _sample_cache.get(key)
+    if sample is None:
+        in_memory = _covering_frame(version + (tuple(read_columns),)) is not None
+        if in_memory or _binary_cache_enabled:
+            chunks = [load_data(file_path, columns=read_columns)]
+        else:
+            chunks = iter_data_chunks(file_path, read_columns, chunksize or 100_000)
+
+        with stage("sample"):
+            for chunk in chunks:
+                reservoir.update(chunk)
+            sample = reservoir.sample()
+        sample.frame = _compact(sample.frame)
+
+        for stale_key in [
+            k for k in _sample_cache if k[0] == key[0] and k[1:3] != key[1:3]
+        ]:
+            del _sample_cache[stale_key]
+
+        _sample_cache[key] = sample
+
+    return sample
+
+
+def iter_data_chunks(file_path=None, columns=None, chunksize=100_000, byte_offset=0):
+    """Lit le fichier de réponses par blocs de chunksize lignes au plus.
+
+    Avec byte_offset, la lecture commence à cette position (début d'une ligne
+    de données) en réutilisant l'en-tête du fichier. Une source de plusieurs
+    exports est lue export par export (voir utils.waves.iter_wave_chunks).
+    """
+    file_path = file_path or _data_source
+    if is_multi_source(file_path):
+        if byte_offset:
+            raise ValueError(
+                "byte_offset n'est pas pris en charge pour une source de plusieurs exports"
+            )
+        yield from iter_wave_chunks(file_path, columns, chunksize)
+        return
+
+    usecols = list(columns) if columns is not None else None
+
+    if not byte_offset:
+        with pd.read_csv(
+            file_path, sep=",", usecols=usecols, chunksize=chunksize
+        ) as reader:
+            for chunk in reader:
+                yield chunk if usecols is None else chunk[usecols]
+        return
+
+    header = list(pd.read_csv(file_path, sep=",", nrows=0).columns)
+
+    with open(file_path, "rb") as f:
+        f.seek(byte_offset)
+        with pd.read_csv(
+            f,
+            sep=",",
+            header=None,
+            names=header,
+            usecols=usecols,
+            chunksize=chunksize,
+        ) as reader:
+            for chunk in reader:
+                yield chunk if usecols is None else chunk[usecols]
+
+
+def _compact(df):
+    with stage("compact"):
+        return compact_frame(df)
+
+
+def _cached_frame(key):
+    df = _data_cache.get(key)
+    if df is not None:
+        _data_cache.move_to_end(key)
     return df
 
 
+def _covering_frame(key):
+    """Colonnes key[3] tirées d'un DataFrame en cache de la même version."""
+    for cached_key in reversed(_data_cache):
+        if cached_key[:3] == key[:3] and (
+            cached_key[3] is None or set(key[3]) <= set(cached_key[3])
+        ):
+            _data_cache.move_to_end(cached_key)
+            return _data_cache[cached_key][list(key[3])]
+    return None
+
+
+def _store_frame(key, df):
+    _data_cache[key] = df
+    _trim_data_cache()
+
+
+def _trim_data_cache():
+    while len(_data_cache) > _data_cache_max_entries:
+        _data_cache.popitem(last=False)
+
+
+def clear_data_cache():
+    _data_cache.clear()
+    _multi_select_cache.clear()
+    _count_cube_cache.clear()
+    _timestamp_cache.clear()
+    _sample_cache.clear()
+
+
+def set_data_cache_size(max_entries):
+    global _data_cache_max_entries
+
+    if max_entries < 0:
+        raise ValueError("max_entries doit être positif ou nul")
+
+    _data_cache_max_entries = max_entries
+    _trim_data_cache()
+
+
+_scale_lookups = {}
+
+
+def _scale_lookup(scale):
+    lookup = _scale_lookups.get(scale)
+    if lookup is None:
+        mapping = ORDINAL_SCALES[scale]
+        # La dernière case reçoit le code -1 des réponses hors échelle.
+        lookup = (
+            pd.Index(list(mapping)),
+            np.array(list(mapping.values()) + [np.nan], dtype=float),
+        )
+        _scale_lookups[scale] = lookup
+    return lookup
+
+
+@timed()
+def decode_ordinal(values, scale):
+    """Convertit une colonne de réponses en valeurs numériques en une passe.
+
+    Chaque réponse distincte n'est décodée qu'une fois ; les lignes sont
+    ensuite résolues par indexation d'un tableau NumPy. Les réponses absentes
+    de l'échelle deviennent NaN.
+    """
+    answers, lookup = _scale_lookup(scale)
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+
+    category_values = np.append(lookup[answers.get_indexer(uniques)], np.nan)
+
+    return pd.Series(category_values[codes], index=values.index, dtype=float)
+
+
 def map_age_to_numeric(age_category):
-    age_mapping = {
-        "10-14 ans": 12,
-        "15-19 ans": 17,
-        "20-29 ans": 25,
-        "30-39 ans": 35,
-        "40-49 ans": 45,
-        "50-59 ans": 55,
-        "60-70 ans": 65,
-        "Plus de 70 ans": 75,
-    }
-    return age_mapping.get(age_category, None)
+    return ORDINAL_SCALES["age"].get(age_category, None)
 
 
 def map_screen_time_to_numeric(screen_time):
-    time_mapping = {
-        "Moins de 1 heure": 0.5,
-        "1-2 heures": 1.5,
-        "2-3 heures": 2.5,
-        "3-4 heures": 3.5,
-        "4-5 heures": 4.5,
-        "5-6 heures": 5.5,
-        "Plus de 6 heures": 6.5,
-    }
-    return time_mapping.get(screen_time, None)
+    return ORDINAL_SCALES["screen_time"].get(screen_time, None)
 
 
 def map_social_media_time_to_numeric(social_time):
-    time_mapping = {
-        "Moins de 30 minutes": 0.25,
-        "30 minutes à 1 heure": 0.75,
-        "1 à 2 heures": 1.5,
-        "2 à 3 heures": 2.5,
-        "3 à 4 heures": 3.5,
-        "Plus de 4 heures": 4.5,
-    }
-    return time_mapping.get(social_time, None)
+    return ORDINAL_SCALES["social_media_time"].get(social_time, None)
 
 
 def filter_neuchatel_data(df):
@@ -60,14 +445,45 @@ def format_hours(hours):
     return f"{hours_part}h{minutes_part:02d}m"
 
 
-def save_figure(plt, filename, title=None, xlabel=None, ylabel=None):
+def save_figure(fig, filename, title=None, xlabel=None, ylabel=None):
+    """Enregistre fig (matplotlib.figure.Figure) dans graphs/ selon le profil
+    de rendu (résolution et formats, voir utils.rendering).
+
+    Le titre et les libellés s'appliquent aux axes courants de fig. Rien ne
+    passe par l'état global de pyplot : des threads peuvent enregistrer leurs
+    figures en même temps.
+    """
+    ax = fig.gca()
     if title:
-        plt.title(title)
+        ax.set_title(title)
     if xlabel:
-        plt.xlabel(xlabel)
+        ax.set_xlabel(xlabel)
     if ylabel:
-        plt.ylabel(ylabel)
+        ax.set_ylabel(ylabel)
+
+    profile = render_profile()
+    paths = [f"graphs/{filename}.{extension}" for extension in profile["formats"]]
+
+    with stage("tight_layout"):
+        fig.tight_layout()
+    with stage("savefig"):
+        for path in paths:
+            fig.savefig(path, dpi=profile["dpi"])
+
+    record_saved_figures(paths)
+
+
+def _thread_figures():
+    figures = getattr(_figures_local, "paths", None)
+    if figures is None:
+        figures = _figures_local.paths = []
+    return figures
+
+
+def record_saved_figures(paths):
+    _thread_figures().extend(paths)
+
 
-    plt.tight_layout()
-    plt.savefig(f"graphs/{filename}.png", dpi=300)
-    plt.close()
+def saved_figures():
+    """Chemins des figures enregistrées par save_figure dans ce thread."""
+    return list(_thread_figures())
@@ -0,0 +1,77 @@
+from utils.data_loader import iter_data_chunks, load_data
+from utils.profiling import timed
+from utils.schema import QUESTIONS, compact_frame
+
+FACET_COLUMNS = {
+    key: QUESTIONS[key] for key in ("age", "gender", "canton", "situation")
+}
+
+# Échecs attendus d'une analyse sur un sous-groupe trop petit : effectifs
+# nuls (division par zéro) ou test statistique non défini (ValueError de
+# numpy et scipy). Toute autre exception est une erreur du script.
+SUBGROUP_ERRORS = (ArithmeticError, ValueError)
+
+
+def facet_column(facet):
+    """Intitulé de la question d'une clé de FACET_COLUMNS (ou l'intitulé tel quel)."""
+    return FACET_COLUMNS.get(facet, facet)
+
+
+@timed()
+def facet_states(
+    columns, new_state, update_state, facet, file_path=None, chunksize=None
+):
+    """Construit l'état cumulé d'une analyse pour chaque valeur de facet.
+
+    Les réponses sont lues une seule fois : depuis le DataFrame partagé de
+    load_data, ou par blocs de chunksize lignes. Chaque bloc est converti en
+    catégories (utils.schema) avant d'être découpé, de sorte que les réponses ne sont
+    factorisées qu'une fois et que decode_ordinal n'a plus qu'à relire les
+    codes de chaque sous-groupe. Les lignes sans valeur de facet sont
+    ignorées.
+    """
+    column = facet_column(facet)
+    read_columns = list(dict.fromkeys(list(columns) + [column]))
+
+    if chunksize:
+        chunks = iter_data_chunks(file_path, read_columns, chunksize)
+    else:
+        chunks = [load_data(file_path, columns=read_columns)]
+
+    states = {}
+    for chunk in chunks:
+        chunk = compact_frame(chunk)
+        for level, part in chunk.groupby(column, observed=True, sort=False):
+            if level not in states:
+                states[level] = new_state()
+            update_state(states[level], part)
+
+    return dict(sorted(states.items()))
+
+
+def facet_analysis(
+    analysis_function,
+    columns,
+    new_state,
+    update_state,
+    facet,
+    file_path=None,
+    chunksize=None,
+):
+    """Exécute une analyse pour chaque valeur de facet, en une seule lecture.
+
+    analysis_function est appelée avec state=<état du sous-groupe> et sans
+    graphique. Renvoie {valeur: résultat} ; un sous-groupe pour lequel
+    l'analyse échoue faute de réponses (SUBGROUP_ERRORS) reçoit
+    {"error": message}, les autres exceptions remontent.
+    """
+    states = facet_states(columns, new_state, update_state, facet, file_path, chunksize)
+
+    results = {}
+    for level, state in states.items():
+        try:
+            results[level] = analysis_function(plot=False, state=state)
+        except SUBGROUP_ERRORS as e:
+            results[level] = {"error": str(e)}
+
+    return results
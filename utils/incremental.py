@@ -0,0 +1,127 @@
+import hashlib
+import inspect
+import os
+import pickle
+
+from utils.data_loader import data_source, iter_data_chunks
+from utils.profiling import timed
+from utils.waves import is_multi_source
+
+STATE_DIR = ".analysis_state"
+DEFAULT_CHUNKSIZE = 100_000
+
+_SIGNATURE_BYTES = 4096
+
+
+def _file_signature(file_path, size):
+    """Empreinte des derniers octets avant size, pour vérifier qu'un fichier
+    n'a fait que grandir depuis la dernière lecture."""
+    start = max(0, size - _SIGNATURE_BYTES)
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(size - start)).hexdigest()
+
+
+def _code_hash(module_file):
+    with open(module_file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def state_path(name, file_path):
+    digest = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:12]
+    return os.path.join(STATE_DIR, f"{name}-{digest}.pkl")
+
+
+def _load_state(path, file_path, columns, code_hash):
+    try:
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    if saved.get("code_hash") != code_hash or saved.get("columns") != columns:
+        return None
+
+    if os.path.getsize(file_path) < saved["size"]:
+        return None
+
+    if _file_signature(file_path, saved["size"]) != saved["signature"]:
+        return None
+
+    return saved
+
+
+def _save_state(path, saved):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+@timed()
+def accumulate_state(
+    columns,
+    new_state,
+    update_state,
+    file_path=None,
+    chunksize=None,
+    incremental=False,
+):
+    """Construit l'état cumulé d'une analyse en lisant le fichier par blocs.
+
+    new_state() crée un état vide et update_state(state, chunk) y ajoute un
+    bloc de réponses brutes. Avec incremental=True, l'état est conservé dans
+    STATE_DIR avec la position atteinte dans le fichier : tant que le fichier
+    ne fait que grandir (export Google Forms ré-téléchargé), seules les
+    nouvelles lignes sont lues. Toute autre modification du fichier, ou du
+    script de l'analyse, provoque un recalcul complet. Le mode incrémental
+    ne s'applique qu'à un fichier unique.
+    """
+    file_path = file_path or data_source()
+    if incremental and is_multi_source(file_path):
+        raise ValueError(
+            f"Le mode incrémental demande un seul fichier de réponses, pas {file_path}"
+        )
+
+    module_file = inspect.getsourcefile(inspect.unwrap(update_state))
+    name = os.path.splitext(os.path.basename(module_file))[0]
+    code_hash = _code_hash(module_file)
+    columns = list(columns)
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+
+    path = state_path(name, file_path)
+    saved = _load_state(path, file_path, columns, code_hash) if incremental else None
+
+    if saved is None:
+        state, rows = new_state(), 0
+        chunks = iter_data_chunks(file_path, columns, chunksize)
+    else:
+        state, rows = saved["state"], saved["rows"]
+        if os.path.getsize(file_path) > saved["size"]:
+            chunks = iter_data_chunks(
+                file_path, columns, chunksize, byte_offset=saved["size"]
+            )
+        else:
+            chunks = []
+
+    for chunk in chunks:
+        update_state(state, chunk)
+        rows += len(chunk)
+
+    if incremental:
+        size = os.path.getsize(file_path)
+        _save_state(
+            path,
+            {
+                "code_hash": code_hash,
+                "columns": columns,
+                "size": size,
+                "signature": _file_signature(file_path, size),
+                "rows": rows,
+                "state": state,
+            },
+        )
+
+    return state
@@ -0,0 +1,111 @@
+import csv
+
+import numpy as np
+import pandas as pd
+
+from utils.schema import MULTI_SELECT_KEYS, QUESTIONS
+
+MULTI_SELECT_COLUMNS = {key: QUESTIONS[key] for key in MULTI_SELECT_KEYS}
+
+
+def split_answer(cell):
+    """Découpe une réponse à choix multiples sur ";".
+
+    Les éléments entre guillemets peuvent contenir des ";" ou des virgules,
+    comme "Messagerie (WhatsApp, Signal, etc.)".
+    """
+    items = next(csv.reader([cell], delimiter=";", skipinitialspace=True), [])
+    return [item.strip() for item in items if item.strip()]
+
+
+class MultiSelectMatrix:
+    """Matrice d'indicateurs (répondant × élément) d'une colonne à choix multiples.
+
+    Les réponses identiques sont internées : chaque ligne ne stocke que le
+    code de sa réponse, et chaque réponse distincte une rangée de bits
+    compactée avec np.packbits. Les tableaux croisés par groupe se calculent
+    sans jamais développer la matrice ligne par ligne.
+    """
+
+    def __init__(self, index, vocabulary, answer_codes, answer_bits):
+        self.index = index
+        self.vocabulary = vocabulary
+        self.answer_codes = answer_codes
+        self.answer_bits = answer_bits
+
+    @classmethod
+    def from_series(cls, values):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            answers = values.cat.categories
+        else:
+            codes, answers = pd.factorize(values)
+
+        split_answers = [split_answer(answer) for answer in answers]
+        vocabulary = pd.Index(
+            sorted({item for items in split_answers for item in items})
+        )
+
+        indicators = np.zeros((len(answers), len(vocabulary)), dtype=bool)
+        for i, items in enumerate(split_answers):
+            indicators[i, vocabulary.get_indexer(items)] = True
+
+        return cls(
+            values.index,
+            vocabulary,
+            codes.astype(np.int32),
+            np.packbits(indicators, axis=1),
+        )
+
+    def _answer_indicators(self):
+        return np.unpackbits(
+            self.answer_bits, axis=1, count=len(self.vocabulary)
+        ).astype(bool)
+
+    def to_frame(self):
+        """Matrice développée : une colonne booléenne par élément."""
+        rows = np.vstack(
+            [self._answer_indicators(), np.zeros(len(self.vocabulary), dtype=bool)]
+        )
+        return pd.DataFrame(
+            rows[self.answer_codes], index=self.index, columns=self.vocabulary
+        )
+
+    def counts(self):
+        """Nombre de répondants ayant coché chaque élément."""
+        answered = self.answer_codes[self.answer_codes >= 0]
+        answer_counts = np.bincount(answered, minlength=len(self.answer_bits))
+
+        return pd.Series(
+            answer_counts @ self._answer_indicators(), index=self.vocabulary
+        )
+
+    def counts_by(self, groups, weights=None):
+        """Tableau élément × groupe du nombre de répondants ayant coché chaque
+        élément. Les lignes dont le groupe est manquant sont ignorées ; weights
+        donne, si besoin, le nombre de répondants représentés par chaque ligne.
+        """
+        groups = pd.Series(groups).reindex(self.index)
+        group_codes, group_labels = pd.factorize(groups, sort=True)
+
+        mask = (group_codes >= 0) & (self.answer_codes >= 0)
+        n_answers = len(self.answer_bits)
+        flat = (
+            self.answer_codes[mask].astype(np.int64) * len(group_labels)
+            + group_codes[mask]
+        )
+
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.int64)[mask]
+
+        answer_by_group = (
+            np.bincount(flat, weights=weights, minlength=n_answers * len(group_labels))
+            .astype(np.int64)
+            .reshape(n_answers, len(group_labels))
+        )
+
+        return pd.DataFrame(
+            self._answer_indicators().T.astype(np.int64) @ answer_by_group,
+            index=self.vocabulary,
+            columns=group_labels,
+        )
@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.bootstrap import DEFAULT_SEED
+from utils.count_cube import count_table
+
+DEFAULT_PERMUTATIONS = 100_000
+DEFAULT_BATCH_SIZE = 25_000
+
+_workers = 1
+
+
+def set_permutation_workers(workers):
+    """Nombre de processus entre lesquels permutation_test répartit ses
+    séries de permutations lorsque workers n'est pas précisé."""
+    global _workers
+
+    if workers < 1:
+        raise ValueError("Le nombre de processus doit être d'au moins 1")
+    _workers = workers
+
+
+def _permuted_differences(pooled, levels, n_a, n_b, size, seed):
+    """Différences de moyennes pour size permutations des étiquettes.
+
+    Répartir au hasard les étiquettes des deux groupes revient à tirer sans
+    remise les n_a réponses du groupe A dans l'échantillon commun : les
+    effectifs de chaque niveau suivent une loi hypergéométrique
+    multivariée, tirée pour toute la série en un seul appel.
+    """
+    rng = np.random.default_rng(seed)
+    counts_a = rng.multivariate_hypergeometric(pooled, n_a, size=size)
+    sum_a = counts_a @ levels
+    total = pooled @ levels
+    return sum_a / n_a - (total - sum_a) / n_b
+
+
+def permutation_test(
+    counts,
+    group_a,
+    group_b,
+    n_permutations=DEFAULT_PERMUTATIONS,
+    seed=DEFAULT_SEED,
+    workers=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """Test de permutation bilatéral de mean(group_a) - mean(group_b).
+
+    La p-valeur est la proportion de permutations dont la différence est au
+    moins aussi grande en valeur absolue que la différence observée.
+
+    counts est indexé par (groupe, valeur), comme count_cube.weighted_counts.
+    Les permutations sont tirées par séries de batch_size, chacune avec sa
+    propre graine dérivée de seed : le résultat ne dépend pas de workers,
+    le nombre de processus entre lesquels les séries sont réparties (par
+    défaut celui de set_permutation_workers).
+
+    Renvoie un dictionnaire : statistic, p_value, mc_error (erreur type de
+    Monte-Carlo de la p-valeur) et n_permutations. statistic et p_value sont
+    NaN si l'un des groupes n'a aucune réponse.
+    """
+    table, levels = count_table(counts)
+    if group_a not in table.index or group_b not in table.index:
+        return {
+            "statistic": np.float64(np.nan),
+            "p_value": np.float64(np.nan),
+            "mc_error": np.float64(np.nan),
+            "n_permutations": n_permutations,
+        }
+
+    workers = _workers if workers is None else workers
+    counts_a = table.loc[group_a].to_numpy(dtype=np.int64)
+    counts_b = table.loc[group_b].to_numpy(dtype=np.int64)
+    n_a, n_b = int(counts_a.sum()), int(counts_b.sum())
+    pooled = counts_a + counts_b
+
+    statistic = counts_a @ levels / n_a - counts_b @ levels / n_b
+
+    sizes = [
+        min(batch_size, n_permutations - start)
+        for start in range(0, n_permutations, batch_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    batches = [(pooled, levels, n_a, n_b, size, s) for size, s in zip(sizes, seeds)]
+
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            differences = list(executor.map(_permuted_differences, *zip(*batches)))
+    else:
+        differences = [_permuted_differences(*batch) for batch in batches]
+
+    # Tolérance relative pour ne pas manquer les égalités dues aux arrondis.
+    threshold = abs(statistic) * (1 - 1e-12)
+    extreme = sum(int((np.abs(d) >= threshold).sum()) for d in differences)
+
+    p_value = (extreme + 1) / (n_permutations + 1)
+    mc_error = np.sqrt(p_value * (1 - p_value) / n_permutations)
+
+    return {
+        "statistic": np.float64(statistic),
+        "p_value": np.float64(p_value),
+        "mc_error": np.float64(mc_error),
+        "n_permutations": n_permutations,
+    }
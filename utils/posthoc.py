@@ -0,0 +1,317 @@
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+METHODS = ("tukey", "games_howell", "welch_holm")
+
+COMPARISON_DTYPES = {
+    "meandiff": "float64",
+    "p-adj": "float64",
+    "lower": "float64",
+    "upper": "float64",
+    "reject": "bool",
+}
+
+# Quadratures de Gauss-Legendre de la loi de l'étendue studentisée : z parcourt
+# la loi normale, u = log(s) la loi de s = chi(df) / sqrt(df).
+_Z_NODES, _Z_WEIGHTS = np.polynomial.legendre.leggauss(80)
+_Z_NODES = _Z_NODES * 8.5
+_Z_WEIGHTS = _Z_WEIGHTS * 8.5 * np.exp(-(_Z_NODES**2) / 2) / np.sqrt(2 * np.pi)
+_Z_CDF = special.ndtr(_Z_NODES)
+_U_NODES, _U_WEIGHTS = np.polynomial.legendre.leggauss(80)
+
+# L'étendue de k normales (df infini) est tabulée une fois par k sur
+# [0, _RANGE_MAX] puis interpolée (Hermite cubique) ; au-delà elle vaut 1.
+_RANGE_STEP = 0.01
+_RANGE_MAX = 20.0
+_range_tables = {}
+
+
+def _scale_quadrature(df):
+    """Nœuds s et poids de la loi de chi(df) / sqrt(df), un jeu par df.
+
+    La densité de log(s) est proportionnelle à exp(df * u - df * exp(2u) / 2) ;
+    l'intervalle d'intégration s'adapte à df pour couvrir ses deux queues.
+    """
+    df = np.asarray(df, dtype=float)[..., None]
+    low = -18.0 / df - 6.0 / np.sqrt(2.0 * df)
+    high = 0.5 * np.log1p(2.0 * (20.0 + 6.0 * np.sqrt(df)) / df)
+
+    u = (high + low) / 2 + (high - low) / 2 * _U_NODES
+    log_density = df * u - df * np.exp(2 * u) / 2
+    weights = _U_WEIGHTS * np.exp(log_density - log_density.max(axis=-1, keepdims=True))
+
+    return np.exp(u), weights / weights.sum(axis=-1, keepdims=True)
+
+
+def _range_table(k):
+    """Fonction de répartition et densité de l'étendue de k normales."""
+    table = _range_tables.get(k)
+    if table is None:
+        w = np.arange(0.0, _RANGE_MAX + _RANGE_STEP / 2, _RANGE_STEP)
+        shifted = _Z_NODES - w[:, None]
+        inside = np.clip(_Z_CDF - special.ndtr(shifted), 0.0, 1.0)
+        weighted = _Z_WEIGHTS * inside ** (k - 2)
+
+        cdf = k * (weighted * inside).sum(axis=-1)
+        pdf = (
+            k
+            * (k - 1)
+            * (weighted * np.exp(-(shifted**2) / 2)).sum(axis=-1)
+            / np.sqrt(2 * np.pi)
+        )
+        table = (cdf, pdf)
+        _range_tables[k] = table
+    return table
+
+
+def _range_distribution(w, k):
+    """Répartition et densité interpolées en w (NaN si w n'est pas fini,
+    c'est-à-dire si q ou df ne le sont pas)."""
+    cdf, pdf = _range_table(k)
+
+    finite = np.isfinite(w)
+    position = np.where(finite, np.minimum(w, _RANGE_MAX), 0.0) / _RANGE_STEP
+    i = np.minimum(position.astype(np.int64), len(cdf) - 2)
+    t = position - i
+
+    p0, p1 = cdf[i], cdf[i + 1]
+    m0, m1 = pdf[i] * _RANGE_STEP, pdf[i + 1] * _RANGE_STEP
+
+    value = (
+        (2 * t**3 - 3 * t**2 + 1) * p0
+        + (t**3 - 2 * t**2 + t) * m0
+        + (-2 * t**3 + 3 * t**2) * p1
+        + (t**3 - t**2) * m1
+    )
+    slope = (
+        (6 * t**2 - 6 * t) * p0
+        + (3 * t**2 - 4 * t + 1) * m0
+        + (-6 * t**2 + 6 * t) * p1
+        + (3 * t**2 - 2 * t) * m1
+    ) / _RANGE_STEP
+
+    beyond = finite & (w >= _RANGE_MAX)
+    value = np.where(beyond, 1.0, np.where(finite, value, np.nan))
+    slope = np.where(beyond, 0.0, np.where(finite, slope, np.nan))
+    return value, slope
+
+
+def _studentized_range(q, k, df):
+    """Fonction de répartition et densité de l'étendue studentisée.
+
+    P(Q <= q) est la moyenne, sur la loi de s, de l'étendue de k normales
+    évaluée en q * s. Vectorisé sur q et df (mêmes formes) et précis à ~1e-8
+    près, là où scipy.stats.studentized_range intègre point par point (et
+    passe à une approximation asymptotique pour les grands df). NaN là où q
+    ou df n'est pas fini.
+    """
+    q = np.asarray(q, dtype=float)
+    s, s_weights = _scale_quadrature(np.broadcast_to(df, q.shape))
+
+    range_cdf, range_pdf = _range_distribution(q[..., None] * s, k)
+
+    cdf = (s_weights * range_cdf).sum(axis=-1)
+    pdf = (s_weights * s * range_pdf).sum(axis=-1)
+    return np.clip(cdf, 0.0, 1.0), pdf
+
+
+def studentized_range_sf(q, k, df):
+    return 1.0 - _studentized_range(q, k, df)[0]
+
+
+def studentized_range_isf(p, k, df, max_iterations=8):
+    """Valeur critique q telle que P(Q > q) = p, par la méthode de Newton.
+
+    Le point de départ est la borne de Bonferroni sur les k(k-1)/2 paires,
+    exacte pour k = 2 et toujours proche de la solution.
+    """
+    df = np.asarray(df, dtype=float)
+    q = np.sqrt(2.0) * stats.t.isf(p / (k * (k - 1)), df)
+
+    for _ in range(max_iterations):
+        cdf, pdf = _studentized_range(q, k, df)
+        step = np.maximum(q - (cdf - (1.0 - p)) / pdf, q / 2) - q
+        q = q + step
+        if np.all(np.isnan(q) | (np.abs(step) < 1e-10 * q)):
+            break
+
+    return q
+
+
+def _pairs(summary):
+    summary = summary.sort_index()
+
+    n = summary["count"].to_numpy(dtype=float)
+    mean = summary["mean"].to_numpy(dtype=float)
+    var = np.nan_to_num(summary["std"].to_numpy(dtype=float) ** 2)
+
+    idx1, idx2 = np.triu_indices(len(summary), 1)
+    return summary.index.to_numpy(), n, mean, var, idx1, idx2
+
+
+def _welch(n, var, idx1, idx2):
+    """Erreur standard et degrés de liberté de Welch de chaque paire.
+
+    La variance d'un groupe d'une seule réponse n'est pas estimable : les
+    paires qui le comprennent ont une erreur standard et des degrés de
+    liberté NaN.
+    """
+    se2 = np.where(n >= 2, var / n, np.nan)
+    pair_se2 = se2[idx1] + se2[idx2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df = pair_se2**2 / (
+            se2[idx1] ** 2 / (n[idx1] - 1) + se2[idx2] ** 2 / (n[idx2] - 1)
+        )
+    return np.sqrt(pair_se2), df
+
+
+def _table(groups, idx1, idx2, meandiff, p_adj, lower, upper, reject):
+    return pd.DataFrame(
+        {
+            "group1": groups[idx1],
+            "group2": groups[idx2],
+            "meandiff": np.round(meandiff, 4),
+            "p-adj": np.round(p_adj, 4),
+            "lower": np.round(lower, 4),
+            "upper": np.round(upper, 4),
+            "reject": reject,
+        }
+    ).astype(COMPARISON_DTYPES)
+
+
+def tukey_hsd(summary, alpha=0.05):
+    """Test de Tukey-Kramer sur toutes les paires de groupes d'un résumé.
+
+    summary est indexé par groupe avec les colonnes mean, std et count. Le
+    tableau renvoyé a la même forme que celui de pairwise_tukeyhsd
+    (statsmodels) : group1, group2, meandiff, p-adj, lower, upper, reject.
+    Les groupes d'une seule réponse entrent dans la variance commune avec
+    un poids nul ; sans variance commune estimable (aucun degré de liberté
+    ou variance nulle), p-adj, lower et upper sont NaN.
+    """
+    groups, n, mean, var, idx1, idx2 = _pairs(summary)
+
+    k = len(groups)
+    df_within = n.sum() - k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled_var = (var * (n - 1)).sum() / df_within
+        if not pooled_var > 0:
+            pooled_var = df_within = np.nan
+
+        meandiff = mean[idx2] - mean[idx1]
+        std_pairs = np.sqrt(pooled_var / 2.0 * (1.0 / n[idx1] + 1.0 / n[idx2]))
+
+    q_crit = studentized_range_isf(alpha, k, df_within)
+    p_adj = studentized_range_sf(np.abs(meandiff) / std_pairs, k, df_within)
+    crit_int = std_pairs * q_crit
+
+    return _table(
+        groups,
+        idx1,
+        idx2,
+        meandiff,
+        p_adj,
+        meandiff - crit_int,
+        meandiff + crit_int,
+        np.abs(meandiff) / std_pairs > q_crit,
+    )
+
+
+def games_howell(summary, alpha=0.05):
+    """Test de Games-Howell : Tukey sans supposer des variances égales.
+
+    Chaque paire a son erreur standard et ses degrés de liberté de Welch.
+    Même tableau que tukey_hsd ; les paires comprenant un groupe d'une seule
+    réponse ont p-adj, lower et upper NaN (voir _welch).
+    """
+    groups, n, mean, var, idx1, idx2 = _pairs(summary)
+
+    k = len(groups)
+    meandiff = mean[idx2] - mean[idx1]
+    se, df = _welch(n, var, idx1, idx2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.abs(meandiff) / se * np.sqrt(2.0)
+    q_crit = studentized_range_isf(alpha, k, df)
+    p_adj = studentized_range_sf(q, k, df)
+    crit_int = q_crit / np.sqrt(2.0) * se
+
+    return _table(
+        groups,
+        idx1,
+        idx2,
+        meandiff,
+        p_adj,
+        meandiff - crit_int,
+        meandiff + crit_int,
+        q > q_crit,
+    )
+
+
+def welch_holm(summary, alpha=0.05):
+    """Tests t de Welch sur toutes les paires, p-values ajustées par Holm.
+
+    Les intervalles (lower, upper) sont ceux de Bonferroni, au niveau
+    1 - alpha pour l'ensemble des paires. Même tableau que tukey_hsd ; les
+    paires comprenant un groupe d'une seule réponse ont p-adj, lower et
+    upper NaN et ne comptent pas parmi les tests ajustés.
+    """
+    groups, n, mean, var, idx1, idx2 = _pairs(summary)
+
+    meandiff = mean[idx2] - mean[idx1]
+    se, df = _welch(n, var, idx1, idx2)
+    p_values = 2 * stats.t.sf(np.abs(meandiff) / se, df)
+
+    # Les p-values NaN sont triées en dernier et le restent après l'ajustement.
+    m = max(int(np.isfinite(p_values).sum()), 1)
+    order = np.argsort(p_values, kind="stable")
+    adjusted = np.fmax.accumulate((m - np.arange(len(p_values))) * p_values[order])
+    p_adj = np.empty(len(p_values))
+    p_adj[order] = np.where(
+        np.isnan(p_values[order]), np.nan, np.minimum(adjusted, 1.0)
+    )
+
+    crit_int = stats.t.isf(alpha / (2 * m), df) * se
+
+    return _table(
+        groups,
+        idx1,
+        idx2,
+        meandiff,
+        p_adj,
+        meandiff - crit_int,
+        meandiff + crit_int,
+        p_adj < alpha,
+    )
+
+
+def pairwise_comparisons(summary, method="tukey", alpha=0.05):
+    """Comparaisons de toutes les paires de groupes selon method (voir METHODS)."""
+    if method == "tukey":
+        return tukey_hsd(summary, alpha)
+    if method == "games_howell":
+        return games_howell(summary, alpha)
+    if method == "welch_holm":
+        return welch_holm(summary, alpha)
+
+    raise ValueError(
+        f"Méthode de comparaison inconnue : {method} (choix : {', '.join(METHODS)})"
+    )
+
+
+def compare_factors(summaries, method="tukey", alpha=0.05):
+    """Comparaisons par paires de plusieurs facteurs à la fois.
+
+    summaries associe à chaque facteur son résumé par groupe (mean, std,
+    count). Les tableaux sont empilés avec une colonne factor en tête.
+    """
+    tables = {
+        factor: pairwise_comparisons(summary, method, alpha)
+        for factor, summary in summaries.items()
+    }
+    return (
+        pd.concat(tables, names=["factor", None])
+        .reset_index(level=0)
+        .reset_index(drop=True)
+    )
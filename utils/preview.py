@@ -0,0 +1,130 @@
+import numpy as np
+from scipy.special import ndtri
+
+from utils.data_loader import load_sample
+from utils.facets import SUBGROUP_ERRORS
+from utils.profiling import stage, timed
+from utils.reservoir import DEFAULT_SEED
+
+# Chaque rééchantillon refait toute l'analyse (bootstrap et permutations
+# compris) : son coût ne dépend pas de la taille de l'échantillon. Avec R
+# rééchantillons, l'erreur type estimée a elle-même une erreur relative
+# d'environ 1 / sqrt(2 (R - 1)), soit 24 % pour R = 10 : les bornes d'un
+# aperçu sont indicatives (un ordre de grandeur), pas des intervalles précis.
+DEFAULT_REPLICATES = 10
+
+# Clé ajoutée au résultat d'une analyse sur échantillon (voir sample_analysis).
+SAMPLING_KEY = "_sampling"
+
+
+def _numeric_leaves(value, path=()):
+    """(chemin, valeur) de chaque nombre d'un résultat, dictionnaires compris."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _numeric_leaves(item, path + (key,))
+    elif isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(
+        value, (bool, np.bool_)
+    ):
+        yield path, float(value)
+
+
+def _nested(flat):
+    tree = {}
+    for path, value in flat.items():
+        node = tree
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return tree
+
+
+def sampling_bounds(estimate, replicates, fpc=1.0, confidence=0.95):
+    """Erreur d'échantillonnage de chaque valeur numérique de estimate.
+
+    replicates sont les résultats de la même analyse sur des rééchantillons
+    bootstrap : l'erreur type est leur écart-type, multiplié par la
+    correction de population finie fpc ; l'intervalle est celui de la loi
+    normale autour de l'estimation. Renvoie un dictionnaire de même
+    structure que estimate, dont les nombres sont remplacés par
+    {"standard_error", "ci_low", "ci_high"} (NaN avec moins de deux
+    rééchantillons valides).
+
+    Les bornes ne disent rien de l'écart à la population pour les valeurs qui
+    dépendent de la taille de l'échantillon (effectifs, statistiques de test,
+    intervalles de confiance des analyses) : seules les moyennes, écarts-types,
+    différences, proportions et corrélations sont des estimations.
+    """
+    z = ndtri(1 - (1 - confidence) / 2)
+    draws = [dict(_numeric_leaves(replicate)) for replicate in replicates]
+
+    flat = {}
+    for path, value in _numeric_leaves(estimate):
+        values = np.array([draw.get(path, np.nan) for draw in draws])
+        values = values[np.isfinite(values)]
+        error = fpc * values.std(ddof=1) if len(values) > 1 else np.nan
+        flat[path] = {
+            "standard_error": error,
+            "ci_low": value - z * error,
+            "ci_high": value + z * error,
+        }
+
+    return _nested(flat)
+
+
+@timed()
+def sample_analysis(
+    analysis_function,
+    columns,
+    new_state,
+    update_state,
+    size,
+    replicates=DEFAULT_REPLICATES,
+    seed=DEFAULT_SEED,
+    chunksize=None,
+    file_path=None,
+):
+    """Exécute une analyse sur un échantillon stratifié de size réponses.
+
+    L'échantillon (âge × canton, allocation proportionnelle, voir
+    data_loader.load_sample) est tiré en une passe et partagé par toutes les
+    analyses. Comme facet_analysis, analysis_function est appelée avec
+    state=<état de l'échantillon> et sans graphique ; elle l'est ensuite sur
+    replicates rééchantillons bootstrap stratifiés. Le résultat habituel est
+    complété de SAMPLING_KEY : taille de l'échantillon et de la population,
+    nombre de strates, nombre de rééchantillons analysés et écartés, et
+    bornes d'erreur de chaque valeur numérique (voir sampling_bounds).
+
+    Un rééchantillon sur lequel l'analyse échoue faute de réponses
+    (SUBGROUP_ERRORS, par exemple un groupe devenu vide) est écarté et
+    compté dans skipped_replicates ; les bornes reposent sur les autres.
+    """
+    sample = load_sample(size, columns, seed, chunksize, file_path)
+
+    state = new_state()
+    update_state(state, sample.frame)
+    result = analysis_function(plot=False, state=state)
+
+    rng = np.random.default_rng(seed)
+    resampled = []
+    skipped = 0
+    with stage("sampling_bootstrap"):
+        for _ in range(replicates):
+            state = new_state()
+            update_state(state, sample.resample(rng))
+            try:
+                resampled.append(analysis_function(plot=False, state=state))
+            except SUBGROUP_ERRORS:
+                skipped += 1
+
+    fpc = np.sqrt(1 - sample.fraction)
+    return {
+        **result,
+        SAMPLING_KEY: {
+            "rows": sample.rows,
+            "population": sample.population_rows,
+            "strata": int((sample.population > 0).sum()),
+            "replicates": len(resampled),
+            "skipped_replicates": skipped,
+            "bounds": sampling_bounds(result, resampled, fpc),
+        },
+    }
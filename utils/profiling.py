@@ -0,0 +1,160 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+PROFILE_KEY = "_profile"
+
+_enabled = False
+_track_memory = False
+_records = []
+_records_lock = threading.Lock()
+_local = threading.local()
+_disabled_stage = contextlib.nullcontext()
+
+
+def enable_profiling(enabled=True, memory=True):
+    """Active l'enregistrement de la durée (et du pic mémoire) de chaque étape.
+
+    Le pic mémoire est mesuré avec tracemalloc, qui ralentit nettement les
+    calculs : memory=False ne garde que les durées.
+    """
+    global _enabled, _track_memory
+
+    _enabled = enabled
+    _track_memory = enabled and memory
+
+    if _track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not _track_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def profiling_enabled():
+    return _enabled
+
+
+class _Stage:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+
+        if _track_memory:
+            # Le pic courant appartient à l'étape parente : on le lui
+            # transmet avant de remettre le compteur à zéro.
+            _, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+
+        self.peak = 0
+        self.depth = len(stack)
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        stack = _local.stack
+        stack.pop()
+
+        record = {
+            "name": self.name,
+            "start_us": self.start / 1000,
+            "duration_ms": (end - self.start) / 1e6,
+            "depth": self.depth,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+
+        if _track_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            self.peak = max(self.peak, peak)
+            record["peak_mb"] = self.peak / (1024 * 1024)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+
+        with _records_lock:
+            _records.append(record)
+        return False
+
+
+def stage(name):
+    """Contexte mesurant une étape ; ne coûte presque rien si désactivé."""
+    if not _enabled:
+        return _disabled_stage
+    return _Stage(name)
+
+
+def timed(name=None):
+    """Décorateur : mesure chaque appel de la fonction comme une étape."""
+
+    def decorator(function):
+        stage_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Stage(stage_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def take_stages():
+    """Renvoie les étapes enregistrées par ce thread depuis son dernier appel
+    et les oublie ; les étapes des autres threads restent en attente."""
+    tid = threading.get_ident()
+    with _records_lock:
+        records = [record for record in _records if record["tid"] == tid]
+        _records[:] = [record for record in _records if record["tid"] != tid]
+    return records
+
+
+def summarize(stages):
+    """Durée totale, nombre d'appels et pic mémoire maximal par nom d'étape."""
+    summary = {}
+    for record in stages:
+        entry = summary.setdefault(record["name"], {"calls": 0, "duration_ms": 0.0})
+        entry["calls"] += 1
+        entry["duration_ms"] += record["duration_ms"]
+        if "peak_mb" in record:
+            entry["peak_mb"] = max(entry.get("peak_mb", 0.0), record["peak_mb"])
+    return summary
+
+
+def write_trace(path, stages):
+    """Écrit les étapes au format JSON ou Chrome trace (extension .trace.json).
+
+    Un fichier Chrome trace s'ouvre dans chrome://tracing ou Perfetto.
+    """
+    if path.endswith(".trace.json"):
+        data = {
+            "traceEvents": [
+                {
+                    "name": record["name"],
+                    "ph": "X",
+                    "ts": record["start_us"],
+                    "dur": record["duration_ms"] * 1000,
+                    "pid": record["pid"],
+                    "tid": record["tid"],
+                    "args": {key: record[key] for key in ("peak_mb",) if key in record},
+                }
+                for record in stages
+            ]
+        }
+    else:
+        data = {"stages": stages, "summary": summarize(stages)}
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
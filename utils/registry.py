@@ -0,0 +1,71 @@
+import importlib
+
+_analyses = {}
+
+
+class Analysis:
+    """Une analyse déclarée : son point d'entrée et les colonnes qu'elle lit."""
+
+    def __init__(self, name, function, columns):
+        self.name = name
+        self.function = function
+        self.columns = list(columns)
+        self.script = function.__module__
+
+
+def register(name, columns):
+    """Décorateur qui déclare la fonction d'analyse d'un script.
+
+    name est le nom court de l'analyse (par ex. "1a"), utilisé par
+    run_analysis.py --only.
+    """
+
+    def decorator(function):
+        _analyses[name] = Analysis(name, function, columns)
+        return function
+
+    return decorator
+
+
+def find_analysis(key):
+    """Analyse déclarée sous le nom court key ou par le script key."""
+    if key in _analyses:
+        return _analyses[key]
+    for analysis in _analyses.values():
+        if analysis.script == key:
+            return analysis
+    return None
+
+
+def load_analyses(scripts):
+    """Importe les scripts et renvoie leurs analyses, dans l'ordre de scripts.
+
+    Un script qui ne déclare pas d'analyse donne None.
+    """
+    for script in scripts:
+        importlib.import_module(script)
+    return [find_analysis(script) for script in scripts]
+
+
+def select_analyses(analyses, only):
+    """Garde les analyses dont le nom court figure dans only (dans leur ordre).
+
+    Lève ValueError pour un nom inconnu.
+    """
+    names = [analysis.name for analysis in analyses if analysis is not None]
+    unknown = [name for name in only if name not in names]
+    if unknown:
+        raise ValueError(
+            f"Analyse inconnue : {', '.join(unknown)} (choix : {', '.join(names)})"
+        )
+    return [
+        analysis
+        for analysis in analyses
+        if analysis is not None and analysis.name in only
+    ]
+
+
+def required_columns(analyses, extra=()):
+    """Union des colonnes lues par analyses (et extra), sans doublon."""
+    columns = [column for analysis in analyses for column in analysis.columns]
+    return list(dict.fromkeys(columns + list(extra)))
@@ -0,0 +1,158 @@
+import importlib
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+PROFILES = {
+    "preview": {"dpi": 72, "formats": ["png"]},
+    "print": {"dpi": 300, "formats": ["png"]},
+    "vector": {"dpi": 300, "formats": ["svg", "pdf"]},
+}
+
+DEFAULT_PROFILE = "print"
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Échecs d'un rendu en arrière-plan, signalés sans interrompre les analyses :
+# écriture du fichier, données refusées par matplotlib ou pool de rendu
+# interrompu (BrokenProcessPool est une RuntimeError).
+_RENDER_ERRORS = (OSError, ValueError, TypeError, RuntimeError)
+
+_profile_name = DEFAULT_PROFILE
+_queue = None
+
+
+def set_render_profile(name):
+    """Choisit la résolution et les formats utilisés par save_figure."""
+    global _profile_name
+
+    if name not in PROFILES:
+        raise ValueError(
+            f"Profil de rendu inconnu : {name} (choix : {', '.join(PROFILES)})"
+        )
+    _profile_name = name
+
+
+def render_profile_name():
+    return _profile_name
+
+
+def render_profile():
+    return PROFILES[_profile_name]
+
+
+def _init_worker(profile_name, sys_path):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    sys.path[:] = sys_path
+    set_render_profile(profile_name)
+
+
+def _render_job(module_name, function_name, payload):
+    from utils.data_loader import saved_figures
+
+    function = getattr(importlib.import_module(module_name), function_name)
+    args, kwargs = pickle.loads(payload)
+
+    figures_before = len(saved_figures())
+    function(*args, **kwargs)
+    return saved_figures()[figures_before:]
+
+
+class RenderQueue:
+    """File de rendu des graphiques exécutée par un pool de processus.
+
+    Une tâche est une fonction plot_* d'un script, désignée par son module et
+    son nom, et ses arguments. Les arguments sont sérialisés dès la
+    soumission : l'analyse peut continuer à modifier ses données pendant que
+    le graphique est dessiné, avec le backend non interactif Agg.
+    """
+
+    def __init__(self, workers, profile=None):
+        self.profile = profile or _profile_name
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.profile, [_ROOT] + sys.path),
+        )
+        self.pending = []
+
+    def submit(self, function, *args, **kwargs):
+        payload = pickle.dumps((args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        future = self.executor.submit(
+            _render_job, function.__module__, function.__name__, payload
+        )
+        self.pending.append((function.__name__, future))
+        return future
+
+    def wait(self):
+        """Attend les rendus en cours.
+
+        Renvoie (figures écrites, erreurs), les erreurs étant des couples
+        (nom de la fonction, message) ; les autres exceptions d'un rendu
+        remontent.
+        """
+        from utils.data_loader import record_saved_figures
+
+        figures, errors = [], []
+        pending, self.pending = self.pending, []
+
+        for name, future in pending:
+            try:
+                figures.extend(future.result())
+            except _RENDER_ERRORS as e:
+                errors.append((name, str(e)))
+
+        record_saved_figures(figures)
+        return figures, errors
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def start_render_queue(workers, profile=None):
+    """Envoie les rendus suivants de render_figure à un pool de workers processus."""
+    global _queue
+
+    if profile is not None:
+        set_render_profile(profile)
+
+    stop_render_queue()
+    _queue = RenderQueue(workers)
+    return _queue
+
+
+def stop_render_queue():
+    """Attend les rendus en cours, ferme le pool et renvoie (figures, erreurs)."""
+    global _queue
+
+    if _queue is None:
+        return [], []
+
+    queue, _queue = _queue, None
+    try:
+        return queue.wait()
+    finally:
+        queue.close()
+
+
+def wait_for_renders():
+    """Attend les rendus en cours sans fermer le pool ; renvoie (figures, erreurs)."""
+    if _queue is None:
+        return [], []
+    return _queue.wait()
+
+
+def render_figure(function, *args, **kwargs):
+    """Dessine un graphique avec function(*args, **kwargs).
+
+    Sans file de rendu active, le graphique est dessiné immédiatement ;
+    sinon il est mis en file et l'appel rend la main aussitôt. Les fonctions
+    d'un script lancé directement (module __main__) sont toujours dessinées
+    immédiatement, un worker ne pouvant pas les retrouver.
+    """
+    if _queue is None or function.__module__ == "__main__":
+        return function(*args, **kwargs)
+    return _queue.submit(function, *args, **kwargs)
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+from utils.schema import column
+
+DEFAULT_SEED = 0
+
+# Strates de l'échantillon : tranche d'âge × canton de résidence.
+STRATA = ("age", "canton")
+
+# Nombre maximal de niveaux d'une colonne de strate (les identifiants de
+# strate combinent les niveaux de chaque colonne dans un seul int64).
+_MAX_LEVELS = 1 << 20
+
+
+class StratifiedSample:
+    """Échantillon stratifié : lignes triées par strate et effectifs.
+
+    frame contient les lignes retenues, groupées par strate ; sizes[i] lignes
+    sont tirées parmi les population[i] réponses de la strate i.
+    """
+
+    def __init__(self, frame, sizes, population):
+        self.frame = frame
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+        self.population = np.asarray(population, dtype=np.int64)
+
+    @property
+    def rows(self):
+        return int(self.sizes.sum())
+
+    @property
+    def population_rows(self):
+        return int(self.population.sum())
+
+    @property
+    def fraction(self):
+        """Taux de sondage n / N (1 si l'échantillon contient tout)."""
+        if self.population_rows == 0:
+            return 1.0
+        return self.rows / self.population_rows
+
+    def resample(self, rng):
+        """Rééchantillon bootstrap : sizes[i] tirages avec remise dans chaque
+        strate, de sorte que la composition par strate reste celle du plan."""
+        starts = np.cumsum(self.sizes) - self.sizes
+        offsets = np.floor(
+            rng.random(self.rows) * np.repeat(self.sizes, self.sizes)
+        ).astype(np.int64)
+        return self.frame.iloc[np.repeat(starts, self.sizes) + offsets]
+
+
+def proportional_allocation(population, size):
+    """Répartit size lignes entre les strates proportionnellement à leur
+    population (méthode du plus fort reste ; une strate ne reçoit jamais
+    plus de lignes qu'elle n'a de réponses)."""
+    population = np.asarray(population, dtype=np.int64)
+    total = population.sum()
+    size = min(size, total)
+    if total == 0:
+        return np.zeros_like(population)
+
+    quotas = size * population / total
+    sizes = np.floor(quotas).astype(np.int64)
+    remainders = quotas - sizes
+    extra = np.argsort(-remainders, kind="stable")[: size - sizes.sum()]
+    sizes[extra] += 1
+    return sizes
+
+
+class StratifiedReservoir:
+    """Échantillon stratifié de size lignes construit en une seule passe.
+
+    Chaque réponse reçoit une clé aléatoire uniforme ; pour chaque strate,
+    les size réponses de plus petites clés sont gardées (échantillonnage par
+    réservoir : un tirage sans remise uniforme dans la strate, quel que soit
+    l'ordre de lecture). La population de chaque strate n'est connue qu'à la
+    fin de la lecture : sample() répartit alors size lignes entre les strates
+    proportionnellement à leur population et garde, dans chacune, les lignes
+    de plus petites clés. Les réponses sans âge ou sans canton forment leur
+    propre strate.
+    """
+
+    def __init__(self, size, strata=STRATA, seed=DEFAULT_SEED):
+        if size < 1:
+            raise ValueError("La taille de l'échantillon doit être d'au moins 1")
+
+        self.size = size
+        self.strata = [column(key) for key in strata]
+        self.rng = np.random.default_rng(seed)
+        self.population = {}
+        self._levels = [{} for _ in self.strata]
+        self._frame = None
+        self._keys = np.empty(0)
+        self._ids = np.empty(0, dtype=np.int64)
+
+    def _stratum_ids(self, chunk):
+        ids = np.zeros(len(chunk), dtype=np.int64)
+        for levels, header in zip(self._levels, self.strata):
+            codes, uniques = pd.factorize(chunk[header], use_na_sentinel=False)
+            level_ids = np.array(
+                [
+                    levels.setdefault(None if pd.isna(value) else value, len(levels))
+                    for value in uniques
+                ],
+                dtype=np.int64,
+            )
+            ids = ids * _MAX_LEVELS + level_ids[codes]
+        return ids
+
+    def update(self, chunk):
+        """Ajoute un bloc de réponses (colonnes de strate comprises)."""
+        ids = self._stratum_ids(chunk)
+        for stratum, count in zip(*np.unique(ids, return_counts=True)):
+            self.population[stratum] = self.population.get(stratum, 0) + int(count)
+
+        keys = self.rng.random(len(chunk))
+        candidates = keys < self._thresholds(ids)
+        frame = chunk[candidates].reset_index(drop=True)
+        keys = np.concatenate([self._keys, keys[candidates]])
+        ids = np.concatenate([self._ids, ids[candidates]])
+        if self._frame is not None:
+            frame = pd.concat([self._frame, frame], ignore_index=True)
+
+        order = np.lexsort((keys, ids))
+        keep = order[_ranks(ids[order]) < self.size]
+
+        self._frame = frame.iloc[keep].reset_index(drop=True)
+        self._keys = keys[keep]
+        self._ids = ids[keep]
+
+    def _thresholds(self, ids):
+        """Plus grande clé gardée de la strate de chaque ligne si la strate
+        est pleine (1 sinon) : une clé plus grande ne peut pas y entrer."""
+        thresholds = np.ones(len(ids))
+
+        # Le réservoir est trié par strate puis par clé : la dernière ligne
+        # d'une strate pleine porte sa plus grande clé.
+        last = np.r_[self._ids[1:] != self._ids[:-1], True][: len(self._ids)]
+        full = last & (_ranks(self._ids) == self.size - 1)
+        full_ids, full_keys = self._ids[full], self._keys[full]
+
+        if len(full_ids) == 0:
+            return thresholds
+
+        positions = np.minimum(np.searchsorted(full_ids, ids), len(full_ids) - 1)
+        known = full_ids[positions] == ids
+        thresholds[known] = full_keys[positions[known]]
+        return thresholds
+
+    def sample(self):
+        """StratifiedSample à allocation proportionnelle de size lignes."""
+        strata = np.array(sorted(self.population), dtype=np.int64)
+        population = np.array([self.population[s] for s in strata], dtype=np.int64)
+        sizes = proportional_allocation(population, self.size)
+
+        if self._frame is None:
+            return StratifiedSample(pd.DataFrame(), sizes, population)
+
+        # Le réservoir est trié par strate puis par clé (voir update).
+        positions = np.searchsorted(strata, self._ids)
+        keep = _ranks(self._ids) < sizes[positions]
+        frame = self._frame[keep].reset_index(drop=True)
+        return StratifiedSample(frame, sizes, population)
+
+
+def _ranks(sorted_ids):
+    """Rang de chaque élément au sein de sa strate (identifiants triés)."""
+    if len(sorted_ids) == 0:
+        return np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    lengths = np.diff(np.r_[starts, len(sorted_ids)])
+    return np.arange(len(sorted_ids)) - np.repeat(starts, lengths)
@@ -0,0 +1,187 @@
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+
+from utils.data_loader import data_source, saved_figures
+from utils.rendering import render_profile_name, wait_for_renders
+from utils.waves import source_digest
+
+CACHE_DIR = ".analysis_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _hash_files(paths):
+    sha = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, "rb") as f:
+            sha.update(os.path.basename(path).encode())
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ResultCache:
+    """Cache des résultats et figures des fonctions analyze_*.
+
+    Une entrée est identifiée par l'empreinte des données, du code source du
+    script d'analyse (et des modules utils dont il dépend) et des paramètres
+    d'appel. Chaque entrée est un dossier de CACHE_DIR contenant le résultat
+    picklé, une copie des figures produites et ses métadonnées ; manifest.json
+    récapitule toutes les entrées. Au-delà de max_bytes, les entrées les moins
+    récemment utilisées sont supprimées.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, analysis_function, params, file_path=None):
+        file_path = file_path or data_source()
+        module_file = inspect.getsourcefile(analysis_function)
+        parts = {
+            "data": source_digest(file_path),
+            "code": _hash_files([module_file]),
+            "utils": _hash_files(glob.glob(os.path.join(_UTILS_DIR, "*.py"))),
+            "function": analysis_function.__name__,
+            "params": {name: repr(value) for name, value in sorted(params.items())},
+            "render_profile": render_profile_name(),
+        }
+        encoded = json.dumps(parts, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """Renvoie le résultat en cache, ou None.
+
+        Les figures déjà présentes dans graphs/ ne sont pas réécrites ; seules
+        les figures manquantes sont restaurées depuis le cache. Une entrée
+        complète (meta.json écrit) mais illisible, ou dont une figure ne peut
+        être restaurée, est supprimée.
+        """
+        entry_dir = self._entry_dir(key)
+        meta_path = os.path.join(entry_dir, "meta.json")
+
+        meta = None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(os.path.join(entry_dir, "result.pkl"), "rb") as f:
+                result = pickle.load(f)
+
+            for figure in meta["figures"]:
+                if not os.path.exists(figure):
+                    os.makedirs(os.path.dirname(figure) or ".", exist_ok=True)
+                    shutil.copy2(
+                        os.path.join(entry_dir, os.path.basename(figure)), figure
+                    )
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            # Sans meta.json, l'entrée est absente ou en cours d'écriture par
+            # un autre processus (put l'écrit en dernier) : elle est laissée.
+            if meta is not None:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                self.evict()
+            self.misses += 1
+            return None
+
+        meta["last_used"] = time.time()
+        _write_json(meta_path, meta)
+
+        self.hits += 1
+        return result
+
+    def put(self, key, name, result, figures):
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        with open(os.path.join(entry_dir, "result.pkl"), "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        for figure in figures:
+            shutil.copy2(figure, os.path.join(entry_dir, os.path.basename(figure)))
+
+        size = sum(
+            os.path.getsize(os.path.join(entry_dir, filename))
+            for filename in os.listdir(entry_dir)
+        )
+        now = time.time()
+        _write_json(
+            os.path.join(entry_dir, "meta.json"),
+            {
+                "key": key,
+                "analysis": name,
+                "figures": list(figures),
+                "size": size,
+                "created": now,
+                "last_used": now,
+            },
+        )
+
+        self.evict()
+
+    def entries(self):
+        entries = []
+        for meta_path in glob.glob(os.path.join(self.directory, "*", "*", "meta.json")):
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def evict(self):
+        """Supprime les entrées les plus anciennes au-delà de max_bytes et
+        réécrit le manifeste."""
+        entries = sorted(self.entries(), key=lambda meta: meta["last_used"])
+        total = sum(meta["size"] for meta in entries)
+
+        while entries and total > self.max_bytes:
+            meta = entries.pop(0)
+            shutil.rmtree(self._entry_dir(meta["key"]), ignore_errors=True)
+            total -= meta["size"]
+
+        _write_json(
+            os.path.join(self.directory, "manifest.json"),
+            {"total_size": total, "entries": entries},
+        )
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def call(self, analysis_function, name, **params):
+        """Appelle analysis_function(**params) en passant par le cache.
+
+        Renvoie (résultat, True si le résultat vient du cache).
+        """
+        key = self.key(analysis_function, params)
+
+        result = self.get(key)
+        if result is not None:
+            return result, True
+
+        figures_before = len(saved_figures())
+        result = analysis_function(**params)
+        # Les graphiques mis en file de rendu doivent être écrits avant d'être
+        # copiés dans le cache.
+        wait_for_renders()
+        figures = saved_figures()[figures_before:]
+
+        self.put(key, name, result, figures)
+        return result, False
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+QUESTIONS = {
+    "timestamp": "Timestamp",
+    "age": "Quel est votre âge ?",
+    "gender": "Quel est votre genre?",
+    "canton": "Quel est votre canton de résidence ?",
+    "situation": "Quelle est votre situation actuelle?",
+    "devices": "Quels appareils électroniques possédez-vous ?",
+    "screen_time": "Combien d'heures par jour passez-vous en moyenne devant vos écrans ?",
+    "work_screens": "Utilisez-vous des écrans pour vos études ou votre travail ?",
+    "work_time": "Combien d'heures par jour utilisez-vous des écrans pour vos études/travail ?",
+    "work_tools": "Quels outils numériques utilisez-vous principalement pour vos études/travail ?",
+    "social_networks": "Quels réseaux sociaux utilisez-vous le plus régulièrement ?",
+    "social_media_time": "Combien de temps passez-vous quotidiennement sur les réseaux sociaux ?",
+    "gaming": "Jouez-vous aux jeux vidéo ?",
+    "gaming_devices": "Sur quels appareils jouez-vous principalement ? ",
+    "gaming_time": "Combien d'heures en moyenne par jour passez-vous devant les jeux vidéos ?",
+    "streaming_platforms": "Quelles plateformes de streaming utilisez-vous ?",
+    "streaming_time": "Combien d'heures par jour regardez-vous du contenu en streaming ?",
+    "perceived_impact": "Pensez-vous que votre temps d'écran a un impact sur votre :",
+    "reduction_attempt": "Avez-vous déjà essayé de réduire votre temps d'écran ?",
+    "control_apps": "Utilisez-vous des applications ou des fonctionnalités de contrôle du temps d'écran ?",
+    "check_frequency": "À quelle fréquence vérifiez-vous vos appareils en dehors des heures de travail/études ?",
+    "phone_on_waking": "Allez-vous directement sur votre smartphone dès le réveil ?",
+    "balance": "Comment évaluez-vous votre équilibre entre vie numérique et vie réelle ?",
+    "regulation_strategies": "Quelles stratégies utilisez-vous actuellement pour réguler votre temps d'écran ?",
+    "goals_impact": "Pensez-vous que votre temps d'écran a déjà eu un impact sur l'atteinte de vos objectifs de vie ?",
+    "too_high": "Pensez-vous que votre temps d'écran est trop élevé ?",
+}
+
+MULTI_SELECT_KEYS = (
+    "devices",
+    "work_tools",
+    "social_networks",
+    "gaming_devices",
+    "streaming_platforms",
+    "perceived_impact",
+    "regulation_strategies",
+)
+
+# Colonnes laissées en texte : une valeur différente par ligne.
+TEXT_KEYS = ("timestamp",)
+
+ORDINAL_SCALES = {
+    "age": {
+        "10-14 ans": 12,
+        "15-19 ans": 17,
+        "20-29 ans": 25,
+        "30-39 ans": 35,
+        "40-49 ans": 45,
+        "50-59 ans": 55,
+        "60-70 ans": 65,
+        "Plus de 70 ans": 75,
+    },
+    "screen_time": {
+        "Moins de 1 heure": 0.5,
+        "1-2 heures": 1.5,
+        "2-3 heures": 2.5,
+        "3-4 heures": 3.5,
+        "4-5 heures": 4.5,
+        "5-6 heures": 5.5,
+        "Plus de 6 heures": 6.5,
+    },
+    "social_media_time": {
+        "Moins de 30 minutes": 0.25,
+        "30 minutes à 1 heure": 0.75,
+        "1 à 2 heures": 1.5,
+        "2 à 3 heures": 2.5,
+        "3 à 4 heures": 3.5,
+        "Plus de 4 heures": 4.5,
+    },
+    "work_time": {
+        "Moins de 1 heure": 0.5,
+        "1-2 heures": 1.5,
+        "2-3 heures": 2.5,
+        "3-4 heures": 3.5,
+        "4-5 heures": 4.5,
+        "5-6 heures": 5.5,
+        "6-7 heures": 6.5,
+        "7-8 heures": 7.5,
+        "Plus de 8 heures": 8.5,
+    },
+    "gaming_time": {
+        "Moins d'une heure": 0.5,
+        "1-2 heures": 1.5,
+        "2-3 heures": 2.5,
+        "3-4 heures": 3.5,
+        "4-5 heures": 4.5,
+        "5-6 heures": 5.5,
+        "Plus de 6 heures": 6.5,
+    },
+    "streaming_time": {
+        "Moins de 1 heure": 0.5,
+        "1 à 2 heures": 1.5,
+        "2 à 3 heures": 2.5,
+        "3 à 4 heures": 3.5,
+        "Plus de 4 heures": 4.5,
+    },
+    "check_frequency": {
+        "Jamais": 1,
+        "Rarement": 2,
+        "Occasionnellement (quelques fois par heure)": 3,
+        "Fréquemment (toutes les 30 minutes)": 4,
+        "Très fréquemment (toutes les 15 minutes)": 5,
+    },
+    "balance": {
+        "Très mauvais": 1,
+        "Mauvais": 2,
+        "Moyen": 3,
+        "Bon": 4,
+        "Très bon": 5,
+    },
+}
+
+# Ordre des réponses des questions qui en ont un naturel (du plus faible au
+# plus fort). Les autres questions sont nominales : leurs réponses sont
+# rangées par ordre alphabétique.
+ANSWER_ORDER = {
+    **{key: list(scale) for key, scale in ORDINAL_SCALES.items()},
+    "reduction_attempt": ["Non, jamais", "Oui, sans succès", "Oui, avec succès"],
+    "too_high": ["Non", "Je peux mieux faire", "Oui"],
+}
+
+# Questions à choix unique sans échelle numérique : leurs associations se
+# mesurent sur les tableaux de contingence (V de Cramér).
+NOMINAL_KEYS = tuple(
+    key
+    for key in QUESTIONS
+    if key not in ORDINAL_SCALES and key not in MULTI_SELECT_KEYS + TEXT_KEYS
+)
+
+_question_keys = {header: key for key, header in QUESTIONS.items()}
+
+
+def column(key):
+    """Intitulé de la question d'une clé de QUESTIONS (ou l'intitulé tel quel)."""
+    return QUESTIONS.get(key, key)
+
+
+def columns(*keys):
+    return [column(key) for key in keys]
+
+
+def question_key(header):
+    """Clé courte d'un intitulé de question, ou None s'il est inconnu."""
+    return _question_keys.get(header)
+
+
+def answer_dtype(key, answers=()):
+    """Type catégoriel des réponses de la question key.
+
+    Les réponses de ANSWER_ORDER viennent en premier et dans cet ordre ; les
+    réponses observées hors échelle (answers) sont ajoutées à la suite par
+    ordre alphabétique pour qu'aucune ne soit perdue.
+    """
+    declared = ANSWER_ORDER.get(key, [])
+    extra = sorted(set(answers) - set(declared))
+    return pd.CategoricalDtype(declared + extra, ordered=key in ANSWER_ORDER)
+
+
+def compact_answers(values, key):
+    """Convertit une colonne de réponses en catégories en une seule passe.
+
+    Les réponses ne sont factorisées qu'une fois ; les codes sont ensuite
+    renumérotés vers les catégories de answer_dtype. Moins de 128 réponses
+    distinctes tiennent sur des codes int8. Une colonne déjà dans son type
+    (relue du cache binaire) est renvoyée telle quelle.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+
+    dtype = answer_dtype(key, uniques)
+    if (
+        isinstance(values.dtype, pd.CategoricalDtype)
+        and values.cat.ordered == dtype.ordered
+        and uniques.equals(dtype.categories)
+    ):
+        return values
+
+    recode = np.append(dtype.categories.get_indexer(uniques), -1)
+
+    return pd.Series(
+        pd.Categorical.from_codes(recode[codes], dtype=dtype),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def compact_frame(df):
+    """DataFrame dont les colonnes de réponses connues sont catégorielles.
+
+    Les colonnes numériques, de texte libre (TEXT_KEYS) ou absentes de
+    QUESTIONS sont gardées telles quelles, sans copie.
+    """
+    compacted = {}
+    for header in df.columns:
+        key = question_key(header)
+        if key is None or key in TEXT_KEYS or pd.api.types.is_numeric_dtype(df[header]):
+            continue
+        compacted[header] = compact_answers(df[header], key)
+
+    if not compacted:
+        return df
+    return df.assign(**compacted)
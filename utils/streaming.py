@@ -0,0 +1,26 @@
+class RunningCounts:
+    """Effectifs cumulés des valeurs (ou combinaisons de valeurs) observées."""
+
+    def __init__(self):
+        self.counts = None
+
+    def update(self, values):
+        self.add_counts(values.value_counts(dropna=True))
+
+    def merge(self, other):
+        if other.counts is not None:
+            self.add_counts(other.counts)
+
+    def add_counts(self, counts):
+        if self.counts is None:
+            self.counts = counts.astype("int64")
+        else:
+            self.counts = self.counts.add(counts, fill_value=0).astype("int64")
+
+    def total(self):
+        return 0 if self.counts is None else self.counts.sum()
+
+    def get(self, key, default=0):
+        if self.counts is None:
+            return default
+        return self.counts.get(key, default)
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# Valeur des horodatages absents ou illisibles : celle de NaT, de sorte que
+# epochs.view("datetime64[s]") les affiche comme NaT.
+MISSING = np.iinfo(np.int64).min
+
+DAY = 86_400
+
+# "2025/03/30 02:22:38 PM GMT+2" : tout est à largeur fixe jusqu'au décalage,
+# qui peut valoir "GMT", "GMT+2", "GMT-10" ou "GMT+5:30".
+_TEMPLATE = "0000/00/00 00:00:00 _M GMT"
+_WIDTH = 40
+_FIELDS = [(0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19)]
+_LITERALS = [i for i, char in enumerate(_TEMPLATE) if char not in "0_"]
+_MONTH_DAYS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _number(chars, start, stop):
+    """Entier écrit aux positions [start, stop) et validité de ses chiffres."""
+    value = np.zeros(len(chars), dtype=np.int64)
+    valid = np.ones(len(chars), dtype=bool)
+    for i in range(start, stop):
+        digit = chars[:, i].astype(np.int64) - ord("0")
+        valid &= (digit >= 0) & (digit <= 9)
+        value = value * 10 + digit
+    return value, valid
+
+
+def _days_from_civil(year, month, day):
+    """Jours depuis le 1970-01-01 du calendrier grégorien (algorithme de Hinnant)."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146_097 + day_of_era - 719_468
+
+
+def _offset_minutes(chars, valid):
+    """Décalage GMT en minutes ; les décalages mal formés invalident la ligne."""
+    # Les positions suivant "GMT" sont ramenées à gauche : "+2", "+10:00"...
+    suffix = chars[:, len(_TEMPLATE) : len(_TEMPLATE) + 7].astype(np.int64)
+    rows = np.arange(len(chars))
+    digits = suffix - ord("0")
+    is_digit = (digits >= 0) & (digits <= 9)
+
+    sign = suffix[:, 0]
+    signed = (sign == ord("+")) | (sign == ord("-"))
+    valid &= signed | (sign == 0)
+
+    two_digits = signed & is_digit[:, 2]
+    hours = np.where(two_digits, digits[:, 1] * 10 + digits[:, 2], digits[:, 1])
+    after = 2 + two_digits
+
+    has_minutes = signed & (suffix[rows, after] == ord(":"))
+    minutes = np.where(
+        has_minutes, digits[rows, after + 1] * 10 + digits[rows, after + 2], 0
+    )
+    end = np.where(has_minutes, after + 3, after)
+
+    valid &= ~signed | is_digit[:, 1]
+    valid &= ~has_minutes | (is_digit[rows, after + 1] & is_digit[rows, after + 2])
+    valid &= ~signed | (suffix[rows, end] == 0)
+    valid &= (hours <= 14) & (minutes < 60)
+
+    offset = hours * 60 + minutes
+    return np.where(sign == ord("-"), -offset, np.where(signed, offset, 0))
+
+
+def _parse(values, local):
+    text = np.asarray(values.fillna(""), dtype=f"U{_WIDTH}")
+    chars = text.view(np.uint32).reshape(len(text), _WIDTH)
+
+    valid = np.ones(len(chars), dtype=bool)
+    for i in _LITERALS:
+        valid &= chars[:, i] == ord(_TEMPLATE[i])
+    meridiem = chars[:, _TEMPLATE.index("_")]
+    valid &= (meridiem == ord("A")) | (meridiem == ord("P"))
+
+    fields = []
+    for start, stop in _FIELDS:
+        value, digits_valid = _number(chars, start, stop)
+        fields.append(value)
+        valid &= digits_valid
+    year, month, day, hour, minute, second = fields
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _MONTH_DAYS[np.clip(month, 0, 12)] + (leap & (month == 2))
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+    valid &= (hour >= 1) & (hour <= 12) & (minute < 60) & (second < 60)
+
+    offset = _offset_minutes(chars, valid)
+
+    hour = hour % 12 + 12 * (meridiem == ord("P"))
+    epochs = (
+        _days_from_civil(year, month, day) * DAY + hour * 3600 + minute * 60 + second
+    )
+    if not local:
+        epochs = epochs - offset * 60
+
+    return np.where(valid, epochs, MISSING)
+
+
+def parse_form_timestamps(values, local=False):
+    """Convertit les horodatages Google Forms en secondes depuis 1970 (int64).
+
+    Le format "2025/03/30 02:22:38 PM GMT+2" est lu position par position sur
+    un tableau de caractères, sans inférence de format ni dépendance à la
+    locale. Par défaut les secondes sont en temps universel (le décalage GMT
+    est retiré) ; avec local=True elles donnent l'heure affichée par le
+    formulaire, utile pour découper par jour ou par semaine. Les valeurs
+    absentes ou mal formées valent MISSING.
+
+    Une colonne catégorielle n'est lue qu'une fois par valeur distincte.
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        parsed = np.append(_parse(values.cat.categories.to_series(), local), MISSING)
+        return parsed[values.cat.codes.to_numpy()]
+    return _parse(values, local)
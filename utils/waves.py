@@ -0,0 +1,230 @@
+import glob
+import hashlib
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.binary_cache import read_sidecar, source_hash, write_sidecar
+from utils.schema import QUESTIONS, answer_dtype, compact_frame, question_key
+
+# Un manifeste liste un fichier de réponses par ligne (chemins relatifs au
+# manifeste, lignes vides et commentaires "#" ignorés).
+MANIFEST_SUFFIX = ".txt"
+
+CANONICAL_COLUMNS = list(QUESTIONS.values())
+
+
+def _normalized(header):
+    """Intitulé réduit à ses mots : casse, accents composés, espaces et
+    espaces avant la ponctuation ne comptent pas."""
+    header = unicodedata.normalize("NFC", str(header)).casefold()
+    header = re.sub(r"\s+", " ", header).strip()
+    return re.sub(r" ([?:!;])", r"\1", header)
+
+
+_canonical_headers = {_normalized(header): header for header in CANONICAL_COLUMNS}
+
+
+def is_multi_source(source):
+    """Vrai si source désigne plusieurs exports (motif glob ou manifeste)."""
+    return glob.has_magic(source) or source.endswith(MANIFEST_SUFFIX)
+
+
+def source_files(source):
+    """Fichiers de réponses d'une source : un fichier, un motif glob (triés
+    par nom) ou un manifeste (dans son ordre). Lève FileNotFoundError si la
+    source ne désigne aucun fichier."""
+    if glob.has_magic(source):
+        files = sorted(glob.glob(source))
+    elif source.endswith(MANIFEST_SUFFIX):
+        directory = os.path.dirname(os.path.abspath(source))
+        with open(source, encoding="utf-8") as f:
+            lines = [line.split("#", 1)[0].strip() for line in f]
+        files = [os.path.join(directory, line) for line in lines if line]
+    else:
+        files = [source]
+
+    if not files:
+        raise FileNotFoundError(f"Aucun fichier de réponses pour {source}")
+    return files
+
+
+def source_key(source):
+    """(source, fichiers et dates de modification, tailles) : change dès
+    qu'un export est ajouté, retiré ou modifié."""
+    files = source_files(source)
+    stats = [os.stat(path) for path in files]
+    if source.endswith(MANIFEST_SUFFIX):
+        files, stats = files + [source], stats + [os.stat(source)]
+    return (
+        os.path.abspath(source),
+        tuple(
+            (os.path.abspath(path), stat.st_mtime_ns)
+            for path, stat in zip(files, stats)
+        ),
+        tuple(stat.st_size for stat in stats),
+    )
+
+
+def source_digest(source):
+    """Empreinte SHA-256 du contenu de tous les exports de source."""
+    if not is_multi_source(source):
+        return source_hash(source)
+    sha = hashlib.sha256()
+    for path in source_files(source):
+        sha.update(source_hash(path).encode())
+    return sha.hexdigest()
+
+
+def align_columns(df):
+    """Renomme les colonnes vers les intitulés de QUESTIONS.
+
+    Les exports successifs du formulaire diffèrent parfois d'un espace ou
+    d'une majuscule (l'intitulé des appareils de jeu se termine par une
+    espace dans certains exports seulement). Les colonnes inconnues gardent
+    leur nom.
+    """
+    return df.rename(
+        columns=lambda header: _canonical_headers.get(_normalized(header), header)
+    )
+
+
+def _row_hashes(df):
+    """Empreinte de l'horodatage et de toutes les réponses de chaque ligne.
+
+    Les colonnes sont prises dans l'ordre de QUESTIONS (absentes : vides),
+    de sorte que deux exports d'une même réponse donnent la même empreinte.
+    L'empreinte d'une colonne catégorielle ne dépend que de ses valeurs ;
+    les autres colonnes sont comparées en objets, de sorte qu'une colonne
+    vide lue en float64 a la même empreinte qu'une colonne textuelle.
+    """
+    known = [header for header in CANONICAL_COLUMNS if header in df.columns]
+    frame = df[known].reindex(columns=CANONICAL_COLUMNS)
+    frame = frame.astype(
+        {
+            header: object
+            for header, dtype in frame.dtypes.items()
+            if not isinstance(dtype, pd.CategoricalDtype)
+        }
+    )
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _read_wave(path, binary_cache):
+    """Lit un export : colonnes alignées, réponses compactées et empreintes."""
+    df = read_sidecar(path) if binary_cache else None
+    if df is None:
+        df = pd.read_csv(path, sep=",")
+        if binary_cache:
+            write_sidecar(path, df)
+
+    df = compact_frame(align_columns(df))
+    return df, _row_hashes(df)
+
+
+def _common_dtypes(frames, columns):
+    """Type de chaque colonne commun à tous les exports.
+
+    Une colonne de réponses reçoit les catégories de answer_dtype complétées
+    par toutes les réponses observées dans l'un ou l'autre export.
+    """
+    dtypes = {}
+    for header in columns:
+        parts = [df[header] for df in frames if header in df.columns]
+        key = question_key(header)
+        if key is not None and all(
+            isinstance(part.dtype, pd.CategoricalDtype) for part in parts
+        ):
+            answers = set().union(*(part.cat.categories for part in parts))
+            dtypes[header] = answer_dtype(key, answers)
+        else:
+            dtypes[header] = None
+    return dtypes
+
+
+def _conformed(df, dtypes):
+    columns = {}
+    for header, dtype in dtypes.items():
+        if header not in df.columns:
+            values = pd.Series(np.nan, index=df.index, dtype=dtype or object)
+        elif dtype is not None:
+            values = df[header].cat.set_categories(
+                dtype.categories, ordered=dtype.ordered
+            )
+        else:
+            values = df[header]
+        columns[header] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def combine_waves(waves, columns=None):
+    """Assemble des exports lus par _read_wave et retire les doublons.
+
+    Une réponse présente dans plusieurs exports (même horodatage et mêmes
+    réponses) n'est gardée qu'une fois, à sa première apparition. columns
+    limite le résultat à ces colonnes.
+    """
+    frames = [df for df, _ in waves]
+    hashes = np.concatenate([row_hashes for _, row_hashes in waves])
+
+    if columns is None:
+        present = set().union(*(df.columns for df in frames))
+        columns = [header for header in CANONICAL_COLUMNS if header in present]
+        columns += sorted(present.difference(columns))
+    dtypes = _common_dtypes(frames, columns)
+
+    combined = pd.concat([_conformed(df, dtypes) for df in frames], ignore_index=True)
+    keep = ~pd.Series(hashes).duplicated().to_numpy()
+    return combined[keep].reset_index(drop=True)
+
+
+def read_waves(source, columns=None, binary_cache=False, workers=None):
+    """Lit tous les exports de source en parallèle et les assemble.
+
+    Chaque export est lu, aligné sur QUESTIONS et compacté par un processus
+    distinct (workers, par défaut un par cœur) : seuls des codes catégoriels
+    reviennent au processus principal. Sur une seule machine à un cœur, ou
+    pour un seul export, la lecture reste dans le processus courant.
+    """
+    files = source_files(source)
+    workers = min(workers or os.cpu_count() or 1, len(files))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            waves = list(executor.map(_read_wave, files, [binary_cache] * len(files)))
+    else:
+        waves = [_read_wave(path, binary_cache) for path in files]
+
+    return combine_waves(waves, columns)
+
+
+def _first_seen(hashes, seen):
+    """Vrai pour les empreintes absentes de seen, qui les reçoit au passage
+    (seule la première de plusieurs empreintes égales d'un bloc est vraie)."""
+    keep = np.empty(len(hashes), dtype=bool)
+    for i, row_hash in enumerate(hashes.tolist()):
+        keep[i] = row_hash not in seen
+        seen.add(row_hash)
+    return keep
+
+
+def iter_wave_chunks(source, columns=None, chunksize=100_000):
+    """Lit les exports de source l'un après l'autre, par blocs alignés.
+
+    Les doublons sont retirés au fil de la lecture à l'aide de l'ensemble des
+    empreintes déjà vues : chaque ligne n'est comparée qu'une fois, quel que
+    soit le nombre de blocs.
+    """
+    seen = set()
+    for path in source_files(source):
+        with pd.read_csv(path, sep=",", chunksize=chunksize) as reader:
+            for chunk in reader:
+                chunk = align_columns(chunk)
+                chunk = chunk[_first_seen(_row_hashes(chunk), seen)]
+                if columns is not None:
+                    chunk = chunk.reindex(columns=list(columns))
+                yield chunk
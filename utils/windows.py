@@ -0,0 +1,121 @@
+import re
+
+import numpy as np
+
+from utils.data_loader import load_data, load_timestamps
+from utils.facets import SUBGROUP_ERRORS
+from utils.profiling import timed
+from utils.timestamps import DAY, MISSING
+
+# Fenêtres calendaires : durée en jours. Une fenêtre "Nd" (par exemple "7d")
+# est glissante : N jours consécutifs, avancée d'un jour à la fois.
+WINDOWS = {"day": 1, "week": 7}
+
+_ROLLING = re.compile(r"^([1-9][0-9]*)d$")
+
+
+def parse_window(window):
+    """Renvoie (durée en jours, glissante ?) ; lève ValueError si inconnue."""
+    if window in WINDOWS:
+        return WINDOWS[window], False
+    match = _ROLLING.match(window)
+    if match is None:
+        raise ValueError(
+            f"Fenêtre inconnue : {window} (choix : {', '.join(WINDOWS)} ou Nd, par ex. 7d)"
+        )
+    return int(match.group(1)), True
+
+
+def _date(day):
+    return str(np.datetime64(int(day), "D"))
+
+
+def window_bounds(epochs, window):
+    """Fenêtres de window sur des horodatages triés : (nom, début, fin).
+
+    début et fin délimitent la tranche epochs[début:fin] de la fenêtre,
+    trouvée par recherche dichotomique. Les jours et les semaines (du lundi
+    au dimanche) sans réponse sont omis ; les fenêtres glissantes portent le
+    nom de leur premier et de leur dernier jour et ne commencent qu'une fois
+    N jours de réponses disponibles.
+    """
+    length, rolling = parse_window(window)
+    if len(epochs) == 0:
+        return []
+
+    first_day = epochs[0] // DAY
+    last_day = epochs[-1] // DAY
+
+    if rolling:
+        starts = np.arange(first_day, max(last_day - length + 1, first_day) + 1)
+    else:
+        first_start = first_day
+        if window == "week":
+            # Le 1970-01-01 était un jeudi : on recule jusqu'au lundi.
+            first_start -= (first_day + 3) % 7
+        starts = np.arange(first_start, last_day + 1, length)
+
+    lows = np.searchsorted(epochs, starts * DAY, side="left")
+    highs = np.searchsorted(epochs, (starts + length) * DAY, side="left")
+
+    bounds = []
+    for start, low, high in zip(starts, lows, highs):
+        if high == low and not rolling:
+            continue
+        name = _date(start)
+        if rolling:
+            name = f"{name}/{_date(start + length - 1)}"
+        bounds.append((name, int(low), int(high)))
+    return bounds
+
+
+@timed()
+def window_states(columns, new_state, update_state, window, file_path=None):
+    """Construit l'état cumulé d'une analyse pour chaque fenêtre de temps.
+
+    Les réponses sont triées une seule fois selon l'heure affichée par le
+    formulaire ; chaque fenêtre est ensuite une tranche contiguë du
+    DataFrame trié, sans filtre booléen. Les réponses sans horodatage lisible
+    sont ignorées.
+    """
+    df = load_data(file_path, columns=list(columns))
+    epochs = load_timestamps(file_path, local=True)
+
+    rows = np.flatnonzero(epochs != MISSING)
+    rows = rows[np.argsort(epochs[rows], kind="stable")]
+    df = df.iloc[rows]
+    epochs = epochs[rows]
+
+    states = {}
+    for name, low, high in window_bounds(epochs, window):
+        states[name] = new_state()
+        update_state(states[name], df.iloc[low:high])
+
+    return states
+
+
+def window_analysis(
+    analysis_function,
+    columns,
+    new_state,
+    update_state,
+    window,
+    file_path=None,
+):
+    """Exécute une analyse pour chaque fenêtre de temps (voir window_bounds).
+
+    Comme facet_analysis : analysis_function est appelée avec
+    state=<état de la fenêtre> et sans graphique ; une fenêtre pour laquelle
+    l'analyse échoue faute de réponses (SUBGROUP_ERRORS) reçoit
+    {"error": message}.
+    """
+    states = window_states(columns, new_state, update_state, window, file_path)
+
+    results = {}
+    for name, state in states.items():
+        try:
+            results[name] = analysis_function(plot=False, state=state)
+        except SUBGROUP_ERRORS as e:
+            results[name] = {"error": str(e)}
+
+    return results